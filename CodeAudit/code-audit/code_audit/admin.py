@@ -4,12 +4,17 @@ import os
 from django.contrib import admin, messages
 from django.contrib.postgres.aggregates import ArrayAgg
 from django.db.models import Subquery, OuterRef
-from django.http import HttpResponseRedirect, HttpResponse
+from django.db.models.functions import Coalesce
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import FileResponse, HttpResponseRedirect, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.urls import path, reverse
-from django.utils.html import format_html
+from django.utils.html import format_html, format_html_join
 
-from .models import CodeAuditReport, CodeAuditReportLog
+from .batch import run_reports_concurrently
+from .models import (
+    CodeAuditAuthorScore, CodeAuditReport, CodeAuditReportLog, CodeAuditReportLogArchive, CodeAuditSchedule,
+)
 
 LOGGER = logging.getLogger(__name__)
 
@@ -20,24 +25,60 @@ class CodeAuditReportLogInline(admin.TabularInline):
     readonly_fields = ("pylint_score", "report_path", "run_at")
 
 
+class CodeAuditAuthorScoreInline(admin.TabularInline):
+    model = CodeAuditAuthorScore
+    extra = 0
+    can_delete = False
+    fields = readonly_fields = ("git_user", "pylint_score", "issues", "run_at")
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 class CodeAuditReportAdmin(admin.ModelAdmin):
     list_display = (
-        "id", "module_name", "file_name", "status", "created_at",
+        "id", "project", "module_name", "file_name", "status", "created_at",
         "last_score_display", "pylint_score",
-        "run_report_link", "view_report_link", "all_scores_display"
+        "run_report_link", "view_report_link", "diff_report_link", "all_scores_display"
     )
-    list_filter = ("module_name", "status", "created_at")
+    list_filter = ("project", "module_name", "status", "created_at")
+    actions = ["run_selected_audits", "queue_author_audits"]
+    inlines = [CodeAuditAuthorScoreInline]
+    # skip the unfiltered COUNT(*) on large tables
+    show_full_result_count = False
 
     def get_queryset(self, request):
-        qs = super().get_queryset(request)
+        # fingerprints holds every message of the last run, no changelist column needs it
+        qs = super().get_queryset(request).defer("fingerprints")
 
         last_log = CodeAuditReportLog.objects.filter(
             report=OuterRef("pk")
         ).order_by("-run_at")
 
+        # correlated subqueries use code_audit_log_report_run_idx, no GROUP BY over the log join
+        all_scores = CodeAuditReportLog.objects.filter(
+            report=OuterRef("pk")
+        ).order_by().values("report").annotate(
+            scores=ArrayAgg("pylint_score", distinct=False, ordering="run_at")
+        ).values("scores")
+
+        # logs rolled up by code_audit_archive_logs
+        last_archive = CodeAuditReportLogArchive.objects.filter(
+            report=OuterRef("pk")
+        ).order_by("-last_run_at")
+        archived_scores = CodeAuditReportLogArchive.objects.filter(
+            report=OuterRef("pk")
+        ).order_by().values("report").annotate(
+            scores=ArrayAgg("avg_score", distinct=False, ordering="period_start")
+        ).values("scores")
+
         qs = qs.annotate(
-            last_score_annotated=Subquery(last_log.values("pylint_score")[:1]),
-            all_scores_annotated=ArrayAgg("logs__pylint_score", distinct=False),
+            last_score_annotated=Coalesce(
+                Subquery(last_log.values("pylint_score")[:1]),
+                Subquery(last_archive.values("last_score")[:1]),
+            ),
+            all_scores_annotated=Subquery(all_scores),
+            archived_scores_annotated=Subquery(archived_scores),
         )
         return qs
 
@@ -48,8 +89,10 @@ class CodeAuditReportAdmin(admin.ModelAdmin):
     last_score_display.short_description = "Last Score"
 
     def all_scores_display(self, obj):
-        if obj.all_scores_annotated:
-            return ", ".join(str(s) for s in obj.all_scores_annotated)
+        scores = [round(s, 2) for s in obj.archived_scores_annotated or []]
+        scores += obj.all_scores_annotated or []
+        if scores:
+            return ", ".join(str(s) for s in scores)
         return "-"
 
     all_scores_display.short_description = "All Scores"
@@ -59,6 +102,9 @@ class CodeAuditReportAdmin(admin.ModelAdmin):
         custom_urls = [
             path("run/<int:pk>/", self.admin_site.admin_view(self.run_audit), name="run_audit"),
             path("view/<int:pk>/", self.admin_site.admin_view(self.view_audit_report), name="view_audit"),
+            path("view/<int:pk>/<path:fragment>", self.admin_site.admin_view(self.view_audit_fragment),
+                 name="view_audit_fragment"),
+            path("diff/<int:pk>/", self.admin_site.admin_view(self.diff_audit_report), name="diff_audit"),
         ]
         return custom_urls + urls
 
@@ -72,6 +118,11 @@ class CodeAuditReportAdmin(admin.ModelAdmin):
 
     view_report_link.short_description = "View"
 
+    def diff_report_link(self, obj):
+        return format_html('<a href="{}">Diff</a>', f"diff/{obj.pk}/")
+
+    diff_report_link.short_description = "Diff"
+
     # Run audit
     def run_audit(self, request, pk):
         try:
@@ -84,6 +135,31 @@ class CodeAuditReportAdmin(admin.ModelAdmin):
 
         return HttpResponseRedirect(request.META.get("HTTP_REFERER", "/admin/"))
 
+    # Run audit for the selected rows
+    @admin.action(description="Run audit for selected reports")
+    def run_selected_audits(self, request, queryset):
+        reports = list(CodeAuditReport.objects.filter(pk__in=queryset.values_list("pk", flat=True)))
+        try:
+            completed = run_reports_concurrently(reports)
+        except Exception as e:
+            LOGGER.exception("Failed to run bulk audit for %s report(s)", len(reports))
+            messages.error(request, f"❌ Failed to run audits: {str(e)}")
+            return
+
+        if completed == len(reports):
+            messages.success(request, f"Audit completed for {completed} report(s)")
+        else:
+            messages.warning(request, f"⚠️ Audit completed for {completed}/{len(reports)} report(s)")
+
+    # Queue background jobs that also store the per-author scores
+    @admin.action(description="Queue audits with per-author scores for selected reports")
+    def queue_author_audits(self, request, queryset):
+        from .jobs import submit
+
+        created = sum(submit(report, by_author=True)[1] for report in queryset)
+        messages.success(request, f"Queued {created} audit(s) with per-author scores, "
+                                  f"{queryset.count() - created} already active")
+
     # View audit
     def view_audit_report(self, request, pk):
         report = get_object_or_404(CodeAuditReport, pk=pk)
@@ -121,6 +197,45 @@ class CodeAuditReportAdmin(admin.ModelAdmin):
             LOGGER.exception("Unexpected error opening report %s", file_path)
             return HttpResponse(f"Unexpected error: {str(e)}", status=500)
 
+    # Lazily loaded fragment of a paginated report
+    def view_audit_fragment(self, request, pk, fragment):
+        report = get_object_or_404(CodeAuditReport, pk=pk)
+        file_path = report.get_fragment_path(fragment)
+        if not file_path:
+            return HttpResponse("Report fragment not found", status=404)
+        return FileResponse(open(file_path, "rb"), content_type="text/html; charset=utf-8")
+
+    # Diff two runs: ?from=<log id>&to=<log id|current>&format=json
+    def diff_audit_report(self, request, pk):
+        report = get_object_or_404(CodeAuditReport, pk=pk)
+        try:
+            diff = report.diff_runs(request.GET.get("from"), request.GET.get("to"))
+        except (ObjectDoesNotExist, ValueError):
+            return HttpResponse("Run not found", status=404)
+
+        if request.GET.get("format") == "json":
+            return JsonResponse(diff)
+        return HttpResponse(self._render_diff(report, diff))
+
+    @staticmethod
+    def _render_diff(report, diff):
+        """Render new/fixed/unchanged message tables."""
+        sections = []
+        for title in ("new", "fixed", "unchanged"):
+            rows = format_html_join(
+                "", "<tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td></tr>", diff[title]
+            )
+            sections.append(format_html(
+                "<h2>{} ({})</h2><table><tr><th>File</th><th>Line</th><th>Symbol</th><th>Message</th></tr>"
+                "{}</table>",
+                title.capitalize(), len(diff[title]), rows,
+            ))
+        return format_html(
+            "<html><head><style>body {{ font-family: Arial, sans-serif; }} td, th {{ padding: 2px 8px; "
+            "text-align: left; }}</style></head><body><h1>Diff: {}</h1>{}{}{}</body></html>",
+            report.file_name, *sections,
+        )
+
     @staticmethod
     def _render_report_not_found():
         """Render styled HTML page when report is missing."""
@@ -160,4 +275,21 @@ class CodeAuditReportAdmin(admin.ModelAdmin):
         """
 
 
+class CodeAuditScheduleAdmin(admin.ModelAdmin):
+    list_display = ("report", "enabled", "interval_minutes", "next_check_at", "last_checked_at", "last_queued_at")
+    list_filter = ("enabled",)
+    list_select_related = ("report",)
+    readonly_fields = ("last_checked_at", "last_queued_at", "stat_signature", "content_signature")
+
+
+class CodeAuditAuthorScoreAdmin(admin.ModelAdmin):
+    list_display = ("report", "git_user", "pylint_score", "issues", "run_at")
+    list_filter = ("git_user",)
+    list_select_related = ("report",)
+    search_fields = ("git_user", "report__file_name")
+    readonly_fields = ("report", "git_user", "pylint_score", "issues", "stats", "run_at")
+
+
 admin.site.register(CodeAuditReport, CodeAuditReportAdmin)
+admin.site.register(CodeAuditSchedule, CodeAuditScheduleAdmin)
+admin.site.register(CodeAuditAuthorScore, CodeAuditAuthorScoreAdmin)
@@ -0,0 +1,220 @@
+# reports/analyzers/__init__.py
+"""
+Pluggable analyzers run next to pylint (no Django imports).
+
+Every file is read, parsed and walked once; the resulting SourceFile (text,
+lines, AST, nodes by type and parent links) is shared by all registered
+analyzers, so adding an analyzer does not add another pass over the codebase.
+Files are spread over a process pool and each worker runs every analyzer on
+its files.
+
+Results use the record format of reporters.StreamingJsonReporter, with paths
+as pylint reports them (relative to the working directory), and are merged into
+pylint's results per file (see lint.ResultCollector), so they end up in the
+same report, fingerprints and score. Audits start the analyzers in a background
+thread (submit_analyzers) and lint while they run. A check pylint also has is
+listed in PYLINT_EQUIVALENTS: where pylint reports it on the same line, the
+analyzer's message is dropped, so a problem is not counted twice.
+
+Analyzers are configured as dotted paths in settings.CODE_AUDIT["ANALYZERS"]:
+
+    CODE_AUDIT = {
+        "ANALYZERS": [
+            "code_audit.analyzers.style.StyleAnalyzer",
+            "code_audit.analyzers.complexity.ComplexityAnalyzer",
+            "code_audit.analyzers.security.SecurityAnalyzer",
+            "code_audit.analyzers.django_checks.DjangoAnalyzer",
+        ],
+    }
+"""
+import ast
+import html
+import importlib
+import logging
+import math
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from ..lint import STAT_KEYS, display_path, get_record_path, module_name_from_path
+
+logger = logging.getLogger(__name__)
+
+BUILTIN_ANALYZERS = [
+    "code_audit.analyzers.style.StyleAnalyzer",
+    "code_audit.analyzers.complexity.ComplexityAnalyzer",
+    "code_audit.analyzers.security.SecurityAnalyzer",
+    "code_audit.analyzers.django_checks.DjangoAnalyzer",
+]
+# analyzer symbol: pylint symbols of the same check, e.g. for a custom analyzer
+# PYLINT_EQUIVALENTS["acme-print"] = ("print-used",)
+PYLINT_EQUIVALENTS = {
+    "style-line-too-long": ("line-too-long",),
+    "style-trailing-whitespace": ("trailing-whitespace",),
+    "style-bare-except": ("bare-except",),
+    "style-singleton-comparison": ("singleton-comparison",),
+    "security-eval": ("eval-used", "exec-used"),
+}
+QUICK_ANALYZERS = [
+    "code_audit.analyzers.django_checks.DjangoAnalyzer",
+]
+IN_PROCESS_MAX_FILES = 50
+
+
+class SourceFile:
+    """A file read, parsed and walked once, shared by all analyzers."""
+
+    def __init__(self, path, module=None):
+        self.path = path
+        self.display_path = display_path(path)
+        self.module = module or module_name_from_path(path)
+        with open(path, "rb") as f:
+            self.data = f.read()
+        self.text = self.data.decode("utf-8", "replace")
+        self.lines = self.text.splitlines()
+        self.syntax_error = None
+        self.parents = {}
+        self.by_type = defaultdict(list)
+        try:
+            self.tree = ast.parse(self.data, filename=path)
+        except (SyntaxError, ValueError) as e:
+            self.tree = None
+            self.syntax_error = e
+            return
+        stack = [self.tree]
+        while stack:
+            node = stack.pop()
+            self.by_type[type(node)].append(node)
+            for child in ast.iter_child_nodes(node):
+                self.parents[child] = node
+                stack.append(child)
+
+    def nodes_of(self, *types):
+        """Nodes of the given AST classes (exact classes, no subclass matching)."""
+        for node_type in types:
+            yield from self.by_type.get(node_type, ())
+
+    def ancestors(self, node):
+        parent = self.parents.get(node)
+        while parent is not None:
+            yield parent
+            parent = self.parents.get(parent)
+
+    def enclosing_name(self, node):
+        """Dotted class/function name around a node, as pylint's "obj"."""
+        names = [
+            a.name for a in self.ancestors(node)
+            if isinstance(a, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+        ]
+        return ".".join(reversed(names))
+
+    def statement_count(self):
+        return sum(len(nodes) for node_type, nodes in self.by_type.items() if issubclass(node_type, ast.stmt))
+
+    def message(self, msg_type, msg_id, symbol, text, line=None, column=0, node=None, obj=None):
+        """A message in the format of reporters.StreamingJsonReporter."""
+        if node is not None:
+            line = getattr(node, "lineno", line)
+            column = getattr(node, "col_offset", column)
+            if obj is None:
+                obj = self.enclosing_name(node)
+        return {
+            "type": msg_type,
+            "module": self.module,
+            "obj": obj or "",
+            "line": line,
+            "column": column,
+            "path": self.display_path,
+            "symbol": symbol,
+            "message": html.escape(text, quote=False),
+            "message-id": msg_id,
+        }
+
+
+class Analyzer:
+    """
+    Base class of analyzers.
+
+    check() gets a SourceFile and returns/yields messages built with
+    SourceFile.message(). Use source.nodes_of() rather than walking the tree
+    again. source.tree is None when the file does not parse; nodes_of() then
+    yields nothing.
+    """
+
+    name = ""
+
+    def check(self, source):
+        raise NotImplementedError
+
+
+def load_analyzers(analyzer_paths):
+    """Instantiate analyzers from dotted class paths."""
+    analyzers = []
+    for analyzer_path in analyzer_paths:
+        module_path, _, class_name = analyzer_path.rpartition(".")
+        analyzers.append(getattr(importlib.import_module(module_path), class_name)())
+    return analyzers
+
+
+def analyze_file(path, analyzers):
+    """Run all analyzers on one file; return its record, None if it cannot be read."""
+    try:
+        source = SourceFile(path)
+    except OSError as e:
+        logger.warning("Cannot read %s: %s", path, e)
+        return None
+    messages = []
+    for analyzer in analyzers:
+        try:
+            messages.extend(analyzer.check(source) or [])
+        except Exception:
+            logger.exception("Analyzer %s failed on %s", analyzer.name or type(analyzer).__name__, path)
+    stats = {key: 0 for key in STAT_KEYS}
+    stats["statement"] = source.statement_count()
+    for message in messages:
+        stats[message["type"]] = stats.get(message["type"], 0) + 1
+    return {"module": source.module, "path": source.display_path, "stats": stats, "messages": messages}
+
+
+def analyze_files(paths, analyzer_paths):
+    """Worker entry point: analyze a chunk of files."""
+    analyzers = load_analyzers(analyzer_paths)
+    return [record for record in (analyze_file(path, analyzers) for path in paths) if record]
+
+
+def run_analyzers(files, analyzer_paths, max_workers=1):
+    """
+    Run analyzers over files, each file read and parsed once.
+
+    Small runs stay in-process; larger ones are chunked over a process pool.
+
+    :param analyzer_paths: dotted paths of Analyzer classes
+    :return: {abs_path: record}
+    """
+    files = [os.path.abspath(path) for path in files]
+    if not analyzer_paths or not files:
+        return {}
+    if max_workers <= 1 or len(files) <= IN_PROCESS_MAX_FILES:
+        records = analyze_files(files, analyzer_paths)
+    else:
+        chunk_size = max(1, math.ceil(len(files) / (max_workers * 4)))
+        chunks = [files[i:i + chunk_size] for i in range(0, len(files), chunk_size)]
+        records = []
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for chunk_records in executor.map(analyze_files, chunks, [analyzer_paths] * len(chunks)):
+                records.extend(chunk_records)
+    return {get_record_path(record): record for record in records}
+
+
+def submit_analyzers(files, analyzer_paths, max_workers=1):
+    """
+    run_analyzers() in a background thread, so the analyzers run while pylint lints the same files.
+
+    :return: concurrent.futures.Future of {abs_path: record}, None without analyzers or files
+    """
+    if not analyzer_paths or not files:
+        return None
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="code-audit-analyzers")
+    future = executor.submit(run_analyzers, list(files), analyzer_paths, max_workers)
+    executor.shutdown(wait=False)
+    return future
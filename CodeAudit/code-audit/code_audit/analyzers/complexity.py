@@ -0,0 +1,46 @@
+# reports/analyzers/complexity.py
+"""Cyclomatic complexity (radon/mccabe style) of functions, from the shared AST."""
+import ast
+from collections import Counter
+
+from . import Analyzer
+
+FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+SCOPE_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+BRANCH_NODES = (ast.If, ast.IfExp, ast.For, ast.AsyncFor, ast.While, ast.ExceptHandler, ast.With, ast.AsyncWith,
+                ast.Assert, ast.match_case)
+
+
+def enclosing_scope(source, node):
+    for ancestor in source.ancestors(node):
+        if isinstance(ancestor, SCOPE_NODES):
+            return ancestor
+    return None
+
+
+def function_complexities(source):
+    """{function node: 1 + decision points}, nested functions and classes counted separately."""
+    decisions = Counter()
+    for node in source.nodes_of(*BRANCH_NODES):
+        decisions[enclosing_scope(source, node)] += 1
+    for node in source.nodes_of(ast.comprehension):
+        decisions[enclosing_scope(source, node)] += 1 + len(node.ifs)
+    for node in source.nodes_of(ast.BoolOp):
+        decisions[enclosing_scope(source, node)] += len(node.values) - 1
+    return {function: 1 + decisions[function] for function in source.nodes_of(*FUNCTION_NODES)}
+
+
+class ComplexityAnalyzer(Analyzer):
+    """Report functions whose cyclomatic complexity is over max_complexity (radon rank C and worse)."""
+
+    name = "complexity"
+    max_complexity = 10
+
+    def check(self, source):
+        for node, complexity in function_complexities(source).items():
+            if complexity > self.max_complexity:
+                obj = ".".join(filter(None, [source.enclosing_name(node), node.name]))
+                yield source.message(
+                    "refactor", "R9101", "too-complex",
+                    f"'{node.name}' is too complex ({complexity}/{self.max_complexity})", node=node, obj=obj,
+                )
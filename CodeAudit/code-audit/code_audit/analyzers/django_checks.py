@@ -0,0 +1,177 @@
+# reports/analyzers/django_checks.py
+"""
+Django hot rules evaluated on the shared AST, without astroid inference.
+
+The ORM rules are syntactic: a queryset is an expression rooted at
+``<Model>.objects``, and loop variables are only followed by name.
+"""
+import ast
+import os
+
+from . import Analyzer
+from .complexity import SCOPE_NODES
+
+COMPREHENSION_NODES = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+RELATED_METHODS = {"all", "filter", "exclude", "get", "count", "exists", "first", "last", "values", "values_list"}
+PREFETCHING_METHODS = {"select_related", "prefetch_related", "values", "values_list", "only", "defer"}
+VIEW_BASE_SUFFIXES = ("View", "ViewSet", "APIView")
+
+
+def queryset_methods(node):
+    """Method names of a queryset expression rooted at <Model>.objects, None for other expressions."""
+    methods = []
+    while isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+        methods.append(node.func.attr)
+        node = node.func.value
+    if isinstance(node, ast.Attribute) and node.attr == "objects":
+        return list(reversed(methods))
+    return None
+
+
+def enclosing_loop(source, node):
+    """
+    Innermost loop whose body evaluates node, within the same function.
+
+    :return: (loop node, target node, iterable node) or None
+    """
+    child = node
+    for ancestor in source.ancestors(node):
+        if isinstance(ancestor, (ast.For, ast.AsyncFor)) and child is not ancestor.iter and child is not ancestor.target:
+            return ancestor, ancestor.target, ancestor.iter
+        if isinstance(ancestor, COMPREHENSION_NODES) and child not in ancestor.generators:
+            generator = ancestor.generators[0]
+            return ancestor, generator.target, generator.iter
+        if isinstance(ancestor, SCOPE_NODES):
+            return None
+        child = ancestor
+    return None
+
+
+def is_chain_head(source, node):
+    """True if node is the outermost call of a method chain (qs.filter().order_by() -> the order_by call)."""
+    parent = source.parents.get(node)
+    return not (isinstance(parent, ast.Attribute) and isinstance(source.parents.get(parent), ast.Call))
+
+
+def is_dynamic_string(node):
+    """f-string, "%" formatting, concatenation or str.format() call."""
+    if isinstance(node, ast.JoinedStr):
+        return any(isinstance(value, ast.FormattedValue) for value in node.values)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Mod, ast.Add)):
+        return True
+    return isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "format"
+
+
+def func_name(func):
+    return func.id if isinstance(func, ast.Name) else func.attr
+
+
+def base_names(node):
+    for base in node.bases:
+        if isinstance(base, ast.Name):
+            yield base.id
+        elif isinstance(base, ast.Attribute):
+            yield base.attr
+
+
+class DjangoAnalyzer(Analyzer):
+    """
+    N+1 prone queryset access in loops, missing select_related, raw SQL,
+    print() in production code and oversized views.
+    """
+
+    name = "django"
+    max_view_lines = 80
+    max_view_class_lines = 300
+
+    def check(self, source):
+        parts = os.path.normpath(source.path).split(os.sep)
+        is_test = "tests" in parts or os.path.basename(source.path).startswith("test")
+        is_views = os.path.basename(source.path) == "views.py" or "views" in parts[:-1]
+        for node in source.nodes_of(ast.Call):
+            yield from self.check_call(source, node, is_test)
+        yield from self.check_missing_select_related(source)
+        yield from self.check_views(source, is_views)
+
+    def check_call(self, source, node, is_test):
+        func = node.func
+        if isinstance(func, ast.Name) and func.id == "print":
+            if not is_test:
+                yield source.message("warning", "W9304", "django-print", "print() in production code, use logging",
+                                     node=node)
+            return
+
+        raw_sql = (
+            isinstance(func, ast.Name) and func.id == "RawSQL"
+            or isinstance(func, ast.Attribute) and func.attr in ("raw", "extra", "execute", "executemany")
+        )
+        if raw_sql:
+            if node.args and is_dynamic_string(node.args[0]):
+                yield source.message("error", "E9306", "django-raw-sql-injection",
+                                     "Raw SQL built with string formatting, pass parameters instead", node=node)
+            else:
+                yield source.message("warning", "W9305", "django-raw-sql",
+                                     f"Raw SQL ({func_name(func)}) bypasses the ORM", node=node)
+
+        loop = enclosing_loop(source, node)
+        if loop is None:
+            return
+        _, target, iterable = loop
+        if queryset_methods(node) is not None and is_chain_head(source, node):
+            yield source.message("warning", "W9301", "django-query-in-loop",
+                                 "Queryset evaluated inside a loop (N+1 queries)", node=node)
+        elif (isinstance(func, ast.Attribute) and func.attr in RELATED_METHODS
+              and isinstance(func.value, ast.Attribute) and isinstance(func.value.value, ast.Name)
+              and isinstance(target, ast.Name) and func.value.value.id == target.id
+              and "prefetch_related" not in (queryset_methods(iterable) or [])):
+            yield source.message(
+                "warning", "W9302", "django-related-query-in-loop",
+                f"'{target.id}.{func.value.attr}.{func.attr}()' queries once per item, use prefetch_related",
+                node=node,
+            )
+
+    @staticmethod
+    def check_missing_select_related(source):
+        """Loops over a queryset that follow a relation of the loop variable (item.author.name)."""
+        reported = set()
+        for node in source.nodes_of(ast.Attribute):
+            inner = node.value
+            if not (isinstance(inner, ast.Attribute) and isinstance(inner.value, ast.Name)):
+                continue
+            parent = source.parents.get(node)
+            if isinstance(parent, ast.Call) and parent.func is node:
+                continue  # item.name.upper(): a method of a field value
+            loop = enclosing_loop(source, node)
+            if loop is None or loop[0] in reported:
+                continue
+            loop_node, target, iterable = loop
+            methods = queryset_methods(iterable)
+            if (methods is None or not isinstance(target, ast.Name) or inner.value.id != target.id
+                    or PREFETCHING_METHODS.intersection(methods)):
+                continue
+            reported.add(loop_node)
+            yield source.message(
+                "warning", "W9303", "django-missing-select-related",
+                f"Loop follows '{target.id}.{inner.attr}' on a queryset without select_related/prefetch_related",
+                node=loop_node,
+            )
+
+    def check_views(self, source, is_views):
+        for node in source.nodes_of(ast.ClassDef):
+            is_view = node.name.endswith(VIEW_BASE_SUFFIXES) or any(
+                name.endswith(VIEW_BASE_SUFFIXES) for name in base_names(node)
+            )
+            lines = node.end_lineno - node.lineno + 1
+            if is_view and lines > self.max_view_class_lines:
+                yield source.message("refactor", "R9308", "django-oversized-view-class",
+                                     f"View class '{node.name}' has {lines} lines ({self.max_view_class_lines} max)",
+                                     node=node, obj=node.name)
+        if not is_views:
+            return
+        for node in source.nodes_of(ast.FunctionDef, ast.AsyncFunctionDef):
+            lines = node.end_lineno - node.lineno + 1
+            if lines > self.max_view_lines:
+                obj = ".".join(filter(None, [source.enclosing_name(node), node.name]))
+                yield source.message("refactor", "R9307", "django-oversized-view",
+                                     f"View '{node.name}' has {lines} lines ({self.max_view_lines} max)",
+                                     node=node, obj=obj)
@@ -0,0 +1,69 @@
+# reports/analyzers/security.py
+"""bandit-style security checks on the shared AST."""
+import ast
+import re
+
+from . import Analyzer
+
+SECRET_NAME = re.compile(r"(pass(wd|word)?|secret|token|api_?key)$", re.IGNORECASE)
+UNSAFE_LOADERS = {("pickle", "loads"), ("pickle", "load"), ("marshal", "loads"), ("marshal", "load")}
+
+
+def call_name(node):
+    """("module", "attr") / (None, "name") of a call's function, None for other callees."""
+    func = node.func
+    if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+        return func.value.id, func.attr
+    if isinstance(func, ast.Name):
+        return None, func.id
+    return None
+
+
+def keyword_value(node, name):
+    for keyword in node.keywords:
+        if keyword.arg == name:
+            return keyword.value
+    return None
+
+
+class SecurityAnalyzer(Analyzer):
+    """eval/exec, shell=True, unsafe deserialization, disabled TLS verification and hardcoded secrets."""
+
+    name = "security"
+
+    def check(self, source):
+        for node in source.nodes_of(ast.Call):
+            yield from self.check_call(source, node)
+        for node in source.nodes_of(ast.Assign):
+            yield from self.check_assign(source, node)
+
+    @staticmethod
+    def check_call(source, node):
+        name = call_name(node)
+        if name in ((None, "eval"), (None, "exec")):
+            # pylint's eval-used / exec-used severity
+            yield source.message("warning", "W9201", "security-eval", f"Use of {name[1]}()", node=node)
+        elif name in UNSAFE_LOADERS:
+            yield source.message("warning", "W9202", "security-unsafe-deserialization",
+                                 f"{'.'.join(name)}() can execute arbitrary code on untrusted data", node=node)
+        elif name == ("yaml", "load") and keyword_value(node, "Loader") is None and len(node.args) < 2:
+            yield source.message("warning", "W9203", "security-yaml-load",
+                                 "yaml.load() without a Loader, use yaml.safe_load()", node=node)
+        shell = keyword_value(node, "shell")
+        if isinstance(shell, ast.Constant) and shell.value is True:
+            yield source.message("warning", "W9204", "security-shell-true",
+                                 "subprocess call with shell=True", node=node)
+        verify = keyword_value(node, "verify")
+        if isinstance(verify, ast.Constant) and verify.value is False:
+            yield source.message("warning", "W9205", "security-no-tls-verify",
+                                 "TLS certificate verification disabled (verify=False)", node=node)
+
+    @staticmethod
+    def check_assign(source, node):
+        if not (isinstance(node.value, ast.Constant) and isinstance(node.value.value, str) and node.value.value):
+            return
+        for target in node.targets:
+            name = target.id if isinstance(target, ast.Name) else getattr(target, "attr", "")
+            if SECRET_NAME.search(name):
+                yield source.message("warning", "W9206", "security-hardcoded-secret",
+                                     f"Possible hardcoded secret in '{name}'", node=node)
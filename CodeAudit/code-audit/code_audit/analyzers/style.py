@@ -0,0 +1,37 @@
+# reports/analyzers/style.py
+"""flake8-style checks on the shared source lines and AST."""
+import ast
+
+from . import Analyzer
+
+
+class StyleAnalyzer(Analyzer):
+    """Line length, whitespace, bare except and comparisons to None/True/False."""
+
+    name = "style"
+    max_line_length = 120
+
+    def check(self, source):
+        for number, line in enumerate(source.lines, start=1):
+            if len(line) > self.max_line_length:
+                yield source.message(
+                    "convention", "C9001", "style-line-too-long",
+                    f"Line too long ({len(line)}/{self.max_line_length})", line=number,
+                )
+            if line.rstrip() != line:
+                yield source.message("convention", "C9002", "style-trailing-whitespace",
+                                     "Trailing whitespace", line=number, column=len(line.rstrip()))
+            if line[:len(line) - len(line.lstrip())].count("\t"):
+                yield source.message("convention", "C9003", "style-tab-indent", "Indentation contains tabs",
+                                     line=number)
+        for node in source.nodes_of(ast.ExceptHandler):
+            if node.type is None:
+                yield source.message("warning", "W9001", "style-bare-except", "Do not use bare 'except'", node=node)
+        for node in source.nodes_of(ast.Compare):
+            for op, comparator in zip(node.ops, node.comparators):
+                if (isinstance(op, (ast.Eq, ast.NotEq)) and isinstance(comparator, ast.Constant)
+                        and any(comparator.value is singleton for singleton in (None, True, False))):
+                    yield source.message(
+                        "convention", "C9004", "style-singleton-comparison",
+                        f"Comparison to {comparator.value!r} should use 'is' / 'is not'", node=node,
+                    )
@@ -0,0 +1,432 @@
+# reports/api/json_api.py
+"""
+Read-only JSON API over reports, runs, scores, per-file stats and messages,
+plus a trigger that queues an audit and returns a job id.
+
+* Lists use keyset pagination: ``?limit=`` (at most MAX_PAGE_SIZE) and the
+  opaque ``next`` cursor of the previous page; pages never use OFFSET.
+* ``?fields=a,b`` limits the columns that are selected and serialized.
+* Every GET has an ETag computed from one aggregate query (or the output
+  file's stat), so ``If-None-Match`` answers 304 before any row is fetched.
+* Responses are gzip compressed for clients that accept it.
+
+Per-file stats and messages are read from the JSON Lines output of the
+report's last run; their cursors are positions in that file.
+
+Every endpoint needs either a staff session (browsers, with the usual CSRF
+token on POST) or the API token of ``CODE_AUDIT["API_TOKEN"]`` in an
+Authorization header; token requests are exempt from CSRF::
+
+    curl -X POST -H "Authorization: Bearer $CODE_AUDIT_API_TOKEN" -d level=file \
+        https://example.com/audit/api/reports/42/jobs/
+"""
+import asyncio
+import base64
+import functools
+import gzip
+import hashlib
+import hmac
+import json
+import os
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max
+from django.http import Http404, JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition, require_GET, require_POST
+
+from ..lint import get_stats_score
+from ..models import CodeAuditJob, CodeAuditReport
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+REPORT_FIELDS = [
+    "id", "project", "module_name", "file_name", "file_author", "git_user", "status", "pylint_score", "stats",
+    "last_run", "created_at", "updated_at", "fingerprints",
+]
+DEFAULT_REPORT_FIELDS = [field for field in REPORT_FIELDS if field != "fingerprints"]
+RUN_FIELDS = ["id", "run_at", "pylint_score", "commit", "report_path", "fingerprints"]
+DEFAULT_RUN_FIELDS = [field for field in RUN_FIELDS if field != "fingerprints"]
+FILE_FIELDS = ["path", "module", "score", "issues", "stats"]
+MESSAGE_FIELDS = ["path", "module", "line", "column", "obj", "type", "symbol", "message-id", "message"]
+JOB_FIELDS = [
+    "id", "report_id", "level", "by_author", "status", "pylint_score", "progress", "error",
+    "created_at", "started_at", "finished_at",
+]
+
+
+class ApiError(Exception):
+    """A request the API rejects with HTTP 400."""
+
+
+def bad_request(view):
+    """Turn ApiError into a 400 JSON response."""
+
+    def wrapped(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+    return wrapped
+
+
+def has_api_token(request):
+    """True if the request carries the CODE_AUDIT["API_TOKEN"] bearer token."""
+    token = (getattr(settings, 'CODE_AUDIT', {}) or {}).get("API_TOKEN")
+    scheme, _, value = request.headers.get("Authorization", "").partition(" ")
+    return bool(token) and scheme.lower() == "bearer" and hmac.compare_digest(value.strip(), str(token))
+
+
+def is_staff(request):
+    user = getattr(request, "user", None)
+    return bool(user and user.is_active and user.is_staff)
+
+
+def get_auth_error(request):
+    """403 JSON response unless the request has the API token or a staff session (CSRF checked), else None."""
+    if has_api_token(request):
+        return None
+    if not is_staff(request):
+        return JsonResponse({"error": "Staff login or API token required"}, status=403)
+    reason = CsrfViewMiddleware(lambda r: None).process_view(request, None, (), {})
+    if reason is not None:
+        return JsonResponse({"error": "CSRF verification failed"}, status=403)
+    return None
+
+
+def require_api_auth(view):
+    """Allow staff sessions (CSRF checked) and API token requests (see the module docstring)."""
+    if asyncio.iscoroutinefunction(view):
+
+        @csrf_exempt
+        @functools.wraps(view)
+        async def wrapped_async(request, *args, **kwargs):
+            return await sync_to_async(get_auth_error)(request) or await view(request, *args, **kwargs)
+
+        return wrapped_async
+
+    @csrf_exempt
+    @functools.wraps(view)
+    def wrapped(request, *args, **kwargs):
+        return get_auth_error(request) or view(request, *args, **kwargs)
+
+    return wrapped
+
+
+def get_flag(request, name):
+    """True if the POST parameter is 1, true, yes or on."""
+    return request.POST.get(name, "").lower() in ("1", "true", "yes", "on")
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(request, types):
+    """
+    Values of the ?cursor= parameter, None on the first page.
+
+    :param types: type of each value, e.g. (str, int); a cursor of another shape or with a number
+        out of the 0..2**63 range is an ApiError
+    :return: list of values or None
+    """
+    cursor = request.GET.get("cursor")
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError as e:
+        raise ApiError("Invalid cursor") from e
+    if (not isinstance(values, list) or len(values) != len(types)
+            or any(isinstance(value, bool) or not isinstance(value, value_type)
+                   or (value_type is int and not 0 <= value < 2 ** 63)
+                   for value, value_type in zip(values, types))):
+        raise ApiError("Invalid cursor")
+    return values
+
+
+def get_limit(request):
+    try:
+        limit = int(request.GET.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError as e:
+        raise ApiError("limit must be an integer") from e
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def get_fields(request, allowed, default=None):
+    """Fields of ?fields=, in the order allowed lists them."""
+    value = request.GET.get("fields")
+    if not value:
+        return list(default or allowed)
+    requested = {field.strip() for field in value.split(",") if field.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise ApiError(f"Unknown field(s): {', '.join(sorted(unknown))}; available: {', '.join(allowed)}")
+    return [field for field in allowed if field in requested]
+
+
+def make_etag(*parts):
+    return hashlib.sha1(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+
+
+def page(rows, limit, key):
+    """{"results", "next"} of up to limit+1 fetched rows; key(row) gives the cursor values of a row."""
+    rows = list(rows)
+    next_cursor = encode_cursor(key(rows[limit - 1])) if len(rows) > limit else None
+    return {"results": rows[:limit], "next": next_cursor}
+
+
+# reports
+
+def filter_reports(request):
+    reports = CodeAuditReport.objects.all()
+    if "project" in request.GET:
+        reports = reports.filter(project=request.GET["project"])
+    if request.GET.get("module"):
+        reports = reports.filter(module_name=request.GET["module"])
+    if request.GET.get("status"):
+        reports = reports.filter(status=request.GET["status"])
+    return reports
+
+
+def reports_etag(request):
+    summary = filter_reports(request).aggregate(count=Count("id"), updated=Max("updated_at"), last=Max("id"))
+    return make_etag(request.GET.urlencode(), summary)
+
+
+@gzip_page
+@require_GET
+@require_api_auth
+@bad_request
+@condition(etag_func=reports_etag)
+def report_list(request):
+    """Reports ordered by id: ?project=, ?module=, ?status=, ?fields=, ?limit=, ?cursor=."""
+    fields = get_fields(request, REPORT_FIELDS, DEFAULT_REPORT_FIELDS)
+    limit = get_limit(request)
+    reports = filter_reports(request).order_by("id")
+    cursor = decode_cursor(request, (int,))
+    if cursor is not None:
+        reports = reports.filter(id__gt=cursor[0])
+    rows = reports.values("id", *[field for field in fields if field != "id"])[:limit + 1]
+    data = page(rows, limit, key=lambda row: [row["id"]])
+    if "id" not in fields:
+        for row in data["results"]:
+            del row["id"]
+    return JsonResponse(data)
+
+
+def report_etag(request, pk):
+    updated = CodeAuditReport.objects.filter(pk=pk).values_list("updated_at", flat=True).first()
+    return make_etag(request.GET.urlencode(), pk, updated) if updated else None
+
+
+@gzip_page
+@require_GET
+@require_api_auth
+@bad_request
+@condition(etag_func=report_etag)
+def report_detail(request, pk):
+    fields = get_fields(request, REPORT_FIELDS, DEFAULT_REPORT_FIELDS)
+    report = CodeAuditReport.objects.filter(pk=pk).values(*fields).first()
+    if report is None:
+        raise Http404("Report not found.")
+    return JsonResponse(report)
+
+
+# runs and scores
+
+def runs_etag(request, pk):
+    report = CodeAuditReport.objects.filter(pk=pk)
+    summary = report.aggregate(count=Count("logs"), last=Max("logs__id"), updated=Max("updated_at"))
+    return make_etag(request.GET.urlencode(), pk, summary)
+
+
+@gzip_page
+@require_GET
+@require_api_auth
+@bad_request
+@condition(etag_func=runs_etag)
+def report_runs(request, pk):
+    """Past runs (CodeAuditReportLog), newest first: ?fields=, ?limit=, ?cursor=."""
+    report = get_object_or_404(CodeAuditReport, pk=pk)
+    fields = get_fields(request, RUN_FIELDS, DEFAULT_RUN_FIELDS)
+    limit = get_limit(request)
+    logs = report.logs.order_by("-run_at", "-id")
+    cursor = decode_cursor(request, (str, int))
+    if cursor is not None:
+        run_at, log_id = cursor
+        try:
+            run_at = parse_datetime(run_at)
+        except ValueError:
+            run_at = None
+        if run_at is None:
+            raise ApiError("Invalid cursor")
+        logs = logs.filter(run_at__lte=run_at).exclude(run_at=run_at, id__gte=log_id)
+    rows = logs.values("id", "run_at", *[field for field in fields if field not in ("id", "run_at")])[:limit + 1]
+    data = page(rows, limit, key=lambda row: [row["run_at"].isoformat(), row["id"]])
+    for row in data["results"]:
+        for field in ("id", "run_at"):
+            if field not in fields:
+                del row[field]
+    return JsonResponse(data)
+
+
+def scores_etag(request, pk):
+    report = CodeAuditReport.objects.filter(pk=pk)
+    summary = report.aggregate(
+        log_count=Count("logs", distinct=True), last_log=Max("logs__id"),
+        archive_count=Count("archived_logs", distinct=True), last_archive=Max("archived_logs__id"),
+    )
+    return make_etag(pk, summary)
+
+
+@gzip_page
+@require_GET
+@require_api_auth
+@condition(etag_func=scores_etag)
+def report_scores(request, pk):
+    """Score trend (archived months and live runs), oldest first, as compact [run_at, score] pairs."""
+    report = get_object_or_404(CodeAuditReport, pk=pk)
+    return JsonResponse({"id": report.pk, "scores": report.score_history()})
+
+
+# per-file stats and messages of the last run
+
+def get_output_file(pk):
+    report = get_object_or_404(CodeAuditReport.objects.only("id", "report_path"), pk=pk)
+    output_file = report.get_output_file("jsonl")
+    if output_file is None:
+        raise Http404("No JSON Lines output for the last run of this report.")
+    return output_file
+
+
+def output_etag(request, pk):
+    report_path = CodeAuditReport.objects.filter(pk=pk).values_list("report_path", flat=True).first()
+    if report_path is None:
+        return None
+    output_file = CodeAuditReport(pk=pk, report_path=report_path).get_output_file("jsonl")
+    if output_file is None:
+        return None
+    stat = os.stat(output_file)
+    return make_etag(request.GET.urlencode(), output_file, stat.st_mtime_ns, stat.st_size)
+
+
+def read_records(output_file, offset):
+    """
+    (offset, module record) of the lines of a JSON Lines output from a byte offset; the stats line is skipped.
+    An offset that is not the start of a line (a forged cursor) is an ApiError.
+    """
+    opener = gzip.open if output_file.endswith(".gz") else open
+    with opener(output_file, "rb") as f:
+        if offset:
+            f.seek(offset - 1)
+            if f.read(1) != b"\n":
+                raise ApiError("Invalid cursor")
+        f.seek(offset)
+        while True:
+            line_offset = f.tell()
+            line = f.readline()
+            if not line:
+                return
+            record = json.loads(line)
+            if "module" in record:
+                yield line_offset, record
+
+
+@gzip_page
+@require_GET
+@require_api_auth
+@bad_request
+@condition(etag_func=output_etag)
+def report_files(request, pk):
+    """Per-file stats of the last run, in lint order: ?path=, ?fields=, ?limit=, ?cursor=."""
+    output_file = get_output_file(pk)
+    fields = get_fields(request, FILE_FIELDS)
+    limit = get_limit(request)
+    cursor = decode_cursor(request, (int,)) or [0]
+    path = request.GET.get("path")
+    rows = []
+    for offset, record in read_records(output_file, cursor[0]):
+        if not record.get("path") or (path and not record["path"].endswith(path)):
+            continue
+        if len(rows) == limit:
+            return JsonResponse({"results": rows, "next": encode_cursor([offset])})
+        stats = record.get("stats") or {}
+        row = {
+            "path": record["path"],
+            "module": record["module"],
+            "score": get_stats_score(stats) if stats else None,
+            "issues": len(record["messages"]),
+            "stats": stats,
+        }
+        rows.append({field: row[field] for field in fields})
+    return JsonResponse({"results": rows, "next": None})
+
+
+@gzip_page
+@require_GET
+@require_api_auth
+@bad_request
+@condition(etag_func=output_etag)
+def report_messages(request, pk):
+    """Messages of the last run: ?path=, ?type=, ?symbol=, ?fields=, ?limit=, ?cursor=."""
+    output_file = get_output_file(pk)
+    fields = get_fields(request, MESSAGE_FIELDS)
+    limit = get_limit(request)
+    offset, skip = decode_cursor(request, (int, int)) or [0, 0]
+    filters = {key: request.GET[key] for key in ("type", "symbol") if request.GET.get(key)}
+    path = request.GET.get("path")
+    rows = []
+    for line_offset, record in read_records(output_file, offset):
+        if path and not (record.get("path") or "").endswith(path):
+            continue
+        for index, message in enumerate(record["messages"]):
+            if line_offset == offset and index < skip:
+                continue
+            if any(message.get(key) != value for key, value in filters.items()):
+                continue
+            if len(rows) == limit:
+                return JsonResponse({"results": rows, "next": encode_cursor([line_offset, index])})
+            rows.append({field: message.get(field) for field in fields})
+    return JsonResponse({"results": rows, "next": None})
+
+
+# jobs
+
+def job_data(job):
+    data = {field: getattr(job, field) for field in JOB_FIELDS}
+    data["url"] = reverse("api_job_detail", args=[job.pk])
+    data["progress_url"] = reverse("audit_progress", args=[job.pk])
+    return data
+
+
+@require_POST
+@require_api_auth
+def trigger_run(request, pk):
+    """
+    Queue an audit of the report (POST, level=file|app, by_author=1 for per-author scores):
+    202 with the new job, 200 with one already active.
+    """
+    from ..jobs import submit
+
+    report = get_object_or_404(CodeAuditReport, pk=pk)
+    level = request.POST.get("level", "file")
+    if level not in ("file", "app"):
+        return JsonResponse({"error": "level must be file or app"}, status=400)
+    job, created = submit(report, level=level, by_author=get_flag(request, "by_author"))
+    return JsonResponse(job_data(job), status=202 if created else 200)
+
+
+@require_GET
+@require_api_auth
+def job_detail(request, pk):
+    job = get_object_or_404(CodeAuditJob, pk=pk)
+    return JsonResponse(job_data(job))
@@ -1,13 +1,24 @@
 # reports/admin_urls.py
+import asyncio
+import json
 import logging
 import os
+import time
 from django.urls import path
-from django.http import HttpResponse, Http404
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import FileResponse, HttpResponse, Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
-from ..models import CodeAuditReport
+from django.views.decorators.http import require_POST
+from ..models import CodeAuditJob, CodeAuditReport
+from ..progress import channel
+from . import json_api
 
 logger = logging.getLogger(__name__)
 
+SSE_HEARTBEAT = 15  # seconds between keep-alive comments
+SSE_POLL_INTERVAL = 2  # seconds between job row reads for jobs running in another process
+SSE_MAX_DURATION = 3600  # seconds a stream stays open
+
 
 def run_audit(request, pk):
     """Trigger a code audit run for the given report."""
@@ -20,6 +31,33 @@ def run_audit(request, pk):
         return HttpResponse("An error occurred while running the audit.", status=500)
 
 
+@require_POST
+@json_api.require_api_auth
+async def run_audit_async(request, pk):
+    """
+    Trigger a code audit run without holding a server thread while pylint runs.
+
+    The audit awaits the asyncio orchestrator on the server's event loop (serve
+    with ASGI); the result is returned as JSON. ``by_author=1`` also stores the
+    per-author scores. Staff session (CSRF checked) or API token, as the JSON API.
+    """
+    try:
+        report = await CodeAuditReport.objects.aget(pk=pk)
+    except CodeAuditReport.DoesNotExist:
+        raise Http404("Report not found.")
+    try:
+        reports = await report.arun_audit(level="file", by_author=json_api.get_flag(request, "by_author"))
+    except Exception as e:
+        logger.exception(f"Error while running audit for report {pk}: {e}")
+        return JsonResponse({"error": "An error occurred while running the audit."}, status=500)
+    return JsonResponse({
+        "id": report.pk,
+        "status": report.status,
+        "pylint_score": report.pylint_score,
+        "report_path": ",".join(reports),
+    })
+
+
 def view_audit_report(request, pk):
     """Render a stored audit report, with optional ?file=N selection."""
     try:
@@ -53,7 +91,106 @@ def view_audit_report(request, pk):
         return HttpResponse("An error occurred while retrieving the report.", status=500)
 
 
+def view_audit_fragment(request, pk, fragment):
+    """Serve one lazily loaded fragment of a paginated report."""
+    report = get_object_or_404(CodeAuditReport, pk=pk)
+    file_path = report.get_fragment_path(fragment)
+    if not file_path:
+        raise Http404("Report fragment not found.")
+    return FileResponse(open(file_path, "rb"), content_type="text/html; charset=utf-8")
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def progress_events(job_id, max_duration=SSE_MAX_DURATION):
+    """
+    Server-sent events of a job: "progress" snapshots, then one "done" event.
+
+    Jobs running in this process are followed through the progress channel
+    (no queries, no thread held); others through their job row, read every
+    SSE_POLL_INTERVAL seconds. A job row whose process stopped sending
+    heartbeats ends the stream with a failed "done" event, and every stream is
+    closed with a "timeout" event after max_duration seconds (EventSource
+    clients reconnect).
+    """
+    from ..jobs import ABANDONED_ERROR, get_final_event, is_abandoned
+
+    last_data = None
+    version = 0
+    idle = 0.0
+    deadline = time.monotonic() + max_duration
+    while time.monotonic() < deadline:
+        if channel.get(job_id) is not None:
+            event = await channel.wait_async(job_id, version, timeout=SSE_HEARTBEAT)
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            version, data, finished = event
+        else:
+            job = await CodeAuditJob.objects.filter(pk=job_id).afirst()
+            if job is None:
+                return
+            if is_abandoned(job):
+                yield format_event("done", {**get_final_event(job), "status": CodeAuditJob.FAILED,
+                                            "error": ABANDONED_ERROR})
+                return
+            finished = not job.is_active
+            data = get_final_event(job) if finished else {"status": job.status, **job.progress}
+            if data == last_data:
+                await asyncio.sleep(SSE_POLL_INTERVAL)
+                idle += SSE_POLL_INTERVAL
+                if idle >= SSE_HEARTBEAT:
+                    idle = 0.0
+                    yield ": keep-alive\n\n"
+                continue
+        idle = 0.0
+        last_data = data
+        yield format_event("done" if finished else "progress", data)
+        if finished:
+            return
+    yield format_event("timeout", {"max_duration": max_duration})
+
+
+async def audit_progress(request, pk):
+    """
+    Stream the live progress of an audit job (see api/reports/<id>/jobs/) as server-sent events.
+
+    Serve it with ASGI: under WSGI Django consumes the async stream in a worker thread per watcher.
+    """
+    if not await CodeAuditJob.objects.filter(pk=pk).aexists():
+        raise Http404("Job not found.")
+    response = StreamingHttpResponse(progress_events(pk), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: do not buffer the stream
+    return response
+
+
+def diff_audit_report(request, pk):
+    """Return new/fixed/unchanged messages between two runs as JSON (?from=<log id>&to=<log id>)."""
+    report = get_object_or_404(CodeAuditReport, pk=pk)
+    try:
+        diff = report.diff_runs(request.GET.get("from"), request.GET.get("to"))
+    except (ObjectDoesNotExist, ValueError):
+        raise Http404("Run not found.")
+    return JsonResponse(diff)
+
+
 urlpatterns = [
     path("run/<int:pk>/", run_audit, name="run_audit"),
+    path("run-async/<int:pk>/", run_audit_async, name="run_audit_async"),
     path("view/<int:pk>/", view_audit_report, name="view_audit_report"),
+    path("view/<int:pk>/<path:fragment>", view_audit_fragment, name="view_audit_fragment"),
+    path("diff/<int:pk>/", diff_audit_report, name="diff_audit_report"),
+    path("progress/<int:pk>/", audit_progress, name="audit_progress"),
+    # JSON API (see json_api.py)
+    path("api/reports/", json_api.report_list, name="api_report_list"),
+    path("api/reports/<int:pk>/", json_api.report_detail, name="api_report_detail"),
+    path("api/reports/<int:pk>/runs/", json_api.report_runs, name="api_report_runs"),
+    path("api/reports/<int:pk>/scores/", json_api.report_scores, name="api_report_scores"),
+    path("api/reports/<int:pk>/files/", json_api.report_files, name="api_report_files"),
+    path("api/reports/<int:pk>/messages/", json_api.report_messages, name="api_report_messages"),
+    path("api/reports/<int:pk>/jobs/", json_api.trigger_run, name="api_trigger_run"),
+    path("api/jobs/<int:pk>/", json_api.job_detail, name="api_job_detail"),
 ]
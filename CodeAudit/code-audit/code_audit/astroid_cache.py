@@ -0,0 +1,175 @@
+# reports/astroid_cache.py
+"""
+Disk cache of parsed astroid modules shared by pylint workers.
+
+Loaded by pylint as a plugin (``--load-plugins code_audit.astroid_cache``) or
+installed directly in a worker process with :func:`install`. Modules are stored
+right after the tree is rebuilt and before astroid's post-build steps
+(transforms, inference tips, wildcard imports), which are replayed on load, so a
+cached module behaves exactly like a freshly parsed one while skipping the
+parse/rebuild. Entries are keyed by the file's path and content hash plus the
+astroid and Python versions, so changed files simply miss.
+
+Entries are pickles, so loading one can run code. The cache is off unless
+``CODE_AUDIT["AST_CACHE_DIR"]`` is set, the directory must belong to the
+current user and not be writable by group or others, and every entry is signed
+with an HMAC of a secret key kept in the directory (mode 0600): an entry whose
+signature does not match is never unpickled.
+"""
+import hashlib
+import hmac
+import logging
+import os
+import pickle
+import secrets
+import stat
+import sys
+from types import SimpleNamespace
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_ENV = "CODE_AUDIT_AST_CACHE_DIR"
+PICKLE_RECURSION_LIMIT = 20000
+KEY_FILE = "key"
+KEY_SIZE = 32
+DIGEST_SIZE = hashlib.sha256().digest_size
+
+_installed = {}
+
+
+def get_cache_key(path, modname, data):
+    import astroid
+
+    key = hashlib.sha1(data)
+    # the module keeps its file path (tokens, source lines are read from it), so the path is part of the key
+    key.update(f"\0{os.path.abspath(path)}\0{modname}\0{astroid.__version__}\0{sys.version_info[:2]}".encode("utf-8"))
+    return key.hexdigest()
+
+
+def get_cache_path(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], f"{key}.pickle")
+
+
+def get_cache_secret(cache_dir):
+    """
+    Signing key of the cache directory, created on first use.
+
+    :return: key bytes, None when the directory is not private to the current user
+    """
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        info = os.stat(cache_dir)
+        if (hasattr(os, "getuid") and info.st_uid != os.getuid()) or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            logger.warning("Not using astroid cache %s: it must belong to the current user and not be writable "
+                           "by group or others", cache_dir)
+            return None
+        key_path = os.path.join(cache_dir, KEY_FILE)
+        try:
+            fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass
+        else:
+            with os.fdopen(fd, "wb") as f:
+                f.write(secrets.token_bytes(KEY_SIZE))
+        with open(key_path, "rb") as f:
+            key = f.read()
+    except OSError as e:
+        logger.warning("Not using astroid cache %s: %s", cache_dir, e)
+        return None
+    if len(key) != KEY_SIZE:
+        logger.warning("Not using astroid cache %s: invalid key file", cache_dir)
+        return None
+    return key
+
+
+def sign(secret, payload):
+    return hmac.new(secret, payload, hashlib.sha256).digest()
+
+
+def load_entry(cache_path, secret):
+    """Unpickle an entry, only when its signature matches; None on a miss or a bad entry."""
+    try:
+        with open(cache_path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.debug("Ignoring unreadable astroid cache entry %s: %s", cache_path, e)
+        return None
+    digest, payload = data[:DIGEST_SIZE], data[DIGEST_SIZE:]
+    if not hmac.compare_digest(digest, sign(secret, payload)):
+        logger.warning("Ignoring astroid cache entry with a bad signature: %s", cache_path)
+        return None
+    try:
+        return pickle.loads(payload)
+    except Exception as e:
+        logger.debug("Ignoring unreadable astroid cache entry %s: %s", cache_path, e)
+        return None
+
+
+def store_entry(cache_path, entry, secret):
+    """Write a signed entry atomically so concurrent workers never read a partial file."""
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    limit = sys.getrecursionlimit()
+    try:
+        os.makedirs(os.path.dirname(cache_path), mode=0o700, exist_ok=True)
+        sys.setrecursionlimit(max(limit, PICKLE_RECURSION_LIMIT))
+        payload = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(tmp_path, "wb") as f:
+            f.write(sign(secret, payload) + payload)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logger.debug("Could not cache astroid module %s: %s", cache_path, e)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+def install(cache_dir):
+    """Patch astroid's AstroidBuilder to read/write parsed modules from cache_dir (idempotent, see get_cache_secret)."""
+    if not cache_dir or _installed:
+        return
+    secret = get_cache_secret(cache_dir)
+    if secret is None:
+        return
+    from astroid.builder import AstroidBuilder
+
+    original_file_build = AstroidBuilder.file_build
+    original_post_build = AstroidBuilder._post_build
+
+    def file_build(self, path, modname=None):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return original_file_build(self, path, modname)
+
+        key = get_cache_key(path, modname, data)
+        cache_path = get_cache_path(cache_dir, key)
+        entry = load_entry(cache_path, secret)
+        if entry is not None:
+            module, import_from_nodes, delayed_assattr, encoding = entry
+            builder = SimpleNamespace(_import_from_nodes=import_from_nodes, _delayed_assattr=delayed_assattr)
+            return original_post_build(self, module, builder, encoding)
+
+        self._code_audit_cache_path = cache_path
+        try:
+            return original_file_build(self, path, modname)
+        finally:
+            self._code_audit_cache_path = None
+
+    def post_build(self, module, builder, encoding):
+        cache_path = getattr(self, "_code_audit_cache_path", None)
+        if cache_path:
+            store_entry(cache_path, (module, builder._import_from_nodes, builder._delayed_assattr, encoding), secret)
+        return original_post_build(self, module, builder, encoding)
+
+    AstroidBuilder.file_build = file_build
+    AstroidBuilder._post_build = post_build
+    _installed["dir"] = cache_dir
+
+
+def register(linter):
+    """pylint plugin entry point: enable the cache when CODE_AUDIT_AST_CACHE_DIR is set."""
+    install(os.environ.get(CACHE_DIR_ENV))
@@ -0,0 +1,102 @@
+# reports/baseline.py
+"""On-disk baseline of known message fingerprints (see fingerprints.py)."""
+import mmap
+import os
+
+MAGIC = b"CABL1\n"
+RECORD_SIZE = 8  # fingerprints are 8 byte blake2b digests
+
+
+class BaselineError(ValueError):
+    """A baseline file that is empty, truncated or not a baseline at all."""
+
+
+class Baseline:
+    """
+    Sorted array of fixed width fingerprint records.
+
+    Lookups memory-map the file and binary search it, so checking a handful of
+    messages from a changed-files run does not load the whole baseline.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        return os.path.isfile(self.path)
+
+    def __len__(self):
+        if not self.exists():
+            return 0
+        return self.check()
+
+    def check(self):
+        """
+        Validate the header and the record alignment of the file.
+
+        :return: number of records
+        :raise BaselineError: on an empty, truncated or foreign file
+        """
+        size = os.path.getsize(self.path)
+        with open(self.path, "rb") as f:
+            header = f.read(len(MAGIC))
+        if header != MAGIC:
+            raise BaselineError(f"Not a code audit baseline file (missing header): {self.path}")
+        if (size - len(MAGIC)) % RECORD_SIZE:
+            raise BaselineError(f"Truncated code audit baseline file: {self.path}")
+        return (size - len(MAGIC)) // RECORD_SIZE
+
+    def __contains__(self, fingerprint):
+        return not self.missing([fingerprint])
+
+    def missing(self, fingerprints):
+        """Return the fingerprints that are not in the baseline."""
+        fingerprints = list(fingerprints)
+        count = len(self)
+        if not count:
+            return fingerprints
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return [fp for fp in fingerprints if not self._search(data, count, bytes.fromhex(fp))]
+
+    @staticmethod
+    def _search(data, count, record):
+        low, high = 0, count
+        while low < high:
+            mid = (low + high) // 2
+            start = len(MAGIC) + mid * RECORD_SIZE
+            value = data[start:start + RECORD_SIZE]
+            if value == record:
+                return True
+            if value < record:
+                low = mid + 1
+            else:
+                high = mid
+        return False
+
+    def read(self):
+        """All fingerprints of the baseline as a set of hex strings."""
+        if not self.exists():
+            return set()
+        self.check()
+        with open(self.path, "rb") as f:
+            data = f.read()
+        return {
+            data[start:start + RECORD_SIZE].hex()
+            for start in range(len(MAGIC), len(data) - RECORD_SIZE + 1, RECORD_SIZE)
+        }
+
+    def update(self, fingerprints, remove=()):
+        """
+        Merge fingerprints into the baseline and rewrite it atomically.
+
+        :param fingerprints: fingerprints to add
+        :param remove: fingerprints to drop (e.g. fixed messages)
+        :return: number of records in the new baseline
+        """
+        records = (self.read() | set(fingerprints)) - set(remove)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(b"".join(sorted(bytes.fromhex(fp) for fp in records)))
+        os.replace(tmp_path, self.path)
+        return len(records)
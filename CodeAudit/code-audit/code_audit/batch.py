@@ -0,0 +1,314 @@
+# reports/batch.py
+import datetime
+import hashlib
+import logging
+import os
+import re
+
+from django.conf import settings
+from django.utils import timezone
+
+from .analyzers import submit_analyzers
+from .blame import author_scores
+from .code_audit import CodeAudit, home
+from .conf import get_audit_config
+from .engine import governed_lint
+from .fingerprints import fingerprint_messages
+from .lint import (
+    STAT_KEYS, IndexSink, LintError, ResultCollector, build_report_sinks, get_data_score, get_target_files,
+    merge_for_files, write_html_report,
+)
+from .projects import MonorepoAudit, get_app_dirs, read_manifest
+from .selection import FileSelector
+from .models import CodeAuditReport, CodeAuditReportLog
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def get_batch_size():
+    """Batch size for bulk ORM writes, overridable via settings.CODE_AUDIT['BATCH_SIZE']."""
+    code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+    return code_audit.get("BATCH_SIZE", DEFAULT_BATCH_SIZE)
+
+
+def get_output_file_path(file_name, file_author=None, timestamp=None):
+    """
+    HTML report path of a batch target, unique per (file_name, file_author): named after the
+    whole module path rather than its basename, plus a short hash of the target.
+    """
+    timestamp = timestamp or datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    name = os.path.splitext(os.path.normpath(file_name))[0] if file_name else "app_level_report"
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_")[-80:] or "report"
+    key = hashlib.sha1(f"{file_name or ''}\0{file_author or ''}".encode("utf-8")).hexdigest()[:8]
+    return os.path.join(home, f"{slug}_{key}_{timestamp}.html")
+
+
+def audit_target(file_name, module_name, file_author=None, level="file"):
+    """
+    Run a single CodeAudit for one target.
+
+    :return: (report_path, pylint_score, stats, fingerprints) or (None, None, None, None) if the audit failed
+    """
+    audit = CodeAudit()
+    audit.file_name = file_name if level == "file" else None
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    audit.output_filepath = f"/tmp/{module_name}_{level}_audit_{timestamp}.html"
+    audit.file_author = file_author
+    # not CodeAudit's default, named after the basename only: targets of a batch must not share a report
+    audit.html_output_file_path = get_output_file_path(audit.file_name, file_author, timestamp)
+    try:
+        audit.process()
+    except Exception as e:
+        logger.exception(f"Audit process failed for {file_name}: {e}")
+        return None, None, None, None
+
+    if not audit.html_output_file_path:
+        return None, None, None, None
+    return audit.html_output_file_path, audit.get_score(), audit.lint_stats or {}, audit.fingerprints
+
+
+def run_reports(reports, level="file"):
+    """
+    Audit many CodeAuditReport rows in one batched run.
+
+    Reports sharing the same target are audited once, and results are written
+    with bulk queries instead of one save() per report. Logging follows
+    CodeAuditReport.run_audit: the previous score is archived before it is replaced.
+
+    :param reports: iterable of CodeAuditReport
+    :param level: "file" to audit each report's file_name, anything else for app level
+    :return: number of reports that completed
+    """
+    reports = list(reports)
+    targets = {}
+    for report in reports:
+        key = (report.file_name if level == "file" else None, report.file_author)
+        targets.setdefault(key, []).append(report)
+
+    logger.info(f"Running {len(targets)} audit target(s) for {len(reports)} report(s)")
+    results = {}
+    for (file_name, file_author), grouped in targets.items():
+        results[(file_name, file_author)] = audit_target(
+            file_name, grouped[0].module_name, file_author=file_author, level=level
+        )
+
+    return save_results(targets, results)
+
+
+def run_reports_concurrently(reports, max_workers=None):
+    """
+    Audit many CodeAuditReport rows with the governed pylint worker pool (see engine.py).
+
+    The file sets of all selected reports are merged so a file shared by several
+    reports is linted once; each report's HTML and score are then built from the
+    per-file results. Cross-file checks (e.g. duplicate-code) only see the files of
+    the chunk they were linted in. Targets are keyed on (file_name, file_author): a
+    report with a file_author only covers the files that author maintains, as in CodeAudit.
+
+    :param reports: iterable of CodeAuditReport
+    :param max_workers: pool size, defaults to settings.CODE_AUDIT['MAX_WORKERS'] or the CPU count
+    :return: number of reports that completed
+    """
+    reports = list(reports)
+    audit = CodeAudit()
+    app_list = audit.get_django_project_apps()
+    config = audit.get_config()
+    ast_cache_dir = audit.get_ast_cache_dir()
+
+    targets = {}
+    for report in reports:
+        targets.setdefault((report.file_name, report.file_author), []).append(report)
+
+    target_files = {}
+    for file_name, file_author in targets:
+        try:
+            files = get_target_files(audit.resolve_file_name(file_name or "", app_list), audit.get_file_selector())
+        except FileNotFoundError as e:
+            logger.warning(f"Skipping report target {file_name}: {e}")
+            files = []
+        if file_author:
+            # as CodeAudit: only the files the author maintains
+            files = audit.get_file_author_file(files, file_author)
+        target_files[file_name, file_author] = files
+
+    all_files = sorted(set().union(*target_files.values()))
+    logger.info(f"Linting {len(all_files)} file(s) for {len(reports)} report(s)")
+    index_sink = IndexSink()
+    if all_files:
+        limits = audit.get_worker_limits(max_workers)
+        governed_lint(
+            all_files, config.project.rcfile, [index_sink], limits=limits, ast_cache_dir=ast_cache_dir,
+            extra_records=submit_analyzers(all_files, audit.get_analyzers(), limits.max_workers),
+            rcfiles=config.get_rcfiles(all_files),
+        )
+    index = index_sink.index
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    results = {}
+    for (file_name, file_author), files in target_files.items():
+        linted = [path for path in files if os.path.abspath(path) in index]
+        if not linted:
+            results[file_name, file_author] = (None, None, None, None)
+            continue
+        data = merge_for_files(index, linted)
+        html_output_file_path = get_output_file_path(file_name, file_author, timestamp)
+        write_html_report(data, html_output_file_path)
+        results[file_name, file_author] = (
+            html_output_file_path, get_data_score(data), {key: data["stats"].get(key, 0) for key in STAT_KEYS},
+            fingerprint_messages(data["messages"]),
+        )
+
+    return save_results(targets, results)
+
+
+def read_projects(project_names=None, manifest=None):
+    """
+    Projects of the monorepo manifest (see projects.py).
+
+    :param project_names: only these projects of the manifest
+    :param manifest: manifest path, defaults to settings.CODE_AUDIT['MONOREPO_MANIFEST'] (relative to BASE_DIR)
+    """
+    code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+    base_dir = getattr(settings, 'BASE_DIR', None)
+    manifest = manifest or code_audit.get("MONOREPO_MANIFEST")
+    if not manifest:
+        raise ValueError("No manifest given and CODE_AUDIT['MONOREPO_MANIFEST'] is not set")
+    if base_dir and not os.path.isabs(str(manifest)):
+        manifest = os.path.join(str(base_dir), str(manifest))
+    projects = read_manifest(manifest)
+    if project_names:
+        unknown = set(project_names).difference(project.name for project in projects)
+        if unknown:
+            raise ValueError(f"Unknown project(s) {', '.join(sorted(unknown))} in {manifest}")
+        projects = [project for project in projects if project.name in project_names]
+    return projects
+
+
+def get_projects_config(projects):
+    """AuditConfig of the apps of the monorepo projects (a pylintrc at a project root applies to its apps)."""
+    code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+    return get_audit_config(code_audit, base_dir=getattr(settings, 'BASE_DIR', None), app_dirs=get_app_dirs(projects))
+
+
+def run_projects(project_names=None, manifest=None, max_workers=None, use_async=False, by_author=False,
+                 on_progress=None):
+    """
+    Audit the apps of the monorepo projects of a manifest in one run (see projects.py).
+
+    Each app gets a CodeAuditReport of its project (module_name and file_name are
+    the app name), created on the first run; shared files are linted once for all
+    projects and unchanged files come from the result cache.
+
+    :param project_names: only these projects of the manifest
+    :param manifest: manifest path, defaults to settings.CODE_AUDIT['MONOREPO_MANIFEST']
+    :param use_async: lint with the asyncio orchestrator (see orchestrator.py)
+    :param by_author: also store the per-author scores of every report (see blame.py)
+    :param on_progress: called with every lint.LintProgress of the run
+    :return: (number of reports that completed, MonorepoAudit)
+    """
+    code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+    projects = read_projects(project_names, manifest)
+
+    audit = CodeAudit()
+    audit.progress_callback = on_progress
+    monorepo = MonorepoAudit(
+        projects, get_projects_config(projects),
+        audit.get_result_cache_dir(), limits=audit.get_worker_limits(max_workers), analyzers=audit.get_analyzers(),
+        selectors={project.name: FileSelector.from_settings(code_audit, base_dir=project.root) for project in projects},
+        ast_cache_dir=audit.get_ast_cache_dir(), use_async=use_async,
+    )
+    indexes = monorepo.run(on_progress=audit.report_progress)
+
+    CodeAuditReport.objects.bulk_create(
+        [CodeAuditReport(project=project, module_name=app, file_name=app) for project, app in indexes],
+        batch_size=get_batch_size(),
+        update_conflicts=True,
+        unique_fields=["project", "module_name", "file_name"],
+        update_fields=["updated_at"],
+    )
+    targets = {}
+    for report in CodeAuditReport.objects.filter(project__in=[project.name for project in projects]):
+        if (report.project, report.module_name) in indexes and report.file_name == report.module_name:
+            targets[report.project, report.module_name] = [report]
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    results = {}
+    json_outputs = {}
+    for (project, app), index in indexes.items():
+        if not index:
+            continue
+        html_output_file_path = os.path.join(home, f"{project}_{app}_{timestamp}.html")
+        output_files, sinks, fingerprint_sink = build_report_sinks(
+            html_output_file_path, audit.get_report_format(), audit.get_output_formats(), audit.gzip_outputs,
+        )
+        collector = ResultCollector(sinks, total_files=len(index))
+        for path in sorted(index):
+            collector.add(index[path])
+        stats, _ = collector.close()
+        results[project, app] = (
+            html_output_file_path, get_data_score({"stats": stats}), {key: stats.get(key, 0) for key in STAT_KEYS},
+            fingerprint_sink.fingerprints,
+        )
+        json_outputs[project, app] = output_files.get("jsonl")
+
+    completed = save_results(targets, results)
+    if by_author:
+        for key, grouped in targets.items():
+            if not json_outputs.get(key):
+                continue
+            try:
+                scores = author_scores(
+                    json_outputs[key], cache_dir=audit.get_result_cache_dir(),
+                    max_workers=audit.get_worker_limits(max_workers).max_workers,
+                )
+            except LintError as e:  # e.g. the project is not in a git repository
+                logger.warning(f"No per-author scores for {key[0]}:{key[1]}: {e}")
+                continue
+            for report in grouped:
+                report.save_author_scores(scores)
+    return completed, monorepo
+
+
+def save_results(targets, results):
+    """Write audit results for grouped reports using bulk_create / bulk_update."""
+    now = timezone.now()
+    logs = []
+    updated = []
+    completed = 0
+    for key, grouped in targets.items():
+        report_path, pylint_score, stats, fingerprints = results.get(key, (None, None, None, None))
+        for report in grouped:
+            if report_path is None:
+                report.status = "Failed"
+                report.updated_at = now
+                updated.append(report)
+                continue
+
+            report.report_path = report_path
+            if report.pylint_score:
+                logs.append(CodeAuditReportLog(
+                    report=report,
+                    pylint_score=report.pylint_score,
+                    report_path=report_path,
+                    fingerprints=report.fingerprints,
+                    run_at=now,
+                ))
+            report.pylint_score = pylint_score
+            report.stats = stats
+            report.fingerprints = fingerprints
+            report.last_run = now
+            report.status = "Completed"
+            report.updated_at = now
+            updated.append(report)
+            completed += 1
+
+    batch_size = get_batch_size()
+    CodeAuditReportLog.objects.bulk_create(logs, batch_size=batch_size)
+    CodeAuditReport.objects.bulk_update(
+        updated,
+        ["report_path", "pylint_score", "stats", "fingerprints", "last_run", "status", "updated_at"],
+        batch_size=batch_size,
+    )
+    return completed
@@ -0,0 +1,195 @@
+# reports/benchmarks/fixtures.py
+"""
+Load test fixtures: CodeAuditReport and CodeAuditReportLog rows at scale, plus
+report files of a given size, for the load client (see load.py).
+
+Rows are bulk inserted in batches under the ``loadtest`` project, so they never
+mix with real reports and ``--clear`` removes exactly them. Every
+``--large-every``th report points to the large HTML report, the others to a
+small one. The ids the client requests and the admin credentials are written to
+a JSON manifest:
+
+    python -m code_audit.benchmarks.fixtures --settings proj.settings \\
+        --reports 100000 --logs 10000000 --report-mb 200 --output loadtest.json
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import sys
+import time
+
+LOADTEST_PROJECT = "loadtest"
+SYMBOLS = [
+    ("C0114", "missing-module-docstring", "convention", "Missing module docstring"),
+    ("C0301", "line-too-long", "convention", "Line too long (130/120)"),
+    ("W0612", "unused-variable", "warning", "Unused variable &#x27;value&#x27;"),
+    ("R0913", "too-many-arguments", "refactor", "Too many arguments (8/5)"),
+    ("E1101", "no-member", "error", "Instance of &#x27;Report&#x27; has no &#x27;path&#x27; member"),
+]
+
+
+def fake_messages(module, count, rng):
+    messages = []
+    for line in sorted(rng.sample(range(1, count * 10 + 1), count)):
+        message_id, symbol, message_type, text = rng.choice(SYMBOLS)
+        messages.append({
+            "type": message_type, "module": module, "obj": f"Handler.method_{line % 7}", "line": line,
+            "column": line % 40, "path": f"{module.replace('.', '/')}.py", "symbol": symbol, "message": text,
+            "message-id": message_id,
+        })
+    return messages
+
+
+def fake_stats(rng):
+    stats = {"statement": rng.randint(20, 2000), "error": rng.randint(0, 3), "fatal": 0, "info": 0}
+    stats.update({key: rng.randint(0, 40) for key in ("warning", "refactor", "convention")})
+    return stats
+
+
+def fake_fingerprints(count, rng):
+    return {
+        f"{rng.getrandbits(64):016x}": [f"app/module_{i}.py", rng.randint(1, 500), SYMBOLS[i % len(SYMBOLS)][1], ""]
+        for i in range(count)
+    }
+
+
+def write_report(path, size, rng):
+    """HTML report of about size bytes, written by the same sink as real runs."""
+    from code_audit.html_report import IncrementalHtmlReport
+
+    sink = IncrementalHtmlReport(path)
+    index = 0
+    while sink.file.tell() < size:
+        module = f"loadtest.app_{index // 100}.module_{index}"
+        messages = fake_messages(module, 50, rng)
+        sink.add_module({"module": module, "path": f"{module}.py", "stats": {}, "messages": messages})
+        index += 1
+    sink.close({}, 5.0)
+    return path
+
+
+def create_reports(count, apps, large_every, small_report, large_report, batch_size, rng):
+    from code_audit.models import CodeAuditReport
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    for start in range(0, count, batch_size):
+        CodeAuditReport.objects.bulk_create([
+            CodeAuditReport(
+                project=LOADTEST_PROJECT, module_name=f"app_{i % apps}", file_name=f"app_{i % apps}/module_{i}.py",
+                status=rng.choice(["Completed", "Completed", "Completed", "Failed", "Not Run"]),
+                report_path=large_report if large_every and i % large_every == 0 else small_report,
+                pylint_score=round(rng.uniform(0, 10), 2), stats=fake_stats(rng),
+                fingerprints=fake_fingerprints(20, rng), last_run=now,
+            )
+            for i in range(start, min(start + batch_size, count))
+        ], batch_size=batch_size)
+        print(f"reports: {min(start + batch_size, count):,}/{count:,}", end="\r", flush=True)
+    print()
+    return list(CodeAuditReport.objects.filter(project=LOADTEST_PROJECT).order_by("id").values_list("id", flat=True))
+
+
+def create_logs(report_ids, count, days, batch_size, small_report, rng):
+    """count logs spread evenly over the reports, run_at spread over the last days."""
+    from code_audit.models import CodeAuditReportLog
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    span = days * 86400
+    batch = []
+    started = time.monotonic()
+    for n in range(count):
+        batch.append(CodeAuditReportLog(
+            report_id=report_ids[n % len(report_ids)], pylint_score=round(rng.uniform(0, 10), 2),
+            report_path=small_report, run_at=now - datetime.timedelta(seconds=rng.randrange(span)),
+        ))
+        if len(batch) == batch_size or n == count - 1:
+            CodeAuditReportLog.objects.bulk_create(batch, batch_size=batch_size)
+            batch = []
+            rate = (n + 1) / max(time.monotonic() - started, 1e-6)
+            print(f"logs: {n + 1:,}/{count:,} ({rate:,.0f} rows/s)", end="\r", flush=True)
+    print()
+
+
+def clear():
+    from code_audit.models import CodeAuditReport, CodeAuditReportLog
+
+    logs, _ = CodeAuditReportLog.objects.filter(report__project=LOADTEST_PROJECT).delete()
+    reports, _ = CodeAuditReport.objects.filter(project=LOADTEST_PROJECT).delete()
+    print(f"Removed {reports:,} row(s) of the {LOADTEST_PROJECT} project ({logs:,} log row(s))")
+
+
+def create_user(username, password):
+    from django.contrib.auth import get_user_model
+
+    user, _ = get_user_model().objects.get_or_create(username=username, defaults={"is_staff": True})
+    user.is_staff = user.is_superuser = True
+    user.set_password(password)
+    user.save()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--settings", default=os.environ.get("DJANGO_SETTINGS_MODULE"),
+                        help="Django settings module of the project under test")
+    parser.add_argument("--reports", type=int, default=100_000, help="CodeAuditReport rows")
+    parser.add_argument("--logs", type=int, default=1_000_000, help="CodeAuditReportLog rows, spread over the reports")
+    parser.add_argument("--apps", type=int, default=50, help="distinct module_name values")
+    parser.add_argument("--days", type=int, default=365, help="run_at of the logs is spread over the last DAYS")
+    parser.add_argument("--report-mb", type=int, default=200, help="size of the large HTML report")
+    parser.add_argument("--small-report-kb", type=int, default=64, help="size of the other HTML report")
+    parser.add_argument("--large-every", type=int, default=1000,
+                        help="every Nth report points to the large report, 0 for none")
+    parser.add_argument("--report-dir", default="/tmp/code_audit_loadtest", help="directory of the report files")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per INSERT")
+    parser.add_argument("--username", default="loadtest", help="admin user the load client logs in with")
+    parser.add_argument("--password", default="loadtest")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="loadtest.json", help="manifest read by the load client")
+    parser.add_argument("--clear", action="store_true", help="only remove the rows of a previous run")
+    args = parser.parse_args(argv)
+
+    if not args.settings:
+        parser.error("--settings (or DJANGO_SETTINGS_MODULE) is required")
+    os.environ["DJANGO_SETTINGS_MODULE"] = args.settings
+    sys.path.insert(0, os.getcwd())
+    import django
+
+    django.setup()
+    clear()
+    if args.clear:
+        return 0
+
+    rng = random.Random(args.seed)
+    os.makedirs(args.report_dir, exist_ok=True)
+    small_report = write_report(os.path.join(args.report_dir, "small.html"), args.small_report_kb * 1024, rng)
+    large_report = write_report(
+        os.path.join(args.report_dir, f"large_{args.report_mb}mb.html"), args.report_mb * 1024 * 1024, rng,
+    )
+    print(f"Reports: {small_report} ({os.path.getsize(small_report):,} bytes), "
+          f"{large_report} ({os.path.getsize(large_report):,} bytes)")
+
+    report_ids = create_reports(args.reports, args.apps, args.large_every, small_report, large_report,
+                                args.batch_size, rng)
+    if args.logs and report_ids:
+        create_logs(report_ids, args.logs, args.days, args.batch_size, small_report, rng)
+    create_user(args.username, args.password)
+
+    is_large = [bool(args.large_every) and i % args.large_every == 0 for i in range(len(report_ids))]
+    manifest = {
+        "project": LOADTEST_PROJECT,
+        "reports": len(report_ids),
+        "logs": args.logs,
+        "small_report_id": next((pk for pk, large in zip(report_ids, is_large) if not large), None),
+        "large_report_id": next((pk for pk, large in zip(report_ids, is_large) if large), None),
+        "username": args.username,
+        "password": args.password,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Manifest written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
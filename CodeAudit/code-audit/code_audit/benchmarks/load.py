@@ -0,0 +1,351 @@
+# reports/benchmarks/load.py
+"""
+Concurrent load client for the admin and report endpoints of a running server.
+
+Run the fixtures first (see fixtures.py), then start the server under test with
+LoadTestMiddleware enabled (see middleware.py) and point the client at it:
+
+    python manage.py runserver --noreload 8000 &
+    python -m code_audit.benchmarks.load --fixtures loadtest.json --server-pid $! \\
+        --concurrency 8 --requests 200 --max-p95-ms 2000 --max-queries 10
+
+Each endpoint is first requested --profile-requests times one by one, for the
+query count and peak Python memory of a request; then --requests times from
+--concurrency threads, for the latency percentiles (and the server RSS when
+--server-pid is given). The query count and memory of a streamed response (the
+FileResponse of view_report) are read back from the middleware once its body is
+sent, so they include the body.
+
+With --duration, a soak run follows: the endpoints are requested in turn from
+--concurrency threads for that many seconds, reported per --soak-interval
+window, so a latency drift or a server RSS that keeps growing (a leak) shows up:
+
+    python -m code_audit.benchmarks.load --fixtures loadtest.json --server-pid $! \
+        --requests 50 --duration 600 --max-rss-growth-mb 50
+
+Exits with status 1 when an endpoint fails a budget or returns errors, or when
+the soak run does.
+"""
+import argparse
+import contextlib
+import http.cookiejar
+import json
+import math
+import re
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from code_audit.benchmarks.middleware import MEASUREMENTS_PATH
+from code_audit.engine import get_rss_mb
+
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+CHUNK_SIZE = 1024 * 1024
+
+
+def get_endpoints(fixtures, admin_prefix):
+    """{name: path} of the hot paths, for the reports of the fixture manifest."""
+    changelist = f"{admin_prefix}code_audit/codeauditreport/"
+    endpoints = {
+        "admin_changelist": changelist,
+        "admin_changelist_filtered": f"{changelist}?project__exact={fixtures['project']}&status__exact=Completed",
+        "admin_changelist_last_page": f"{changelist}?p={max(fixtures['reports'] // 100, 1)}",
+    }
+    if fixtures.get("small_report_id"):
+        endpoints["view_report_small"] = f"{changelist}view/{fixtures['small_report_id']}/"
+    if fixtures.get("large_report_id"):
+        endpoints["view_report_large"] = f"{changelist}view/{fixtures['large_report_id']}/"
+    return endpoints
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return None
+    index = max(0, min(len(values) - 1, round(percent / 100 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+class Client:
+    """urllib opener keeping the admin session cookie, shared by the worker threads."""
+
+    def __init__(self, base_url, timeout=300):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+
+    def login(self, path, username, password):
+        url = self.base_url + path
+        with self.opener.open(url, timeout=self.timeout) as response:
+            page = response.read().decode("utf-8", "replace")
+        data = {"username": username, "password": password, "next": path}
+        token = CSRF_RE.search(page)
+        if token:
+            data["csrfmiddlewaretoken"] = token.group(1)
+        body = urllib.parse.urlencode(data).encode("ascii")
+        request = urllib.request.Request(url, data=body, headers={"Referer": url})
+        with self.opener.open(request, timeout=self.timeout) as response:
+            if "/login/" in response.geturl():
+                raise RuntimeError(f"Login as {username} failed, run the fixtures first")
+
+    def get(self, path, headers=None):
+        """:return: (status, seconds, body bytes, response headers); the body is read and dropped"""
+        request = urllib.request.Request(self.base_url + path, headers=headers or {})
+        start = time.perf_counter()
+        try:
+            response = self.opener.open(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            response = e
+        size = 0
+        with response:
+            while True:
+                chunk = response.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+        return response.status, time.perf_counter() - start, size, response.headers
+
+    def get_measurement(self, request_id):
+        """:return: final figures of a request sent with X-Code-Audit-Request-Id (see middleware.py), or None"""
+        query = urllib.parse.urlencode({"id": request_id})
+        try:
+            with self.opener.open(f"{self.base_url}{MEASUREMENTS_PATH}?{query}", timeout=self.timeout) as response:
+                return json.load(response)
+        except urllib.error.HTTPError:
+            return None
+
+
+class RssSampler:
+    """RSS of the server process while the requests run: peak and (seconds since start, MB) samples."""
+
+    def __init__(self, pid, interval=0.1):
+        self.pid = pid
+        self.interval = interval
+        self.peak = None
+        self.samples = []
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        started = time.perf_counter()
+        while not self.stopped.is_set():
+            rss = get_rss_mb(self.pid)
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+                self.samples.append((time.perf_counter() - started, rss))
+            self.stopped.wait(self.interval)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+
+def measure(client, path, args):
+    """Profile then load one endpoint; :return: result dict"""
+    queries = []
+    memory = []
+    for _ in range(args.profile_requests):
+        request_id = uuid.uuid4().hex
+        _, _, _, headers = client.get(
+            path, {"X-Code-Audit-Profile-Memory": "1", "X-Code-Audit-Request-Id": request_id},
+        )
+        figures = {"queries": headers.get("X-Code-Audit-Queries"), "memory_kb": headers.get("X-Code-Audit-Memory-KB")}
+        if headers.get("X-Code-Audit-Streaming"):
+            # the headers went out before the body
+            figures = client.get_measurement(request_id) or {}
+        if figures.get("queries") is not None:
+            queries.append(int(figures["queries"]))
+        if figures.get("memory_kb") is not None:
+            memory.append(int(figures["memory_kb"]))
+
+    started = time.perf_counter()
+    with RssSampler(args.server_pid) if args.server_pid else contextlib.nullcontext() as sampler:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(lambda _: client.get(path), range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(round(seconds * 1000, 1) for status, seconds, _, _ in results if status < 400)
+    return {
+        "path": path,
+        "requests": len(results),
+        "errors": sum(1 for status, _, _, _ in results if status >= 400),
+        "rps": round(len(results) / elapsed, 1) if elapsed else None,
+        "p50_ms": percentile(latencies, 50),
+        "p90_ms": percentile(latencies, 90),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": latencies[-1] if latencies else None,
+        "bytes": statistics.median([size for _, _, size, _ in results]) if results else 0,
+        "queries": max(queries) if queries else None,
+        "memory_kb": max(memory) if memory else None,
+        "server_rss_mb": round(sampler.peak, 1) if sampler and sampler.peak else None,
+    }
+
+
+def soak(client, endpoints, args):
+    """
+    Request the endpoints in turn from --concurrency threads for --duration seconds.
+
+    :return: result dict, with one entry per --soak-interval window in "windows"
+    """
+    paths = list(endpoints.values())
+    completed = []  # (seconds since start, status, seconds), appended by the worker threads
+    started = time.perf_counter()
+    deadline = started + args.duration
+
+    def work(offset):
+        index = offset
+        while time.perf_counter() < deadline:
+            status, seconds, _, _ = client.get(paths[index % len(paths)])
+            completed.append((time.perf_counter() - started, status, seconds))
+            index += 1
+
+    interval = min(1.0, args.soak_interval)
+    with RssSampler(args.server_pid, interval) if args.server_pid else contextlib.nullcontext() as sampler:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            list(executor.map(work, range(args.concurrency)))
+
+    count = max(1, math.ceil(args.duration / args.soak_interval))
+    done = [[] for _ in range(count)]
+    rss = [[] for _ in range(count)]
+    # requests still running at the deadline count in the last window
+    for at, status, seconds in completed:
+        done[min(int(at // args.soak_interval), count - 1)].append((status, seconds))
+    for at, mb in sampler.samples if sampler else []:
+        rss[min(int(at // args.soak_interval), count - 1)].append(mb)
+
+    windows = []
+    for index in range(count):
+        latencies = sorted(round(seconds * 1000, 1) for status, seconds in done[index] if status < 400)
+        windows.append({
+            "start_s": index * args.soak_interval,
+            "requests": len(done[index]),
+            "errors": sum(1 for status, _ in done[index] if status >= 400),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "server_rss_mb": round(rss[index][-1], 1) if rss[index] else None,
+        })
+    window_rss = [window["server_rss_mb"] for window in windows if window["server_rss_mb"] is not None]
+    return {
+        "duration_s": args.duration,
+        "requests": len(completed),
+        "errors": sum(window["errors"] for window in windows),
+        # from the end of the first (warm up) window to the end of the run
+        "server_rss_growth_mb": round(window_rss[-1] - window_rss[0], 1) if len(window_rss) > 1 else None,
+        "windows": windows,
+    }
+
+
+def check_soak_budgets(result, args):
+    failures = []
+    if result["errors"]:
+        failures.append(f"soak: {result['errors']} error response(s)")
+    for window in result["windows"]:
+        if args.max_p95_ms is not None and window["p95_ms"] is not None and window["p95_ms"] > args.max_p95_ms:
+            failures.append(f"soak: p95 {window['p95_ms']:.0f} ms over {args.max_p95_ms:.0f} ms "
+                            f"at {window['start_s']:.0f}s")
+    growth = result["server_rss_growth_mb"]
+    if args.max_rss_growth_mb is not None and growth is not None and growth > args.max_rss_growth_mb:
+        failures.append(f"soak: server RSS grew {growth:.0f} MB, over {args.max_rss_growth_mb:.0f} MB")
+    return failures
+
+
+def check_budgets(name, result, args):
+    failures = []
+    if result["errors"]:
+        failures.append(f"{name}: {result['errors']} error response(s)")
+    if args.max_p95_ms is not None and result["p95_ms"] is not None and result["p95_ms"] > args.max_p95_ms:
+        failures.append(f"{name}: p95 {result['p95_ms']:.0f} ms over {args.max_p95_ms:.0f} ms")
+    if args.max_queries is not None and result["queries"] is not None and result["queries"] > args.max_queries:
+        failures.append(f"{name}: {result['queries']} queries over {args.max_queries}")
+    if args.max_memory_mb is not None and (result["memory_kb"] or 0) > args.max_memory_mb * 1024:
+        failures.append(f"{name}: {result['memory_kb'] / 1024:.0f} MB peak memory over {args.max_memory_mb} MB")
+    return failures
+
+
+def format_value(value, spec, width):
+    return format("-" if value is None else format(value, spec), f">{width}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default="loadtest.json", help="manifest written by benchmarks.fixtures")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--admin-prefix", default="/admin/")
+    parser.add_argument("--endpoint", nargs="+", default=None, help="only these endpoints (see get_endpoints)")
+    parser.add_argument("--url", nargs="+", default=[], metavar="NAME=PATH", help="extra endpoints, e.g. API routes")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100, help="timed requests per endpoint")
+    parser.add_argument("--profile-requests", type=int, default=3,
+                        help="sequential requests measuring queries and memory")
+    parser.add_argument("--server-pid", type=int, default=None, help="pid of the server, to sample its RSS")
+    parser.add_argument("--timeout", type=float, default=300, help="seconds per request")
+    parser.add_argument("--max-p95-ms", type=float, default=None)
+    parser.add_argument("--max-queries", type=int, default=None)
+    parser.add_argument("--max-memory-mb", type=float, default=None)
+    parser.add_argument("--duration", type=float, default=None,
+                        help="then soak the endpoints for this many seconds")
+    parser.add_argument("--soak-interval", type=float, default=30, help="seconds per soak report window")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=None,
+                        help="allowed server RSS growth over the soak run (needs --server-pid)")
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    with open(args.fixtures, "r", encoding="utf-8") as f:
+        fixtures = json.load(f)
+    endpoints = get_endpoints(fixtures, args.admin_prefix)
+    endpoints.update(dict(url.split("=", 1) for url in args.url))
+    if args.endpoint:
+        endpoints = {name: path for name, path in endpoints.items() if name in args.endpoint}
+
+    client = Client(args.base_url, timeout=args.timeout)
+    client.login(f"{args.admin_prefix}login/", fixtures["username"], fixtures["password"])
+    print(f"{fixtures['reports']:,} reports, {fixtures['logs']:,} logs; "
+          f"{args.requests} requests per endpoint from {args.concurrency} thread(s)")
+
+    results = {}
+    failures = []
+    print(f"{'endpoint':<28} {'err':>4} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} "
+          f"{'queries':>7} {'mem KB':>9} {'rss MB':>7} {'bytes':>11}")
+    for name, path in endpoints.items():
+        result = results[name] = measure(client, path, args)
+        print(f"{name:<28} {result['errors']:>4} {format_value(result['rps'], '.1f', 7)} "
+              f"{format_value(result['p50_ms'], '.0f', 8)} {format_value(result['p95_ms'], '.0f', 8)} "
+              f"{format_value(result['p99_ms'], '.0f', 8)} {format_value(result['max_ms'], '.0f', 8)} "
+              f"{format_value(result['queries'], 'd', 7)} {format_value(result['memory_kb'], ',', 9)} "
+              f"{format_value(result['server_rss_mb'], '.0f', 7)} {result['bytes']:>11,.0f}")
+        failures += check_budgets(name, result, args)
+
+    soak_result = None
+    if args.duration:
+        print(f"soak: {args.duration:.0f}s over {len(endpoints)} endpoint(s) from {args.concurrency} thread(s)")
+        print(f"{'window':>8} {'requests':>8} {'err':>4} {'p50':>8} {'p95':>8} {'rss MB':>7}")
+        soak_result = soak(client, endpoints, args)
+        for window in soak_result["windows"]:
+            print(f"{window['start_s']:>7.0f}s {window['requests']:>8} {window['errors']:>4} "
+                  f"{format_value(window['p50_ms'], '.0f', 8)} {format_value(window['p95_ms'], '.0f', 8)} "
+                  f"{format_value(window['server_rss_mb'], '.0f', 7)}")
+        print(f"server RSS growth: {format_value(soak_result['server_rss_growth_mb'], '.1f', 0)} MB")
+        failures += check_soak_budgets(soak_result, args)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"fixtures": fixtures, "results": results, "soak": soak_result}, f, indent=2)
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
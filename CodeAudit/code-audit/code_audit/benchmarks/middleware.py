@@ -0,0 +1,133 @@
+# reports/benchmarks/middleware.py
+"""
+Per-request measurements for the load client (see load.py), for dev servers only.
+
+A request is measured until its response is closed, that is after the body is
+sent, so a streamed body (the FileResponse of view_report) is included. Adds to
+every response:
+
+* ``X-Code-Audit-Queries``: SQL queries run by the request (DEBUG is not needed);
+* ``X-Code-Audit-Server-Ms``: time spent in the view and the middlewares after this one;
+* ``X-Code-Audit-Memory-KB``: peak Python allocations of the request, only when
+  the request sends ``X-Code-Audit-Profile-Memory``. tracemalloc is process wide
+  and slows allocations down, so the client profiles memory with sequential
+  requests, apart from the timed ones.
+
+The headers of a streaming response are sent before its body, so they only hold
+the figures so far and ``X-Code-Audit-Streaming`` is set. When the request sends
+``X-Code-Audit-Request-Id``, the final figures are kept in the server process
+and the client reads them (once) as JSON from MEASUREMENTS_PATH?id=<request id>.
+
+Enable it in the settings of the server under test::
+
+    MIDDLEWARE = [..., "code_audit.benchmarks.middleware.LoadTestMiddleware"]
+"""
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import JsonResponse
+
+MEASUREMENTS_PATH = "/__code_audit_load__/measurement/"
+MAX_MEASUREMENTS = 1000  # kept for the client, oldest dropped first
+MEASUREMENT_WAIT = 10  # seconds the client may wait for a response to be closed
+
+_memory_lock = threading.Lock()
+_measurements = OrderedDict()
+_measurements_ready = threading.Condition()
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Measurement:
+    """Queries, time and (optionally) peak memory of one request, until finish()."""
+
+    def __init__(self, request_id=None, profile_memory=False):
+        self.request_id = request_id
+        self.profile_memory = profile_memory
+        self.counter = QueryCounter()
+        self.result = None
+        if profile_memory:
+            _memory_lock.acquire()
+            tracemalloc.start()
+        # not connection.execute_wrapper(): a streamed body may still run queries after the view returns
+        self.connection = connections[DEFAULT_DB_ALIAS]  # of this thread, finish() may run elsewhere
+        self.connection.execute_wrappers.append(self.counter)
+        self.start = time.perf_counter()
+
+    def get_figures(self):
+        figures = {"queries": self.counter.count, "server_ms": round((time.perf_counter() - self.start) * 1000, 1)}
+        if self.profile_memory:
+            figures["memory_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+        return figures
+
+    def finish(self):
+        if self.result is not None:
+            return self.result
+        self.result = self.get_figures()
+        if self.counter in self.connection.execute_wrappers:
+            self.connection.execute_wrappers.remove(self.counter)
+        if self.profile_memory:
+            tracemalloc.stop()
+            _memory_lock.release()
+        if self.request_id:
+            with _measurements_ready:
+                _measurements[self.request_id] = self.result
+                while len(_measurements) > MAX_MEASUREMENTS:
+                    _measurements.popitem(last=False)
+                _measurements_ready.notify_all()
+        return self.result
+
+
+def pop_measurement(request_id, timeout=MEASUREMENT_WAIT):
+    """:return: figures of a finished request, None if it is not closed within timeout"""
+    with _measurements_ready:
+        if not _measurements_ready.wait_for(lambda: request_id in _measurements, timeout=timeout):
+            return None
+        return _measurements.pop(request_id)
+
+
+class LoadTestMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == MEASUREMENTS_PATH:
+            request_id = request.GET.get("id")
+            figures = pop_measurement(request_id) if request_id else None
+            if figures is None:
+                return JsonResponse({"error": "unknown request id"}, status=404)
+            return JsonResponse(figures)
+
+        measurement = Measurement(
+            request_id=request.META.get("HTTP_X_CODE_AUDIT_REQUEST_ID"),
+            profile_memory="HTTP_X_CODE_AUDIT_PROFILE_MEMORY" in request.META,
+        )
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            measurement.finish()
+            raise
+        if response.streaming:
+            figures = measurement.get_figures()
+            response["X-Code-Audit-Streaming"] = "1"
+            # called by the handler (or the wsgi.file_wrapper) once the body is sent
+            response._resource_closers.append(measurement.finish)
+        else:
+            figures = measurement.finish()
+        response["X-Code-Audit-Queries"] = str(figures["queries"])
+        response["X-Code-Audit-Server-Ms"] = f"{figures['server_ms']:.1f}"
+        if "memory_kb" in figures:
+            response["X-Code-Audit-Memory-KB"] = str(figures["memory_kb"])
+        return response
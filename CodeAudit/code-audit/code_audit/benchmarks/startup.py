@@ -0,0 +1,100 @@
+# reports/benchmarks/startup.py
+"""
+Startup time benchmark of ``manage.py code_audit --file``.
+
+The command is timed against a bare pylint run over the same file with the same
+reporter, so the difference is what the command costs before and around
+linting (Django setup, imports, target resolution, report writing). Exits with
+status 1 when that overhead or the ``--help`` time is over its budget:
+
+    python -m code_audit.benchmarks.startup path/to/manage.py app/views.py --max-overhead 1.0
+
+The same budgets are enforced by the test suite (tests/test_startup.py).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from code_audit.lint import STREAM_REPORTER_ARGS, lint_env
+
+DEFAULT_PYLINTRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pylintrc")
+MAX_OVERHEAD = 1.0  # seconds on top of the bare pylint run
+MAX_HELP = 1.0  # seconds for code_audit --help
+
+
+def time_command(cmd, cwd, env, repeat, check=False):
+    """
+    Median wall time of cmd in seconds.
+
+    :param check: raise CalledProcessError when cmd fails (pylint exits non zero for any message)
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=check)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def measure(manage, file, cwd, env=None, rcfile=DEFAULT_PYLINTRC, repeat=3):
+    """
+    Startup timings of the code_audit command.
+
+    :param manage: command prefix that runs a management command, e.g. [python, "manage.py"]
+    :param file: file to audit, relative to cwd
+    :return: dict of median seconds: help, pylint, command and overhead (command - pylint)
+    """
+    env = lint_env() if env is None else env
+    timings = {
+        "help": time_command([*manage, "code_audit", "--help"], cwd, env, repeat, check=True),
+        "pylint": time_command(
+            [sys.executable, "-m", "pylint", "--rcfile", rcfile, *STREAM_REPORTER_ARGS, file], cwd, env, repeat,
+        ),
+        "command": time_command(
+            [*manage, "code_audit", "--file", file, "--fail-under", "0"], cwd, env, repeat, check=True,
+        ),
+    }
+    timings["overhead"] = timings["command"] - timings["pylint"]
+    return timings
+
+
+def get_failures(timings, max_overhead=MAX_OVERHEAD, max_help=MAX_HELP):
+    """:return: messages of the budgets the timings of measure() are over"""
+    failures = []
+    if timings["overhead"] > max_overhead:
+        failures.append(f"startup overhead {timings['overhead']:.2f}s over budget {max_overhead:.2f}s")
+    if timings["help"] > max_help:
+        failures.append(f"code_audit --help {timings['help']:.2f}s over budget {max_help:.2f}s")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("manage_py", help="manage.py of the project to audit")
+    parser.add_argument("file", help="file to audit, relative to the project directory")
+    parser.add_argument("--rcfile", default=DEFAULT_PYLINTRC, help="pylintrc the command is configured with")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (median is kept)")
+    parser.add_argument("--max-overhead", type=float, default=MAX_OVERHEAD,
+                        help="allowed seconds on top of the bare pylint run")
+    parser.add_argument("--max-help", type=float, default=MAX_HELP, help="allowed seconds for code_audit --help")
+    args = parser.parse_args(argv)
+
+    cwd = os.path.dirname(os.path.abspath(args.manage_py))
+    manage = [sys.executable, os.path.abspath(args.manage_py)]
+    timings = measure(manage, args.file, cwd, rcfile=args.rcfile, repeat=args.repeat)
+
+    print(f"code_audit --help:        {timings['help']:.2f}s (budget {args.max_help:.2f}s)")
+    print(f"bare pylint:              {timings['pylint']:.2f}s")
+    print(f"code_audit --file:        {timings['command']:.2f}s")
+    print(f"overhead:                 {timings['overhead']:.2f}s (budget {args.max_overhead:.2f}s)")
+    failures = get_failures(timings, args.max_overhead, args.max_help)
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+# reports/blame.py
+"""
+Attribute lint messages to the authors of their lines (no Django imports).
+
+One lint pass covers the whole target; every linted file is then blamed once
+with ``git blame --porcelain`` (concurrently), and each message and statement
+is charged to the author of its line. Blames of files whose content matches
+HEAD are cached by blob SHA, so unchanged files are not blamed again on the
+next run. Per-author scores use the pylint formula over the author's own
+statements and messages.
+"""
+import ast
+import gzip
+import json
+import logging
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from .lint import STAT_KEYS, get_stats_score
+from .revisions import GitError, ResultCache, get_repo_root, git
+
+logger = logging.getLogger(__name__)
+
+UNCOMMITTED = "Not Committed Yet"
+UNKNOWN_AUTHOR = "unknown"
+HEXDIGITS = frozenset("0123456789abcdef")
+
+
+def read_records(jsonl_path):
+    """Module records of a JSON Lines output (see exporters.JsonLinesSink), gzip compressed or not."""
+    opener = gzip.open if jsonl_path.endswith(".gz") else open
+    with opener(jsonl_path, "rt", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get("path"):
+                yield record
+
+
+def parse_porcelain(output):
+    """:return: author name of every line of a ``git blame --porcelain`` output, in line order"""
+    authors = {}
+    lines = {}
+    commit = final_line = None
+    for line in output.split("\n"):
+        if line.startswith("\t"):
+            lines[final_line] = authors.get(commit, UNKNOWN_AUTHOR)
+            continue
+        key, _, value = line.partition(" ")
+        if len(key) in (40, 64) and value and all(c in HEXDIGITS for c in key):
+            commit = key
+            final_line = int(value.split()[1])
+        elif key == "author":
+            authors[commit] = value
+    return [lines[number] for number in sorted(lines)]
+
+
+def blame_file(repo, path):
+    """Author of every line of a working tree file; a file git does not track is all uncommitted."""
+    result = subprocess.run(
+        ["git", "blame", "--porcelain", "--", path], cwd=repo, capture_output=True, text=True, errors="replace",
+    )
+    if result.returncode:
+        logger.debug("git blame failed for %s: %s", path, result.stderr.strip())
+        try:
+            with open(os.path.join(repo, path), "rb") as f:
+                return [UNCOMMITTED] * len(f.read().splitlines())
+        except OSError:
+            return None
+    return parse_porcelain(result.stdout)
+
+
+def get_clean_blobs(repo, paths):
+    """Blob SHAs of the repository relative paths whose working tree content is the one committed in HEAD."""
+    if not paths:
+        return {}
+    committed = {}
+    for entry in git(repo, "ls-tree", "-z", "HEAD", "--", *paths).split("\0"):
+        if entry:
+            info, path = entry.split("\t", 1)
+            committed[path] = info.split()[2]
+    tracked = [path for path in paths if path in committed]
+    if not tracked:
+        return {}
+    result = subprocess.run(
+        ["git", "hash-object", "--stdin-paths"], cwd=repo, input="\n".join(tracked) + "\n",
+        capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise GitError(f"git hash-object failed ({result.returncode}): {result.stderr.strip()}")
+    return {
+        path: sha for path, sha in zip(tracked, result.stdout.split()) if committed[path] == sha
+    }
+
+
+def blame_files(repo, paths, cache=None, max_workers=1):
+    """
+    Blame repository relative paths, from the cache where the file matches HEAD.
+
+    :param cache: revisions.ResultCache for blames, None to always run git blame
+    :return: {repo relative path: [author of each line]}, None for files that could not be blamed
+    """
+    clean = get_clean_blobs(repo, paths) if cache is not None else {}
+    blames = {}
+    todo = []
+    for path in paths:
+        entry = cache.get(clean[path]) if path in clean else None
+        if entry is not None:
+            blames[path] = [entry["authors"][index] for index in entry["lines"]]
+        else:
+            todo.append(path)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for path, authors in zip(todo, executor.map(lambda path: blame_file(repo, path), todo)):
+            blames[path] = authors
+            if authors is not None and path in clean:
+                names = sorted(set(authors))
+                index = {name: i for i, name in enumerate(names)}
+                cache.put(clean[path], {"authors": names, "lines": [index[name] for name in authors]})
+    return blames
+
+
+def statement_lines(path):
+    """First line of every statement of a file, [] if it does not parse."""
+    try:
+        with open(path, "rb") as f:
+            tree = ast.parse(f.read(), filename=path)
+    except (OSError, SyntaxError, ValueError):
+        return []
+    return [node.lineno for node in ast.walk(tree) if isinstance(node, ast.stmt)]
+
+
+def attribute_records(records, repo, cache=None, max_workers=1):
+    """
+    Charge the statements and messages of lint records to the authors of their lines.
+
+    :param records: module records with a path (see read_records)
+    :param repo: root of the git repository the files belong to
+    :return: {author: stats} with the STAT_KEYS counters
+    """
+    records = list(records)
+    paths = {}
+    for record in records:
+        path = os.path.relpath(os.path.abspath(record["path"]), repo)
+        if not path.startswith(".."):
+            paths[record["path"]] = path.replace(os.sep, "/")
+    blames = blame_files(repo, sorted(set(paths.values())), cache=cache, max_workers=max_workers)
+
+    authors = {}
+
+    def charge(author, stat):
+        stats = authors.setdefault(author, {key: 0 for key in STAT_KEYS})
+        stats[stat] = stats.get(stat, 0) + 1
+
+    for record in records:
+        lines = blames.get(paths.get(record["path"])) or []
+
+        def author_of(line):
+            return lines[line - 1] if line and 0 < line <= len(lines) else UNKNOWN_AUTHOR
+
+        for line in statement_lines(record["path"]):
+            charge(author_of(line), "statement")
+        for message in record["messages"]:
+            charge(author_of(message.get("line")), message["type"])
+    return authors
+
+
+def author_scores(jsonl_path, cache_dir=None, max_workers=1):
+    """
+    Per-author scores of a run, best first.
+
+    :param jsonl_path: JSON Lines output of the run
+    :param cache_dir: directory of the blame cache, None to disable it
+    :return: list of {"author", "score", "issues", "stats"}
+    """
+    records = list(read_records(jsonl_path))
+    if not records:
+        return []
+    repo = get_repo_root(os.path.dirname(os.path.abspath(records[0]["path"])))
+    cache = ResultCache(cache_dir, "blame") if cache_dir else None
+    scores = []
+    for author, stats in attribute_records(records, repo, cache=cache, max_workers=max_workers).items():
+        scores.append({
+            "author": author,
+            "score": get_stats_score(stats),
+            "issues": sum(stats[key] for key in STAT_KEYS if key != "statement"),
+            "stats": stats,
+        })
+    return sorted(scores, key=lambda row: (-(row["score"] or 0), row["author"]))
@@ -1,17 +1,44 @@
+import asyncio
 import datetime
 import importlib
 import logging
 import os
 import subprocess
+import time
 from optparse import OptionParser
 from pathlib import Path
 
 from django.conf import settings
 
+from .analyzers import QUICK_ANALYZERS
+from .blame import author_scores
+from .conf import get_audit_config
+from .engine import WorkerLimits
+from .lint import analyze_to_reports, get_data_score, lint_to_reports
+from .orchestrator import audit_async
+from .selection import FileSelector
+
 LOGGER = logging.getLogger(__name__)
 home = str(Path.home())
 
 
+def find_project_app(path):
+    """
+    (app name, app directory) of the innermost installed app containing path, None outside of them.
+
+    Matched against the directories of the app registry, so no app is imported or listed again.
+    """
+    from django.apps import apps
+
+    path = os.path.abspath(path)
+    found = None
+    for app_config in apps.get_app_configs():
+        app_dir = os.path.abspath(app_config.path)
+        if path.startswith(app_dir + os.sep) and (found is None or len(app_dir) > len(found[1])):
+            found = (app_config.name, app_dir)
+    return found
+
+
 class CodeAuditError(Exception):
     """Custom exception for CodeAudit errors."""
 
@@ -25,6 +52,23 @@ class CodeAudit:
         self.file_name = None
         self.html_output_file_path = None
         self.json_output_file_path = None
+        self.lint_stats = None
+        self.lint_score = None
+        self.fingerprints = {}
+        self.progress_callback = None
+        self.report_format = None
+        self.output_formats = None
+        self.gzip_outputs = bool((getattr(settings, 'CODE_AUDIT', {}) or {}).get("GZIP_OUTPUTS", False))
+        self.output_files = {}
+        self.use_async = False
+        self.analyzers = None
+        self.quick = False
+        self.by_author = False
+        self._file_selector = None
+        self._app_dirs = None
+        self.author_scores = None
+        self.git_metadata = {}
+        self._last_progress = 0.0
         self.git_user = None
 
     def parse(self):
@@ -58,52 +102,76 @@ class CodeAudit:
     def process(self):
         """get report based on cmd args"""
         try:
-            html_format = '.html'
-            app_list = self.get_django_project_apps()
-            if self.file_name:
-                # validate file exists
-                if not os.path.exists(self.file_name):
-                    app, relative_path = self.get_app_from_file(self.file_name, app_list)
-                    if app:
-                        self.file_name = os.path.join(app, relative_path)
-                    if not os.path.exists(self.file_name):
-                        file_list = self.find_file_in_apps(self.file_name, app_list)
-                        if file_list:
-                            print("File list: ", len(file_list))
-                            self.file_name = " ".join(file_list)
-
-                        else:
-                            if not self.file_name.endswith('.py'):
-                                dir_list = self.find_dir_in_apps(self.file_name, app_list)
-                                if dir_list:
-                                    print("Directory list: ", len(dir_list))
-                                    self.file_name = " ".join(dir_list)
-                                else:
-                                    raise FileNotFoundError(f"File not found: {self.file_name}")
-                            else:
-                                raise FileNotFoundError(f"File not found: {self.file_name}")
-
-                print("File to audit: ", self.file_name)
-                file_name = self.file_name.split('.')[0].split('/')
-                default_file_name = ' '.join(file_name).split()[-1:][0]
-
-                if not self.html_output_file_path:
-                    self.html_output_file_path = os.path.join(home, default_file_name + html_format)
-                print("Output report path: ", self.html_output_file_path)
-                print("Generating report...")
-                self.generate_json_html_report(
-                    self.file_name,
-                    self.html_output_file_path
-                )
-                print("Report generated at: ", self.html_output_file_path)
-            else:
-                print("Generate Report from app level")
-                self.generate_report_app_wise(app_list)
+            self.generate_json_html_report(*self.get_targets())
+            print("Report generated at: ", self.html_output_file_path)
+        except Exception as e:
+            LOGGER.exception("Error while processing CodeAudit")
+            raise CodeAuditError(f"Code audit failed: {e}") from e
 
+    async def process_async(self):
+        """
+        process() for a running event loop: the lint awaits the asyncio orchestrator
+        (see orchestrator.py), the targets are resolved in a worker thread.
+        """
+        try:
+            file_name, html_output_file_path = await asyncio.to_thread(self.get_targets)
+            await self.generate_json_html_report_async(file_name, html_output_file_path)
+            print("Report generated at: ", self.html_output_file_path)
         except Exception as e:
             LOGGER.exception("Error while processing CodeAudit")
             raise CodeAuditError(f"Code audit failed: {e}") from e
 
+    def get_targets(self):
+        """:return: (space separated targets to lint, HTML report path) of the file name or of the app level"""
+        html_format = '.html'
+        if not self.file_name:
+            print("Generate Report from app level")
+            return self.get_app_targets(self.get_django_project_apps())
+        if not os.path.exists(self.file_name):
+            # app discovery is only needed to resolve app relative/bare names
+            self.file_name = self.resolve_file_name(self.file_name, self.get_django_project_apps())
+
+        print("File to audit: ", self.file_name)
+        file_name = self.file_name.split('.')[0].split('/')
+        default_file_name = ' '.join(file_name).split()[-1:][0]
+
+        if not self.html_output_file_path:
+            self.html_output_file_path = os.path.join(home, default_file_name + html_format)
+        print("Output report path: ", self.html_output_file_path)
+        print("Generating report...")
+        return self.file_name, self.html_output_file_path
+
+    def resolve_file_name(self, file_name, app_list):
+        """
+        Resolve a file/directory name into existing paths.
+
+        :param file_name: path, app relative path, file name or directory name
+        :param app_list: list of project apps
+        :return: space separated list of existing paths
+        """
+        # validate file exists
+        if not os.path.exists(file_name):
+            app, relative_path = self.get_app_from_file(file_name, app_list)
+            if app:
+                file_name = os.path.join(app, relative_path)
+            if not os.path.exists(file_name):
+                file_list = self.find_file_in_apps(file_name, app_list)
+                if file_list:
+                    print("File list: ", len(file_list))
+                    file_name = " ".join(file_list)
+
+                else:
+                    if not file_name.endswith('.py'):
+                        dir_list = self.find_dir_in_apps(file_name, app_list)
+                        if dir_list:
+                            print("Directory list: ", len(dir_list))
+                            file_name = " ".join(dir_list)
+                        else:
+                            raise FileNotFoundError(f"File not found: {file_name}")
+                    else:
+                        raise FileNotFoundError(f"File not found: {file_name}")
+        return file_name
+
     def get_git_username(self):
         """Return the configured git username from local repo."""
         try:
@@ -114,11 +182,7 @@ class CodeAudit:
             return None
 
     def filter_by_file(self, file):
-        if file.strip() and '.py' in file.strip() and not os.path.basename(file).startswith(
-                "__") and not os.path.basename(file).startswith("000"):
-            return True
-        else:
-            return False
+        return bool(file.strip()) and self.get_file_selector().is_selected(file.strip())
 
     def get_files_changed_by_user(self, user, app_list):
         cmd = f'git log --author="{user}" --name-only --pretty=format:'
@@ -132,6 +196,11 @@ class CodeAudit:
 
     def generate_report_app_wise(self, app_list: list[str]):
         """Generate reports for all files inside an app."""
+        self.generate_json_html_report(*self.get_app_targets(app_list))
+        print("Report generated at: ", self.html_output_file_path)
+
+    def get_app_targets(self, app_list: list[str]):
+        """:return: (space separated files of the apps, HTML report path), by git user or file author if set"""
         file_list = []
         html_format = '.html'
         if not self.file_name:
@@ -143,24 +212,21 @@ class CodeAudit:
             elif self.git_user:
                 username = self.git_user
 
-        for app in app_list:
-            module = importlib.import_module(app)
-            app_path = Path(module.__file__).resolve()
-            if app_path.exists():
-                print("App path exist!")
-                for root, dirs, files in os.walk(app_path.parent):
+        if username and not self.file_author:
+            file_list.extend(self.get_files_changed_by_user(username, app_list))
+        else:
+            for app in app_list:
+                module = importlib.import_module(app)
+                app_path = Path(module.__file__).resolve()
+                if app_path.exists():
+                    print("App path exist!")
+                    app_files = self.get_file_selector().walk(app_path.parent)
                     if self.file_author:
                         print("Report Generating at Author level")
-                        file_list.extend(self.get_file_author_file(root, files))
-                    elif username:
-                        file_list.extend(self.get_files_changed_by_user(username, app_list))
+                        file_list.extend(self.get_file_author_file(app_files))
                     else:
-                        for f in files:
-                            if f.endswith(".py") and not f.startswith("__") and not f.startswith("000"):
-                                file_path = os.path.join(root, f)
-                                file_list.append(file_path)
+                        file_list.extend(app_files)
         print("Len of file list: ", len(file_list))
-        sorted(set())
         if file_list:
             self.file_name = " ".join(file_list)
         else:
@@ -173,70 +239,186 @@ class CodeAudit:
             self.html_output_file_path = os.path.join(home, default_file_name + html_format)
         print("Output report path: ", self.html_output_file_path)
         print("Generating report...")
-        self.generate_json_html_report(
-            self.file_name,
-            self.html_output_file_path
-        )
-        print("Report generated at: ", self.html_output_file_path)
+        return self.file_name, self.html_output_file_path
 
-    def get_file_author_file(self, root, files):
-        """get author specific file list"""
+    def get_file_author_file(self, file_paths, file_author=None):
+        """get author specific file list (of file_author, default self.file_author)"""
+        file_author = file_author or self.file_author
         file_list = []
-        matches = [f"current maintainer: {self.file_author}", f"author: {self.file_author}"]
+        matches = [f"current maintainer: {file_author}", f"author: {file_author}"]
         print("Matches: ", matches)
-        try:
-            for f in files:
-                if f.endswith(".py") and not f.startswith("__") and not f.startswith("000"):
-                    file_path = os.path.join(root, f)
-                    try:
-                        with open(file_path, "r", encoding="utf-8") as fh:
-                            file_str = fh.read()
-                            if any(x in file_str for x in matches):
-                                file_list.append(file_path)
-                    except (FileNotFoundError, OSError) as fe:
-                        LOGGER.warning("Could not read file %s: %s", file_path, fe)
-        except Exception as e:
-            LOGGER.exception("Error scanning directory: %s", files)
+        for file_path in file_paths:
+            try:
+                with open(file_path, "r", encoding="utf-8") as fh:
+                    file_str = fh.read()
+                    if any(x in file_str for x in matches):
+                        file_list.append(file_path)
+            except (FileNotFoundError, OSError) as fe:
+                LOGGER.warning("Could not read file %s: %s", file_path, fe)
         return file_list
 
     def get_pylintrc_file(self):
         """
-        :return:
+        :return: compact rcfile of the project configuration (PYLINTRC_PATH or the bundled pylintrc)
+        """
+        return self.get_config().project.rcfile
+
+    def get_config(self):
+        """
+        Project pylintrc merged with the per-app overrides, resolved once per process (see conf.py);
+        an app override is only looked up once a file of the app is linted.
         """
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        if getattr(settings, 'CODE_AUDIT', {}):
-            code_audit = getattr(settings, 'CODE_AUDIT', {})
-            default_pylintrc = code_audit.get("DEFAULT_PYLINTRC", False)
-            if not default_pylintrc:
-                pylintrc = code_audit.get("PYLINTRC_PATH", '')
-                if not pylintrc:
-                    pylintrc = os.path.join(base_dir, "pylintrc")
-                    return pylintrc
-        pylintrc = os.path.join(base_dir, "pylintrc")
-        return pylintrc
+        code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+        return get_audit_config(code_audit, base_dir=getattr(settings, 'BASE_DIR', None), locate_app=find_project_app)
+
+    def get_app_dirs(self):
+        """{app name: app directory} of the project apps."""
+        if self._app_dirs is None:
+            self._app_dirs = {
+                app: str(Path(importlib.import_module(app).__file__).resolve().parent)
+                for app in self.get_django_project_apps()
+            }
+        return self._app_dirs
 
 
 
     def generate_json_html_report(self, file_name, html_output_file_path):
         """generate json and html report in specific path"""
         try:
-            pylintrc = self.get_pylintrc_file()
+            if self.use_async:
+                asyncio.run(self.generate_json_html_report_async(file_name, html_output_file_path))
+                return
+            if self.quick:
+                self.generate_quick_report(file_name, html_output_file_path)
+                return
+            self.lint_stats, self.lint_score, self.fingerprints, self.output_files = lint_to_reports(
+                file_name, html_output_file_path=html_output_file_path, **self.get_lint_options()
+            )
+            self.json_output_file_path = self.output_files.get("jsonl")
+            self.score_authors()
+
+        except Exception as e:
+            LOGGER.exception("Error generating report for %s", file_name)
+            raise
+
+    async def generate_json_html_report_async(self, file_name, html_output_file_path):
+        """generate_json_html_report() awaiting the asyncio orchestrator; blocking steps run in worker threads."""
+        if self.quick:
+            await asyncio.to_thread(self.generate_quick_report, file_name, html_output_file_path)
+            return
+        options = await asyncio.to_thread(self.get_lint_options)
+        (self.lint_stats, self.lint_score, self.fingerprints, self.output_files,
+         self.git_metadata) = await audit_async(
+            file_name, html_output_file_path=html_output_file_path, timeout=self.get_lint_timeout(), **options
+        )
+        self.json_output_file_path = self.output_files.get("jsonl")
+        await asyncio.to_thread(self.score_authors)
+
+    def get_lint_options(self):
+        """Keyword arguments of lint.lint_to_reports and orchestrator.audit_async but the targets and report path."""
+        config = self.get_config()
+        return dict(
+            pylintrc=config.project.rcfile, config=config,
+            on_progress=self.report_progress, report_format=self.get_report_format(),
+            output_formats=self.get_output_formats(), use_gzip=self.gzip_outputs,
+            ast_cache_dir=self.get_ast_cache_dir(), limits=self.get_worker_limits(),
+            analyzers=self.get_analyzers(), selector=self.get_file_selector(),
+        )
 
-            if not os.path.exists(pylintrc):
-                raise FileNotFoundError(f"pylintrc not found at {pylintrc}")
+    def generate_quick_report(self, file_name, html_output_file_path):
+        """Quick audit: analyzers only, no pylint (the Django checks unless analyzers are configured)."""
+        self.lint_stats, self.lint_score, self.fingerprints, self.output_files = analyze_to_reports(
+            file_name, html_output_file_path, self.get_analyzers() or QUICK_ANALYZERS,
+            on_progress=self.report_progress, report_format=self.get_report_format(),
+            output_formats=self.get_output_formats(), use_gzip=self.gzip_outputs,
+            max_workers=self.get_worker_limits().max_workers, selector=self.get_file_selector(),
+        )
+        self.json_output_file_path = self.output_files.get("jsonl")
+        self.score_authors()
 
-            cmd = f"pylint --rcfile {pylintrc} {file_name} | pylint_report > {html_output_file_path}"
-            LOGGER.info("Running command: %s", cmd)
+    def get_score(self):
+        """
+        Score of the last run, 0.0 if nothing was linted.
 
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        Computed from the lint stats summed over every linted file, so each file
+        weighs by its statement count; report files are never read.
+        """
+        return get_data_score({"stats": self.lint_stats or {}})
+
+    def score_authors(self):
+        """Attribute the messages of the run to the authors of their lines when by_author is set."""
+        if self.by_author and self.json_output_file_path:
+            self.author_scores = author_scores(
+                self.json_output_file_path, cache_dir=self.get_result_cache_dir(),
+                max_workers=self.get_worker_limits().max_workers,
+            )
+
+    def get_report_format(self):
+        """"html" (single page) or "paginated" (index + lazily loaded per-file fragments)."""
+        if self.report_format:
+            return self.report_format
+        code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+        return code_audit.get("REPORT_FORMAT", "html")
+
+    def get_output_formats(self):
+        """Machine readable outputs written next to the HTML report; jsonl is always kept."""
+        output_formats = self.output_formats
+        if output_formats is None:
+            code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+            output_formats = code_audit.get("OUTPUT_FORMATS", ["jsonl"])
+        return ["jsonl"] + [f for f in output_formats if f != "jsonl"]
 
-            if result.returncode not in (0, 32):  # pylint returns 32 if no files
-                LOGGER.error("Pylint failed: %s", result.stderr.strip())
-                raise CodeAuditError(f"Pylint failed for {file_name}")
+    @staticmethod
+    def get_ast_cache_dir():
+        """
+        Directory of the parsed astroid module cache shared by pylint workers, None when disabled.
 
-        except Exception as e:
-            LOGGER.exception("Error generating report for %s", file_name)
-            raise
+        Off unless CODE_AUDIT["AST_CACHE_DIR"] is set; use a directory private to the project and its user.
+        """
+        code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+        cache_dir = code_audit.get("AST_CACHE_DIR")
+        return os.path.expanduser(str(cache_dir)) if cache_dir else None
+
+    def get_file_selector(self):
+        """Include/exclude rules of the files to audit (CODE_AUDIT INCLUDE, EXCLUDE, RESPECT_GITIGNORE)."""
+        if self._file_selector is None:
+            code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+            base_dir = getattr(settings, 'BASE_DIR', None)
+            self._file_selector = FileSelector.from_settings(code_audit, base_dir=str(base_dir) if base_dir else None)
+        return self._file_selector
+
+    @staticmethod
+    def get_result_cache_dir():
+        """Directory of the lint results cached by blob SHA for revision audits (see revisions.py)."""
+        code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+        return str(code_audit.get("RESULT_CACHE_DIR", os.path.join(home, ".cache", "code_audit", "results")))
+
+    @staticmethod
+    def get_worker_limits(max_workers=None):
+        """Worker pool limits (MAX_WORKERS, FILES_PER_WORKER, MAX_WORKER_RSS_MB, MAX_RETRIES)."""
+        return WorkerLimits.from_settings(getattr(settings, 'CODE_AUDIT', {}) or {}, max_workers=max_workers)
+
+    def get_analyzers(self):
+        """Dotted paths of the analyzers run next to pylint (CODE_AUDIT["ANALYZERS"], none by default)."""
+        if self.analyzers is not None:
+            return self.analyzers
+        code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+        return list(code_audit.get("ANALYZERS", []))
+
+    @staticmethod
+    def get_lint_timeout():
+        """Seconds allowed per pylint process in async runs (CODE_AUDIT["LINT_TIMEOUT"]), None for no limit."""
+        code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+        return code_audit.get("LINT_TIMEOUT")
+
+    def report_progress(self, progress):
+        """Print running progress at most once per second and forward it to progress_callback."""
+        now = time.monotonic()
+        if now - self._last_progress >= 1:
+            self._last_progress = now
+            print("Progress: ", progress)
+        if self.progress_callback:
+            self.progress_callback(progress)
 
     def get_django_project_apps(self, relative_path=False):
         """Retrieve Django project apps from settings."""
@@ -266,8 +448,7 @@ class CodeAudit:
                 third_party_apps.append(app)
         return project_apps
 
-    @staticmethod
-    def get_app_from_file(file_name: str, project_apps: list[str], is_join: bool = False):
+    def get_app_from_file(self, file_name: str, project_apps: list[str], is_join: bool = False):
         """
         Extract the app name and relative file path from a given file path.
 
@@ -287,8 +468,8 @@ class CodeAudit:
         path = Path(file_name)
         parts = path.parts
 
-        # Ignore migration files
-        if "migrations" in parts:
+        # Ignore excluded files (migrations, tests, ... see selection.py)
+        if self.get_file_selector().is_excluded(file_name):
             return "" if is_join else (None, None)
 
         # Find first app in the path
@@ -323,7 +504,7 @@ class CodeAudit:
             app_path = Path(module.__file__).resolve()
             if app_path.exists():
 
-                for root, dirs, files in os.walk(app_path.parent):
+                for root, dirs, files in self.get_file_selector().walk_tree(app_path.parent):
                     if filename in files:
                         matches.append(str(Path(root) / filename))
         return matches
@@ -341,7 +522,7 @@ class CodeAudit:
             module = importlib.import_module(app)
             app_path = Path(module.__file__).resolve()
             if app_path.exists():
-                for root, dirs, files in os.walk(app_path.parent):
+                for root, dirs, files in self.get_file_selector().walk_tree(app_path.parent):
                     if dir_name in dirs:
                         matches.append(str(Path(root) / dir_name))
         return matches
@@ -358,8 +539,7 @@ class CodeAudit:
             module = importlib.import_module(app)
             app_path = Path(module.__file__).resolve()
             if app_path.exists():
-                for root, dirs, files in os.walk(app_path.parent):
+                for root, dirs, files in self.get_file_selector().walk_tree(app_path.parent):
                     for dir in dirs:
-                        if dir != "migrations":
-                            dir_list.append(str(Path(root) / dir))
+                        dir_list.append(str(Path(root) / dir))
         return dir_list
@@ -0,0 +1,253 @@
+# reports/conf.py
+"""
+Resolved lint configuration, built once per process (no Django imports).
+
+The project pylintrc (``PYLINTRC_PATH``, or the bundled one) is parsed once
+and merged with per-app overrides into compact rcfiles (no comments, no blank
+lines) written under ``CONFIG_CACHE_DIR``. Each effective configuration has a
+fingerprint (pylint version + merged options) that names its rcfile and keys
+the revision result cache, and files are grouped by configuration so every
+group is linted by one batched worker pool run instead of one pylint per file.
+
+An app overrides the project configuration with a ``pylintrc`` (or
+``.pylintrc``) next to its ``__init__.py``, or one set in settings; it only
+lists the options that change. Overrides are looked up lazily, for the apps
+that contain linted files only (see AuditConfig.locate_app). ``disable`` and ``enable`` are added to the
+project's lists, other options replace the project's value::
+
+    CODE_AUDIT = {
+        "PYLINTRC_PATH": "/srv/project/pylintrc",
+        "APP_PYLINTRC": {"shop": "config/shop.pylintrc"},  # relative to BASE_DIR
+        "CONFIG_CACHE_DIR": "~/.cache/code_audit/config",
+    }
+"""
+import configparser
+import hashlib
+import logging
+import os
+import threading
+from importlib import metadata
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_PYLINTRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pylintrc")
+APP_PYLINTRC_NAMES = ("pylintrc", ".pylintrc")
+ADDITIVE_OPTIONS = ("disable", "enable")
+SECTION_ALIASES = {"MASTER": "MAIN"}
+
+_configs = {}
+
+
+def read_rcfile(path):
+    """:return: {section: {option: value}} of an rcfile, in file order"""
+    parser = configparser.ConfigParser(interpolation=None, strict=False)
+    parser.optionxform = str
+    with open(path, "r", encoding="utf-8") as f:
+        parser.read_file(f, source=path)
+    options = {}
+    for section in parser.sections():
+        name = SECTION_ALIASES.get(section.upper(), section)
+        options.setdefault(name, {}).update(parser.items(section, raw=True))
+    return options
+
+
+def merge_options(base, override):
+    """Options of base with those of override applied on top (see ADDITIVE_OPTIONS)."""
+    merged = {section: dict(values) for section, values in base.items()}
+    for section, values in override.items():
+        target = merged.setdefault(section, {})
+        for option, value in values.items():
+            if option in ADDITIVE_OPTIONS and target.get(option, "").strip() and value.strip():
+                value = f"{target[option].rstrip().rstrip(',')},\n{value.strip()}"
+            target[option] = value
+    return merged
+
+
+def render_options(options):
+    """rcfile text of merged options, without comments."""
+    lines = []
+    for section, values in options.items():
+        lines.append(f"[{section}]")
+        lines.extend(f"{option}={value}".replace("\n", "\n    ") for option, value in values.items())
+    return "\n".join(lines) + "\n"
+
+
+class LintConfig:
+    """
+    One effective configuration: the rcfile text pylint workers load and its fingerprint.
+
+    :param sources: rcfiles it was merged from, project first
+    """
+
+    def __init__(self, sources, options, config_dir):
+        self.sources = list(sources)
+        self.text = render_options(options)
+        key = hashlib.sha1(f"{metadata.version('pylint')}\0{self.text}".encode("utf-8"))
+        self.fingerprint = key.hexdigest()[:16]
+        self.config_dir = config_dir
+        self._rcfile = None
+
+    @property
+    def rcfile(self):
+        """Path of the compact rcfile, written the first time it is needed."""
+        if self._rcfile is None:
+            path = os.path.join(self.config_dir, f"{self.fingerprint}.pylintrc")
+            if not os.path.exists(path):
+                os.makedirs(self.config_dir, exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(self.text)
+                os.replace(tmp_path, path)
+            self._rcfile = path
+        return self._rcfile
+
+
+class AuditConfig:
+    """
+    Project configuration plus per-app overrides.
+
+    :param pylintrc: project rcfile
+    :param app_rcfiles: {app directory: override rcfile}
+    :param config_dir: directory the compact rcfiles are written to
+    :param app_pylintrc: {app name: override rcfile} of the apps found through locate_app
+    :param locate_app: callable returning (app name, app directory) of the innermost app containing
+        a path, or None; the override of an app is only looked up once one of its files is linted
+    """
+
+    def __init__(self, pylintrc, app_rcfiles=None, config_dir=None, app_pylintrc=None, locate_app=None):
+        if not os.path.exists(pylintrc):
+            raise FileNotFoundError(f"pylintrc not found at {pylintrc}")
+        self.pylintrc = pylintrc
+        self.config_dir = config_dir or os.path.join(os.path.expanduser("~"), ".cache", "code_audit", "config")
+        self.project_options = read_rcfile(pylintrc)
+        self.project = LintConfig([pylintrc], self.project_options, self.config_dir)
+        self.app_pylintrc = dict(app_pylintrc or {})
+        self.locate_app = locate_app
+        self.lock = threading.Lock()
+        self.apps = {}
+        self.app_dirs = []
+        self.by_fingerprint = {self.project.fingerprint: self.project}
+        for app_dir, rcfile in sorted((app_rcfiles or {}).items()):
+            self.add_app(app_dir, rcfile)
+        self.mtimes = self.get_mtimes()
+
+    @classmethod
+    def from_settings(cls, code_audit, base_dir=None, app_dirs=(), locate_app=None):
+        """
+        Build from settings.CODE_AUDIT: PYLINTRC_PATH (unless DEFAULT_PYLINTRC), APP_PYLINTRC
+        ({app name: rcfile}) and CONFIG_CACHE_DIR.
+
+        :param app_dirs: {app name: app directory} of the project apps, searched for pylintrc files
+        :param locate_app: see AuditConfig, for the apps that are not in app_dirs
+        """
+        pylintrc = BUNDLED_PYLINTRC
+        if code_audit.get("PYLINTRC_PATH") and not code_audit.get("DEFAULT_PYLINTRC", False):
+            pylintrc = resolve_path(code_audit["PYLINTRC_PATH"], base_dir)
+        configured = {
+            app: resolve_path(rcfile, base_dir) for app, rcfile in code_audit.get("APP_PYLINTRC", {}).items()
+        }
+        app_rcfiles = {}
+        for app, app_dir in dict(app_dirs).items():
+            rcfile = find_app_rcfile(app, app_dir, configured, pylintrc)
+            if rcfile:
+                app_rcfiles[app_dir] = rcfile
+        config_dir = code_audit.get("CONFIG_CACHE_DIR")
+        return cls(pylintrc, app_rcfiles, config_dir=os.path.expanduser(str(config_dir)) if config_dir else None,
+                   app_pylintrc=configured, locate_app=locate_app)
+
+    def add_app(self, app_dir, rcfile):
+        """Register the configuration of an app directory (the project's when rcfile is None)."""
+        config = self.project
+        if rcfile:
+            config = LintConfig([self.pylintrc, rcfile], merge_options(self.project_options, read_rcfile(rcfile)),
+                                self.config_dir)
+            # apps whose override changes nothing share the project configuration
+            config = self.by_fingerprint.setdefault(config.fingerprint, config)
+        self.apps[os.path.abspath(app_dir)] = config
+        # longest directory first, so nested apps win over their parents
+        self.app_dirs = sorted(self.apps, key=len, reverse=True)
+        return config
+
+    def get_mtimes(self):
+        sources = {path for config in [self.project, *self.apps.values()] for path in config.sources}
+        return {path: get_mtime(path) for path in sources}
+
+    def is_stale(self):
+        """True when one of the source rcfiles changed since the configuration was resolved."""
+        return any(get_mtime(path) != mtime for path, mtime in list(self.mtimes.items()))
+
+    def get_config(self, path):
+        """LintConfig of a file: the one of the innermost app containing it, else the project's."""
+        path = os.path.abspath(path)
+        for app_dir in self.app_dirs:
+            if path.startswith(app_dir + os.sep):
+                return self.apps[app_dir]
+        app = self.locate_app(path) if self.locate_app else None
+        if app is None:
+            return self.project
+        name, app_dir = app
+        with self.lock:
+            if os.path.abspath(app_dir) not in self.apps:
+                rcfile = find_app_rcfile(name, app_dir, self.app_pylintrc, self.pylintrc)
+                self.add_app(app_dir, rcfile)
+                if rcfile:
+                    self.mtimes.setdefault(rcfile, get_mtime(rcfile))
+            return self.apps[os.path.abspath(app_dir)]
+
+    def get_rcfiles(self, files):
+        """:return: {abs path: rcfile} of the files that are not linted with the project configuration"""
+        return {
+            os.path.abspath(path): config.rcfile
+            for config, paths in self.group_files(files).items() if config is not self.project for path in paths
+        }
+
+    def group_files(self, files):
+        """:return: {LintConfig: [files]}, the project configuration first"""
+        groups = {self.project: []}
+        for path in files:
+            groups.setdefault(self.get_config(path), []).append(path)
+        return {config: paths for config, paths in groups.items() if paths}
+
+
+def find_app_rcfile(app, app_dir, configured, pylintrc):
+    """:return: override rcfile of an app, the one set in settings first, or None"""
+    if app in configured:
+        return configured[app]
+    for name in APP_PYLINTRC_NAMES:
+        path = os.path.join(app_dir, name)
+        if os.path.isfile(path) and os.path.abspath(path) != pylintrc:  # e.g. the bundled one
+            return path
+    return None
+
+
+def get_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def resolve_path(path, base_dir=None):
+    path = os.path.expanduser(str(path))
+    if base_dir and not os.path.isabs(path):
+        path = os.path.join(str(base_dir), path)
+    return os.path.abspath(path)
+
+
+def get_audit_config(code_audit, base_dir=None, app_dirs=(), locate_app=None):
+    """
+    AuditConfig of these settings, resolved once per process; resolved again when
+    the settings or one of the rcfiles change.
+
+    :param locate_app: see AuditConfig; app overrides are then resolved as files are linted
+    """
+    app_dirs = dict(app_dirs)
+    key = (repr(sorted(code_audit.items(), key=lambda item: item[0])), str(base_dir), repr(sorted(app_dirs.items())),
+           locate_app)
+    config = _configs.get(key)
+    if config is None or config.is_stale():
+        config = _configs[key] = AuditConfig.from_settings(code_audit, base_dir=base_dir, app_dirs=app_dirs,
+                                                           locate_app=locate_app)
+        logger.debug("Resolved lint configuration %s (%s app override(s))", config.project.fingerprint,
+                     len(config.apps))
+    return config
@@ -0,0 +1,299 @@
+# reports/engine.py
+"""
+Pylint worker pool with a memory governor (no Django imports).
+
+Files are linted in chunks of ``FILES_PER_WORKER`` by short lived pylint
+subprocesses, so astroid's caches are dropped every chunk instead of growing for
+the whole run. Worker RSS is polled from /proc; a worker over the ceiling is
+killed and the files it had not reported yet are requeued, split in halves until
+the offending file runs alone. A file that still takes its worker down after
+``MAX_RETRIES`` attempts is quarantined: it is reported as a fatal message
+instead of failing the run.
+"""
+import logging
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+
+from .lint import (
+    STREAM_REPORTER_ARGS, LintError, ResultCollector, get_record_path, get_reporter_args, lint_env,
+    module_name_from_path,
+)
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.5
+QUARANTINE_SYMBOL = "worker-crashed"
+
+
+class WorkerLimits:
+    """Limits of the worker pool, see ``from_settings`` for the CODE_AUDIT keys."""
+
+    def __init__(self, max_workers=1, files_per_worker=100, max_rss_mb=2048, max_retries=2):
+        self.max_workers = max(1, max_workers)
+        self.files_per_worker = max(1, files_per_worker)
+        self.max_rss_mb = max_rss_mb
+        self.max_retries = max_retries
+
+    @classmethod
+    def from_settings(cls, code_audit, max_workers=None):
+        """
+        Build limits from settings.CODE_AUDIT.
+
+        MAX_WORKERS (default: CPU count), FILES_PER_WORKER (default 100),
+        MAX_WORKER_RSS_MB (default 2048, 0 disables the ceiling) and
+        MAX_RETRIES (default 2).
+        """
+        return cls(
+            max_workers=max_workers or code_audit.get("MAX_WORKERS") or os.cpu_count() or 1,
+            files_per_worker=code_audit.get("FILES_PER_WORKER", 100),
+            max_rss_mb=code_audit.get("MAX_WORKER_RSS_MB", 2048),
+            max_retries=code_audit.get("MAX_RETRIES", 2),
+        )
+
+
+def get_rss_mb(pid):
+    """Resident set size of a process in MB, None where /proc is not available."""
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+class Worker:
+    """One pylint subprocess linting a chunk of files; its output lines are pushed to a shared queue."""
+
+    def __init__(self, files, attempt, cmd, env, events):
+        self.files = files
+        self.attempt = attempt
+        self.cmd = cmd
+        self.reported = set()
+        self.stats = None
+        self.kill_reason = None
+        self.stderr = tempfile.TemporaryFile(mode="w+")
+        self.proc = subprocess.Popen(
+            [*cmd, *files], stdout=subprocess.PIPE, stderr=self.stderr, text=True, env=env,
+        )
+        self.thread = threading.Thread(target=self._read, args=(events,), daemon=True)
+        self.thread.start()
+
+    def _read(self, events):
+        for line in self.proc.stdout:
+            events.put((self, line))
+        events.put((self, None))
+
+    def kill(self, reason):
+        self.kill_reason = reason
+        self.proc.kill()
+
+    def finish(self):
+        """Wait for the process; return (returncode, stderr output)."""
+        returncode = self.proc.wait()
+        self.thread.join()
+        self.proc.stdout.close()
+        self.stderr.seek(0)
+        output = self.stderr.read().strip()
+        self.stderr.close()
+        return returncode, output
+
+    @property
+    def remaining(self):
+        return [path for path in self.files if path not in self.reported]
+
+
+def quarantine_record(path, reason):
+    """Result line of a quarantined file; not counted in the score."""
+    module = module_name_from_path(path)
+    return {
+        "module": module,
+        "path": path,
+        "stats": {},
+        "messages": [{
+            "type": "fatal",
+            "module": module,
+            "obj": "",
+            "line": 1,
+            "column": 0,
+            "path": path,
+            "symbol": QUARANTINE_SYMBOL,
+            "message": f"File quarantined, pylint worker crashed on it repeatedly ({reason})",
+            "message-id": "F0002",
+        }],
+    }
+
+
+def get_lint_command(pylintrc, ast_cache_dir=None, source_roots=None):
+    """
+    pylint command line of a worker, files excluded.
+
+    :param source_roots: directories put first on the worker's sys.path
+    """
+    cmd = ["pylint", "--rcfile", str(pylintrc), *get_reporter_args(STREAM_REPORTER_ARGS, ast_cache_dir)]
+    if source_roots:
+        cmd += ["--init-hook", f"import sys; sys.path[:0] = {list(source_roots)!r}"]
+    return cmd
+
+
+def chunk_files(files, size):
+    return [files[i:i + size] for i in range(0, len(files), size)]
+
+
+def chunk_by_rcfile(files, pylintrc, size, rcfiles=None, source_roots=None):
+    """
+    Chunks of files that share an rcfile, so each configuration is linted in batches.
+
+    :param rcfiles: {abs path: rcfile} of the files not linted with pylintrc (see conf.AuditConfig.get_rcfiles)
+    :param source_roots: {abs path: [directories]}, files with other source roots are never in the same chunk
+    :return: [(rcfile, chunk)]
+    """
+    chunks = {(pylintrc, ()): []}
+    for path in files:
+        key = ((rcfiles or {}).get(path, pylintrc), tuple((source_roots or {}).get(path, ())))
+        chunks.setdefault(key, []).append(path)
+    return [(rcfile, chunk) for (rcfile, _), paths in chunks.items() for chunk in chunk_files(paths, size)]
+
+
+class GovernedLint:
+    """
+    Lint files with a pool of recycled pylint workers and hand each module's
+    results to the sinks (see lint.stream_lint for the sink protocol).
+    """
+
+    def __init__(self, pylintrc, sinks, limits=None, on_progress=None, ast_cache_dir=None, extra_records=None):
+        self.pylintrc = pylintrc
+        self.ast_cache_dir = ast_cache_dir
+        self.env = lint_env(ast_cache_dir)
+        self.sinks = sinks
+        self.limits = limits or WorkerLimits()
+        self.on_progress = on_progress
+        self.events = queue.Queue()
+        self.pending = deque()
+        self.running = set()
+        self.quarantined = []
+        self.extra_records = extra_records
+        self.collector = None
+
+    def run(self, files, rcfiles=None, source_roots=None):
+        """
+        :param files: Python files to lint
+        :param rcfiles: {abs path: rcfile} of the files linted with another configuration than pylintrc
+        :param source_roots: {abs path: [directories]} imports of a file resolve against, first
+        :return: (global stats, score)
+        """
+        files = [os.path.abspath(path) for path in files]
+        source_roots = source_roots or {}
+        self.pending.extend(
+            (chunk, 0, get_lint_command(rcfile, self.ast_cache_dir, source_roots.get(chunk[0])))
+            for rcfile, chunk in chunk_by_rcfile(
+                files, self.pylintrc, self.limits.files_per_worker, rcfiles, source_roots,
+            )
+        )
+        self.collector = ResultCollector(self.sinks, self.on_progress, len(files), self.extra_records)
+        logger.info(
+            "Linting %s file(s) in %s chunk(s) with up to %s worker(s)",
+            len(files), len(self.pending), self.limits.max_workers,
+        )
+        try:
+            self._loop()
+        except BaseException:
+            for worker in self.running:
+                worker.kill("run aborted")
+                worker.finish()
+            self.collector.abort()
+            raise
+        return self.collector.close()
+
+    def _loop(self):
+        last_check = time.monotonic()
+        while self.pending or self.running:
+            while self.pending and len(self.running) < self.limits.max_workers:
+                chunk, attempt, cmd = self.pending.popleft()
+                self.running.add(Worker(chunk, attempt, cmd, self.env, self.events))
+            try:
+                worker, line = self.events.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                worker, line = None, None
+            if worker is not None:
+                if line is None:
+                    self._finish(worker)
+                else:
+                    self._handle_line(worker, line)
+            if time.monotonic() - last_check >= POLL_INTERVAL:
+                last_check = time.monotonic()
+                self._check_memory()
+
+    def _check_memory(self):
+        if not self.limits.max_rss_mb:
+            return
+        for worker in self.running:
+            rss = get_rss_mb(worker.proc.pid)
+            if rss is not None and rss > self.limits.max_rss_mb and worker.kill_reason is None:
+                logger.warning(
+                    "pylint worker %s uses %.0f MB (limit %s MB), recycling it",
+                    worker.proc.pid, rss, self.limits.max_rss_mb,
+                )
+                worker.kill(f"over {self.limits.max_rss_mb} MB")
+
+    def _handle_line(self, worker, line):
+        record = self.collector.feed(line)
+        if record is None:
+            return
+        if "module" not in record:
+            worker.stats = record["stats"]
+        elif record.get("path"):
+            worker.reported.add(get_record_path(record))
+
+    def _finish(self, worker):
+        self.running.discard(worker)
+        returncode, output = worker.finish()
+        if returncode > 0 and returncode & 32:  # usage error, retrying will not help
+            raise LintError(f"pylint failed ({returncode}): {output}")
+        if worker.stats is not None:
+            return
+
+        reason = worker.kill_reason or f"exit code {returncode}"
+        remaining = worker.remaining
+        logger.warning(
+            "pylint worker %s died (%s) with %s file(s) left: %s",
+            worker.proc.pid, reason, len(remaining), output[-500:],
+        )
+        if len(remaining) > 1:
+            # isolate the offending file; files that were not in flight are not charged an attempt
+            middle = len(remaining) // 2
+            self.pending.extend([
+                (remaining[:middle], worker.attempt, worker.cmd), (remaining[middle:], worker.attempt, worker.cmd),
+            ])
+        elif remaining and worker.attempt < self.limits.max_retries:
+            self.pending.append((remaining, worker.attempt + 1, worker.cmd))
+        elif remaining:
+            logger.error("Quarantining %s: pylint worker crashed on it %s time(s)", remaining[0], worker.attempt + 1)
+            self.quarantined.append(remaining[0])
+            self.collector.add(quarantine_record(remaining[0], reason))
+
+
+def governed_lint(files, pylintrc, sinks, limits=None, on_progress=None, ast_cache_dir=None, extra_records=None,
+                  rcfiles=None, source_roots=None):
+    """
+    Lint files with the governed worker pool.
+
+    :param extra_records: {abs_path: record}, or a Future of it, merged into pylint's results (see lint.ResultCollector)
+    :param rcfiles: {abs path: rcfile} of files with their own configuration, e.g. per-app overrides
+    :param source_roots: {abs path: [directories]} put first on sys.path for the file, e.g. the source dirs
+        of its monorepo project; files of different source roots never share a pylint process
+
+    :return: (global stats, score, quarantined file paths)
+    """
+    engine = GovernedLint(
+        pylintrc, sinks, limits=limits, on_progress=on_progress, ast_cache_dir=ast_cache_dir,
+        extra_records=extra_records,
+    )
+    stats, score = engine.run(files, rcfiles, source_roots)
+    return stats, score, engine.quarantined
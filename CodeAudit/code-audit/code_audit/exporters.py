@@ -0,0 +1,165 @@
+# reports/exporters.py
+"""Machine readable outputs (JSON Lines, SARIF, JUnit XML) written while pylint streams results."""
+import gzip
+import html
+import json
+import os
+import shutil
+import tempfile
+from xml.sax.saxutils import escape, quoteattr
+
+OUTPUT_SUFFIXES = {
+    "jsonl": ".jsonl",
+    "sarif": ".sarif",
+    "junit": ".junit.xml",
+}
+SARIF_LEVELS = {"fatal": "error", "error": "error", "warning": "warning"}
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+
+def open_output(path, use_gzip=False):
+    """Open a text output file, gzip compressed if requested."""
+    if use_gzip:
+        return gzip.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def get_output_path(base_path, output_format, use_gzip=False):
+    """Output path of a format next to the HTML report, e.g. report.sarif(.gz)."""
+    return os.path.splitext(base_path)[0] + OUTPUT_SUFFIXES[output_format] + (".gz" if use_gzip else "")
+
+
+class JsonLinesSink:
+    """Result store: one JSON line per module, the global stats line last."""
+
+    def __init__(self, json_output_file_path, use_gzip=False):
+        self.json_output_file_path = json_output_file_path
+        self.file = open_output(json_output_file_path, use_gzip)
+
+    def add_module(self, record):
+        self.file.write(json.dumps(record) + "\n")
+
+    def close(self, stats, score):
+        self.file.write(json.dumps({"stats": stats, "score": score}) + "\n")
+        self.file.close()
+
+    def abort(self):
+        self.file.close()
+
+
+class SarifSink:
+    """SARIF 2.1.0 log; results are written as they arrive, rules once the run closes."""
+
+    def __init__(self, sarif_output_file_path, use_gzip=False):
+        self.sarif_output_file_path = sarif_output_file_path
+        self.file = open_output(sarif_output_file_path, use_gzip)
+        self.rules = {}
+        self.first = True
+        self.file.write(f'{{"version": "2.1.0", "$schema": "{SARIF_SCHEMA}", "runs": [{{"results": [')
+
+    def add_module(self, record):
+        for message in record["messages"]:
+            if not message.get("path"):
+                continue
+            self.rules.setdefault(message["message-id"], message["symbol"])
+            result = {
+                "ruleId": message["message-id"],
+                "level": SARIF_LEVELS.get(message["type"], "note"),
+                "message": {"text": html.unescape(message["message"])},
+                "locations": [{
+                    "physicalLocation": {
+                        "artifactLocation": {"uri": message["path"].replace(os.sep, "/")},
+                        "region": {
+                            "startLine": message.get("line") or 1,
+                            "startColumn": (message.get("column") or 0) + 1,
+                        },
+                    },
+                    "logicalLocations": [{"fullyQualifiedName": message.get("obj") or message["module"]}],
+                }],
+            }
+            self.file.write(("" if self.first else ",") + json.dumps(result))
+            self.first = False
+
+    def close(self, stats, score):
+        driver = {
+            "name": "pylint",
+            "informationUri": "https://pylint.readthedocs.io",
+            "rules": [{"id": rule_id, "name": symbol} for rule_id, symbol in sorted(self.rules.items())],
+        }
+        properties = {"score": score, "statements": stats.get("statement", 0)}
+        self.file.write(f'], "tool": {{"driver": {json.dumps(driver)}}}, "properties": {json.dumps(properties)}}}]}}\n')
+        self.file.close()
+
+    def abort(self):
+        self.file.close()
+
+
+class JUnitSink:
+    """
+    JUnit XML with one testcase per module, failing when the module has messages.
+
+    Test cases are spooled to a temporary file so the suite totals can be written first.
+    """
+
+    def __init__(self, junit_output_file_path, use_gzip=False):
+        self.junit_output_file_path = junit_output_file_path
+        self.use_gzip = use_gzip
+        self.cases = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+        self.tests = 0
+        self.failures = 0
+
+    def add_module(self, record):
+        if not record.get("path"):
+            return
+        self.tests += 1
+        self.cases.write(f'<testcase classname={quoteattr(record["module"])} name={quoteattr(record["path"])}>')
+        if record["messages"]:
+            self.failures += 1
+            body = "\n".join(
+                f'{m["path"]}:{m.get("line")}:{m.get("column")}: {m["message-id"]} ({m["symbol"]}) '
+                f'{html.unescape(m["message"])}'
+                for m in record["messages"]
+            )
+            self.cases.write(
+                f'<failure type="pylint" message="{len(record["messages"])} message(s)">{escape(body)}</failure>'
+            )
+        self.cases.write("</testcase>\n")
+
+    def close(self, stats, score):
+        with open_output(self.junit_output_file_path, self.use_gzip) as f:
+            f.write('<?xml version="1.0" encoding="utf-8"?>\n')
+            f.write(
+                f'<testsuites><testsuite name="pylint" tests="{self.tests}" failures="{self.failures}" errors="0">'
+                f'<properties><property name="score" value="{score}"/></properties>\n'
+            )
+            self.cases.seek(0)
+            shutil.copyfileobj(self.cases, f)
+            f.write("</testsuite></testsuites>\n")
+        self.cases.close()
+
+    def abort(self):
+        self.cases.close()
+
+
+OUTPUT_SINKS = {
+    "jsonl": JsonLinesSink,
+    "sarif": SarifSink,
+    "junit": JUnitSink,
+}
+
+
+def build_output_sinks(base_path, output_formats, use_gzip=False):
+    """
+    Create the sinks of the requested machine readable formats.
+
+    :return: ({format: output path}, [sinks])
+    """
+    output_files = {}
+    sinks = []
+    for output_format in output_formats:
+        if output_format not in OUTPUT_SINKS:
+            raise ValueError(f"Unknown output format: {output_format}")
+        path = get_output_path(base_path, output_format, use_gzip)
+        output_files[output_format] = path
+        sinks.append(OUTPUT_SINKS[output_format](path, use_gzip))
+    return output_files, sinks
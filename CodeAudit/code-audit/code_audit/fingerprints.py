@@ -0,0 +1,100 @@
+# reports/fingerprints.py
+"""Stable, line-number independent fingerprints for pylint messages."""
+import hashlib
+import linecache
+import os
+import re
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def get_base_dir():
+    """settings.BASE_DIR when Django is configured, else the current working directory."""
+    try:
+        from django.conf import settings
+    except ImportError:
+        return os.getcwd()
+    base_dir = getattr(settings, "BASE_DIR", None) if settings.configured else None
+    return os.path.abspath(str(base_dir)) if base_dir else os.getcwd()
+
+
+def normalize_path(path, base_dir=None):
+    """
+    Path relative to the project directory, so fingerprints do not depend on where the audit runs
+    or on absolute/relative paths.
+
+    :param base_dir: project directory, default get_base_dir()
+    """
+    return os.path.relpath(os.path.abspath(path), base_dir or get_base_dir()).replace(os.sep, "/")
+
+
+def line_context(path, line):
+    """Source line of a message with whitespace collapsed ('' if unavailable)."""
+    if not path or not line:
+        return ""
+    return normalize_line(linecache.getline(path, line))
+
+
+def normalize_line(text):
+    """Line text with whitespace collapsed."""
+    return WHITESPACE_RE.sub(" ", text).strip()
+
+
+def fingerprint(path, symbol, obj, context, occurrence=0):
+    """
+    Hash a message by (file, symbol, enclosing object, normalized line), not by line number.
+
+    :return: 16 hex chars
+    """
+    key = f"{path}\0{symbol}\0{obj}\0{context}\0{occurrence}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def fingerprint_messages(messages, base_dir=None):
+    """
+    Fingerprint pylint_report JSON messages.
+
+    Identical messages (same file, symbol, object and line text) get an occurrence
+    counter so both are kept. A message may carry its line text in "context" when
+    the file on disk is not the one that was linted (e.g. a past revision).
+
+    :param base_dir: paths are made relative to it, default get_base_dir()
+    :return: {fingerprint: [path, line, symbol, message]}
+    """
+    base_dir = base_dir or get_base_dir()
+    linecache.checkcache()
+    fingerprints = {}
+    seen = {}
+    for message in messages:
+        if not (message.get("path") or "").endswith(".py"):  # e.g. pylintrc option messages
+            continue
+        path = normalize_path(message["path"], base_dir)
+        context = message["context"] if "context" in message else line_context(message["path"], message.get("line"))
+        key = (path, message.get("symbol"), message.get("obj", ""), context)
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        fingerprints[fingerprint(*key, occurrence)] = [
+            path, message.get("line"), message.get("symbol"), message.get("message", ""),
+        ]
+    return fingerprints
+
+
+def diff_fingerprints(old, new):
+    """
+    Compare two fingerprint mappings with set operations.
+
+    :return: {"new": [...], "fixed": [...], "unchanged": [...]} lists of [path, line, symbol, message]
+    """
+    old = old or {}
+    new = new or {}
+    old_keys = set(old)
+    new_keys = set(new)
+
+    def ordered(items):
+        return sorted(items, key=lambda item: (item[0], item[1] or 0, item[2] or ""))
+
+    return {
+        "new": ordered(new[key] for key in new_keys - old_keys),
+        "fixed": ordered(old[key] for key in old_keys - new_keys),
+        "unchanged": ordered(new[key] for key in new_keys & old_keys),
+    }
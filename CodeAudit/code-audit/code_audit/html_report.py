@@ -0,0 +1,199 @@
+# reports/html_report.py
+"""HTML report written module by module while pylint is still running."""
+import html
+import importlib.util
+import json
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+COLS2KEEP = ["line", "column", "symbol", "type", "obj", "message"]
+
+
+def get_report_css():
+    """CSS shipped with pylint_report, so reports look the same as before (found without importing it)."""
+    spec = importlib.util.find_spec("pylint_report")
+    if spec is None or not spec.origin:
+        return ""
+    css_file = Path(spec.origin).resolve().parent / "style" / "pylint-report.css"
+    try:
+        return css_file.read_text(encoding="utf-8")
+    except OSError:
+        return ""
+
+
+def render_counts(counter, label):
+    rows = "".join(
+        f"<tr><td>{html.escape(str(key))}</td><td>{count}</td></tr>"
+        for key, count in sorted(counter.items())
+    )
+    return f'<table class="dataframe"><tr><th>{label}</th><th># msg</th></tr>{rows}</table>'
+
+
+def render_messages(messages):
+    """Message table of one module; "message" is already escaped by the reporter."""
+    header = "".join(f"<th>{col}</th>" for col in COLS2KEEP)
+    rows = []
+    for message in sorted(messages, key=lambda m: (m.get("line") or 0, m.get("column") or 0)):
+        cells = [
+            message.get("message", "") if col == "message" else html.escape(str(message.get(col, "")))
+            for col in COLS2KEEP
+        ]
+        rows.append("<tr>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>")
+    return f'<table class="dataframe"><tr>{header}</tr>{"".join(rows)}</table>'
+
+
+def render_module_section(module, messages):
+    return (
+        f'<section><h2><span>Module:</span> <span id="{html.escape(module)}">'
+        f"<code>{html.escape(module)} ({len(messages)})</code></span></h2><hr>"
+        f"<table><tr><td>{render_counts(Counter(m['symbol'] for m in messages), 'symbol')}</td>"
+        f"<td>{render_counts(Counter(m['type'] for m in messages), 'type')}</td></tr></table>"
+        f"{render_messages(messages)}</section>\n"
+    )
+
+
+class IncrementalHtmlReport:
+    """
+    Result sink appending one section per module; the score and module index
+    are written when the run closes.
+    """
+
+    def __init__(self, html_output_file_path):
+        self.html_output_file_path = html_output_file_path
+        self.modules = []
+        self.file = open(html_output_file_path, "w", encoding="utf-8")
+        now = datetime.now()
+        self.file.write(
+            '<!DOCTYPE HTML>\n<html lang="en"><head><title>Pylint report</title><meta charset="utf-8">'
+            f"<style>{get_report_css()}</style></head><body>\n"
+            "<h1><u>Pylint report</u></h1>"
+            f"<small>Report generated on {now:%Y-%m-%d} at {now:%H:%M:%S}</small>\n"
+        )
+
+    def add_module(self, record):
+        if not record.get("path") and not record["messages"]:
+            return
+        self.modules.append((record["module"], len(record["messages"])))
+        if record["messages"]:
+            self.file.write(render_module_section(record["module"], record["messages"]))
+
+    def close(self, stats, score):
+        score = "" if score is None else f"{score:0.2f}"
+        index = "".join(
+            f'<li><a href="#{html.escape(module)}">{html.escape(module)}</a> ({count})</li>'
+            if count else f"<li>{html.escape(module)} (0)</li>"
+            for module, count in self.modules
+        )
+        self.file.write(
+            f'<h2><span>Score:</span><span class="score"> {score} </span><span> / 10 </span></h2>'
+            f"<ul>{index}</ul></body></html>\n"
+        )
+        self.file.close()
+
+    def abort(self):
+        self.file.close()
+
+
+class PaginatedHtmlReport:
+    """
+    Result sink writing a small index page plus one HTML fragment per module.
+
+    Fragments go to "<report>_files/<n>.html" on a thread pool while pylint keeps
+    running; the index only holds per-file summaries and fetches a fragment when
+    its row is expanded, so the initial page stays small whatever the project size.
+    """
+
+    def __init__(self, html_output_file_path, max_workers=4):
+        self.html_output_file_path = html_output_file_path
+        self.fragments_dir = get_fragments_dir(html_output_file_path)
+        os.makedirs(self.fragments_dir, exist_ok=True)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.futures = []
+        self.summaries = []
+
+    def add_module(self, record):
+        if not record.get("path") and not record["messages"]:
+            return
+        from .lint import get_stats_score
+
+        stats = record.get("stats") or {}
+        fragment = None
+        if record["messages"]:
+            fragment = f"{len(self.summaries)}.html"
+            self.futures.append(self.executor.submit(
+                self._write_fragment, os.path.join(self.fragments_dir, fragment),
+                record["module"], record["messages"],
+            ))
+        self.summaries.append({
+            "module": record["module"],
+            "path": record.get("path") or "",
+            "messages": len(record["messages"]),
+            "statements": stats.get("statement", 0),
+            "score": get_stats_score(stats) if stats else None,
+            "fragment": fragment,
+        })
+
+    @staticmethod
+    def _write_fragment(path, module, messages):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(render_module_section(module, messages))
+
+    def close(self, stats, score):
+        self.executor.shutdown(wait=True)
+        for future in self.futures:
+            future.result()  # surface write errors
+        score = "" if score is None else f"{score:0.2f}"
+        fragments_url = os.path.basename(self.fragments_dir)
+        rows = "".join(
+            "<tr><td>{module}</td><td>{path}</td><td>{statements}</td><td>{score}</td><td>{body}</td></tr>".format(
+                module=html.escape(summary["module"]),
+                path=html.escape(summary["path"]),
+                statements=summary["statements"],
+                score="" if summary["score"] is None else f"{summary['score']:0.2f}",
+                body=(
+                    f'<details data-src="{fragments_url}/{summary["fragment"]}">'
+                    f'<summary>{summary["messages"]} message(s)</summary><div>Loading...</div></details>'
+                    if summary["fragment"] else "0 messages"
+                ),
+            )
+            for summary in self.summaries
+        )
+        now = datetime.now()
+        with open(self.html_output_file_path, "w", encoding="utf-8") as f:
+            f.write(
+                '<!DOCTYPE HTML>\n<html lang="en"><head><title>Pylint report</title><meta charset="utf-8">'
+                f"<style>{get_report_css()}</style></head><body>\n"
+                "<h1><u>Pylint report</u></h1>"
+                f"<small>Report generated on {now:%Y-%m-%d} at {now:%H:%M:%S}</small>\n"
+                f'<h2><span>Score:</span><span class="score"> {score} </span><span> / 10 </span></h2>'
+                f"<p>{len(self.summaries)} file(s), {sum(s['messages'] for s in self.summaries)} message(s)</p>"
+                '<table class="dataframe"><tr><th>Module</th><th>File</th><th>Statements</th><th>Score</th>'
+                f"<th>Messages</th></tr>{rows}</table>\n"
+                f"<script>{LAZY_LOAD_SCRIPT}</script></body></html>\n"
+            )
+        with open(os.path.join(self.fragments_dir, "index.json"), "w", encoding="utf-8") as f:
+            json.dump(self.summaries, f)
+
+    def abort(self):
+        self.executor.shutdown(wait=True)
+
+
+LAZY_LOAD_SCRIPT = """
+document.querySelectorAll("details[data-src]").forEach(function (details) {
+  details.addEventListener("toggle", function () {
+    if (!details.open || details.dataset.loaded) { return; }
+    details.dataset.loaded = "1";
+    fetch(details.dataset.src)
+      .then(function (response) { return response.text(); })
+      .then(function (text) { details.querySelector("div").innerHTML = text; });
+  });
+});
+"""
+
+
+def get_fragments_dir(html_output_file_path):
+    """Directory holding the per-module fragments of a paginated report."""
+    return os.path.splitext(html_output_file_path)[0] + "_files"
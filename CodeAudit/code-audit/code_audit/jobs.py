@@ -0,0 +1,176 @@
+# reports/jobs.py
+"""
+Background audit runs triggered through the API.
+
+Jobs run in a small thread pool of the serving process, ``MAX_CONCURRENT_JOBS``
+at a time (default 1: each audit already uses a pool of pylint workers). A
+report has at most one active job; triggering it again returns that job.
+
+Progress is published to the in-process channel on every linted file (see
+progress.py) and saved on the job row every PROGRESS_SAVE_INTERVAL seconds,
+for watchers served by another process.
+
+The process that queued a job refreshes its heartbeat_at every
+HEARTBEAT_INTERVAL seconds until the job finishes. A queued or running job
+without a heartbeat for ``JOB_HEARTBEAT_TIMEOUT`` seconds (default 120) lost
+its process, e.g. to a restart: it is marked failed, so it neither blocks new
+runs of its report nor holds a slot of the scheduler.
+"""
+import datetime
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from .models import CodeAuditJob
+from .progress import channel
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_SAVE_INTERVAL = 2.0
+HEARTBEAT_INTERVAL = 30.0
+ABANDONED_ERROR = "The process running the audit stopped (no heartbeat), the job was abandoned"
+
+_executor = None
+_active_jobs = set()  # ids of the jobs queued or running in this process
+_active_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+        _executor = ThreadPoolExecutor(
+            max_workers=code_audit.get("MAX_CONCURRENT_JOBS", 1), thread_name_prefix="code_audit_job",
+        )
+        threading.Thread(target=send_heartbeats, name="code_audit_job_heartbeat", daemon=True).start()
+    return _executor
+
+
+def send_heartbeats():
+    """Refresh heartbeat_at of the jobs of this process every HEARTBEAT_INTERVAL seconds (daemon thread)."""
+    while True:
+        time.sleep(HEARTBEAT_INTERVAL)
+        with _active_lock:
+            job_ids = list(_active_jobs)
+        if not job_ids:
+            continue
+        try:
+            close_old_connections()
+            CodeAuditJob.objects.filter(pk__in=job_ids).update(heartbeat_at=timezone.now())
+        except Exception as e:
+            logger.warning(f"Could not save the heartbeat of audit jobs {job_ids}: {e}")
+
+
+def get_heartbeat_cutoff(now=None):
+    """Active jobs without a heartbeat since this time are abandoned."""
+    code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+    return (now or timezone.now()) - datetime.timedelta(seconds=code_audit.get("JOB_HEARTBEAT_TIMEOUT", 120))
+
+
+def is_abandoned(job, now=None):
+    return job.is_active and job.heartbeat_at < get_heartbeat_cutoff(now)
+
+
+def expire_stale_jobs(now=None):
+    """
+    Fail the queued and running jobs whose process stopped sending heartbeats.
+
+    :return: number of jobs marked failed
+    """
+    now = now or timezone.now()
+    expired = CodeAuditJob.objects.filter(
+        status__in=CodeAuditJob.ACTIVE_STATUSES, heartbeat_at__lt=get_heartbeat_cutoff(now),
+    ).update(status=CodeAuditJob.FAILED, finished_at=now, error=ABANDONED_ERROR)
+    if expired:
+        logger.warning(f"Marked {expired} abandoned audit job(s) as failed")
+    return expired
+
+
+def submit(report, level="file", by_author=False):
+    """
+    Queue an audit of a report, unless one is already queued or running.
+
+    :param by_author: also store the per-author scores of the run (see CodeAuditReport.run_audit)
+
+    At most one active job per report is enforced by the
+    code_audit_job_one_active_per_report constraint, so concurrent triggers
+    cannot both create one.
+
+    :return: (CodeAuditJob, created)
+    """
+    expire_stale_jobs()
+    for _ in range(2):
+        job = report.jobs.filter(status__in=CodeAuditJob.ACTIVE_STATUSES).first()
+        if job is not None:
+            return job, False
+        try:
+            with transaction.atomic():
+                job = CodeAuditJob.objects.create(report=report, level=level, by_author=by_author)
+        except IntegrityError:
+            continue  # another request created it first, return that one
+        break
+    else:
+        raise RuntimeError(f"Could not queue an audit of report {report.pk}")
+    with _active_lock:
+        _active_jobs.add(job.pk)
+    transaction.on_commit(lambda: get_executor().submit(run_job, job.pk))
+    return job, True
+
+
+def make_progress_publisher(job_id):
+    """LintProgress callback publishing every update and saving one every PROGRESS_SAVE_INTERVAL seconds."""
+    last_save = [0.0]
+
+    def publish(progress):
+        data = progress.as_dict()
+        channel.publish(job_id, {"status": CodeAuditJob.RUNNING, **data})
+        now = time.monotonic()
+        if now - last_save[0] >= PROGRESS_SAVE_INTERVAL:
+            last_save[0] = now
+            CodeAuditJob.objects.filter(pk=job_id).update(progress=data)
+
+    return publish
+
+
+def get_final_event(job):
+    return {"status": job.status, "pylint_score": job.pylint_score, "error": job.error, **job.progress}
+
+
+def run_job(job_id):
+    """Run a queued job in a worker thread and record its outcome."""
+    close_old_connections()
+    try:
+        job = CodeAuditJob.objects.select_related("report").get(pk=job_id)
+        CodeAuditJob.objects.filter(pk=job_id).update(status=CodeAuditJob.RUNNING, started_at=timezone.now())
+        channel.publish(job_id, {"status": CodeAuditJob.RUNNING})
+        publish = make_progress_publisher(job_id)
+        last_progress = []
+
+        def on_progress(progress):
+            last_progress[:] = [progress]
+            publish(progress)
+
+        try:
+            reports = job.report.run_audit(level=job.level, by_author=job.by_author, on_progress=on_progress)
+        except Exception as e:
+            logger.exception(f"Audit job {job_id} failed: {e}")
+            reports = []
+            job.error = str(e)
+        job.status = CodeAuditJob.COMPLETED if reports else CodeAuditJob.FAILED
+        if not reports and not job.error:
+            job.error = "The audit did not produce a report, see the server log"
+        job.pylint_score = job.report.pylint_score if reports else None
+        job.finished_at = timezone.now()
+        if last_progress:
+            job.progress = last_progress[0].as_dict()
+        job.save(update_fields=["status", "pylint_score", "progress", "error", "finished_at"])
+        channel.publish(job_id, get_final_event(job), finished=True)
+    finally:
+        with _active_lock:
+            _active_jobs.discard(job_id)
+        close_old_connections()
@@ -0,0 +1,416 @@
+# reports/lint.py
+"""Pylint helpers working on per-module JSON results instead of finished HTML reports."""
+import json
+import logging
+import os
+import subprocess
+import tempfile
+import time
+from concurrent.futures import Future
+
+from .astroid_cache import CACHE_DIR_ENV
+from .exporters import build_output_sinks
+from .fingerprints import fingerprint_messages
+from .html_report import IncrementalHtmlReport, PaginatedHtmlReport
+from .selection import FileSelector
+
+logger = logging.getLogger(__name__)
+
+STAT_KEYS = ["statement", "error", "warning", "refactor", "convention", "fatal", "info"]
+STREAM_REPORTER_ARGS = [
+    "--load-plugins", "code_audit.reporters",
+    "--output-format", "code_audit.reporters.StreamingJsonReporter",
+]
+
+
+class LintError(Exception):
+    """pylint could not be run or did not produce results."""
+
+
+def lint_env(ast_cache_dir=None):
+    """Environment for pylint subprocesses, with code_audit importable for the reporter plugin."""
+    env = os.environ.copy()
+    package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_parent, env.get("PYTHONPATH")]))
+    if ast_cache_dir:
+        env[CACHE_DIR_ENV] = ast_cache_dir
+    return env
+
+
+def get_reporter_args(reporter_args, ast_cache_dir=None):
+    """Reporter plugin arguments, plus the astroid cache plugin when a cache directory is set."""
+    if not ast_cache_dir:
+        return list(reporter_args)
+    return [
+        f"{arg},code_audit.astroid_cache" if arg == "code_audit.reporters" else arg
+        for arg in reporter_args
+    ]
+
+
+def get_target_files(file_name, selector=None):
+    """
+    Expand a CodeAudit target (space separated files/directories) into Python file paths.
+
+    Files named explicitly are always kept; directories are walked with the selector's rules.
+
+    :param file_name: resolved CodeAudit.file_name
+    :param selector: selection.FileSelector, default rules when None
+    :return: sorted list of absolute file paths
+    """
+    selector = selector or FileSelector()
+    files = set()
+    for target in (file_name or "").split():
+        if os.path.isfile(target):
+            files.add(os.path.abspath(target))
+        else:
+            files.update(selector.walk(target))
+    return sorted(files)
+
+
+def merge_for_files(index, files):
+    """Build pylint_report JSON data for a subset of indexed files."""
+    data = {"messages": [], "stats": {"by_module": {}, **{key: 0 for key in STAT_KEYS}}}
+    for path in files:
+        entry = index.get(os.path.abspath(path))
+        if not entry:
+            continue
+        data["messages"].extend(entry["messages"])
+        data["stats"]["by_module"][entry["module"]] = entry["stats"]
+        for key in STAT_KEYS:
+            data["stats"][key] += entry["stats"].get(key, 0)
+    return data
+
+
+def write_html_report(data, html_output_file_path):
+    """Render pylint_report HTML for JSON data."""
+    from pylint_report.pylint_report import json2html
+
+    with open(html_output_file_path, "w", encoding="utf-8") as f:
+        f.write(json2html(data, external_css=False))
+    return html_output_file_path
+
+
+def get_stats_score(stats):
+    """
+    Pylint score of global stats, None if nothing was linted.
+
+    Same evaluation as pylint_report.get_score, without importing pylint_report (and pandas).
+    """
+    statement = stats.get("statement", 0)
+    if not statement:
+        return None
+    if stats.get("fatal"):
+        return 0.0
+    penalty = 5 * stats.get("error", 0) + stats.get("warning", 0) + stats.get("refactor", 0) + stats.get("convention", 0)
+    return round(max(0.0, 10 * (1 - penalty / statement)), 2)
+
+
+def get_data_score(data):
+    """Pylint score of JSON data, 0.0 if nothing was linted."""
+    score = get_stats_score(data["stats"])
+    return score if score is not None else 0.0
+
+
+class LintProgress:
+    """Running counters of a streamed pylint run."""
+
+    def __init__(self, total_files=None):
+        self.total_files = total_files
+        self.files_done = 0
+        self.current_file = None
+        self.counts = {"error": 0, "warning": 0, "refactor": 0, "convention": 0, "fatal": 0, "info": 0}
+        self.started = time.monotonic()
+
+    def update(self, record):
+        if record.get("path"):
+            self.files_done += 1
+            self.current_file = record["path"]
+        for message in record["messages"]:
+            self.counts[message["type"]] = self.counts.get(message["type"], 0) + 1
+
+    def get_eta(self):
+        """Seconds left at the average pace so far, None before the first file."""
+        total = max(self.total_files or 0, self.files_done)
+        if not self.files_done:
+            return None
+        return (time.monotonic() - self.started) / self.files_done * (total - self.files_done)
+
+    def as_dict(self):
+        eta = self.get_eta()
+        return {
+            "files_done": self.files_done,
+            "total_files": max(self.total_files or 0, self.files_done),
+            "current_file": self.current_file,
+            "counts": dict(self.counts),
+            "elapsed": round(time.monotonic() - self.started, 1),
+            "eta": None if eta is None else round(eta, 1),
+        }
+
+    def __str__(self):
+        total = max(self.total_files or 0, self.files_done)
+        errors = self.counts["error"] + self.counts["fatal"]
+        return f"{self.files_done:,}/{total:,} files, {errors:,} errors so far"
+
+
+class FingerprintSink:
+    """Collect message fingerprints module by module."""
+
+    def __init__(self):
+        self.fingerprints = {}
+
+    def add_module(self, record):
+        self.fingerprints.update(fingerprint_messages(record["messages"]))
+
+    def close(self, stats, score):
+        pass
+
+    def abort(self):
+        pass
+
+
+class IndexSink:
+    """Collect results per linted file: {abs_path: {"module": str, "stats": dict, "messages": list}}."""
+
+    def __init__(self):
+        self.index = {}
+
+    def add_module(self, record):
+        if record.get("path"):
+            self.index[os.path.abspath(record["path"])] = {
+                "module": record["module"], "stats": record["stats"], "messages": record["messages"],
+            }
+
+    def close(self, stats, score):
+        pass
+
+    def abort(self):
+        pass
+
+
+class ResultCollector:
+    """
+    Merge the streamed results of several pylint processes and hand each module to the sinks.
+
+    Global stats are summed from the per-module results, so a partly completed
+    worker still contributes its modules, and records every worker repeats
+    (e.g. pylintrc messages) are only counted once. extra_records ({abs_path: record},
+    e.g. analyzer results) are merged into the pylint record of the same file;
+    those of files pylint did not report are added when the run closes. They may
+    be a concurrent.futures.Future still running next to pylint (see
+    analyzers.submit_analyzers), waited for when the first record arrives.
+    """
+
+    def __init__(self, sinks, on_progress=None, total_files=None, extra_records=None):
+        self.sinks = sinks
+        self.on_progress = on_progress
+        self.progress = LintProgress(total_files)
+        self.seen = set()
+        self.stats = {key: 0 for key in STAT_KEYS}
+        self.pending_extra_records = extra_records if isinstance(extra_records, Future) else None
+        self.extra_records = {} if self.pending_extra_records is not None else dict(extra_records or {})
+
+    def get_extra_records(self):
+        """extra_records, waiting for them if they are still computed."""
+        if self.pending_extra_records is not None:
+            self.extra_records = dict(self.pending_extra_records.result() or {})
+            self.pending_extra_records = None
+        return self.extra_records
+
+    def feed(self, line):
+        """
+        Handle one output line of a StreamingJsonReporter.
+
+        :return: the parsed record ({"stats": ...} for the closing line), None if the line is not JSON
+        """
+        try:
+            record = json.loads(line)
+        except ValueError:
+            logger.warning("Unexpected pylint output: %s", line.rstrip())
+            return None
+        if "module" in record:
+            self.add(record)
+        return record
+
+    def add(self, record):
+        path = get_record_path(record)
+        key = path or record["module"]
+        if key in self.seen:
+            return
+        self.seen.add(key)
+        extra_records = self.get_extra_records()
+        if path in extra_records:
+            record = merge_records(record, extra_records.pop(path))
+        if path:
+            for stat in STAT_KEYS:
+                self.stats[stat] += record["stats"].get(stat, 0)
+        for sink in self.sinks:
+            sink.add_module(record)
+        self.progress.update(record)
+        if self.on_progress:
+            self.on_progress(self.progress)
+
+    def close(self):
+        """:return: (global stats, score)"""
+        for record in list(self.get_extra_records().values()):
+            self.add(record)
+        score = get_stats_score(self.stats)
+        for sink in self.sinks:
+            sink.close(self.stats, score)
+        return self.stats, score
+
+    def abort(self):
+        for sink in self.sinks:
+            sink.abort()
+
+
+def merge_records(record, extra):
+    """
+    Add the messages and message counts of extra to a module record (statements are not added twice).
+
+    An extra message is dropped when the record has a message of the same check on the same line
+    (see analyzers.PYLINT_EQUIVALENTS), so the score does not count it twice.
+    """
+    from .analyzers import PYLINT_EQUIVALENTS
+
+    reported = {(message.get("line"), message["symbol"]) for message in record["messages"]}
+    messages = [
+        message for message in extra["messages"]
+        if not any((message.get("line"), symbol) in reported
+                   for symbol in PYLINT_EQUIVALENTS.get(message["symbol"], ()))
+    ]
+    stats = dict(record.get("stats") or {})
+    for message in messages:
+        stats[message["type"]] = stats.get(message["type"], 0) + 1
+    return {**record, "stats": stats, "messages": record["messages"] + messages}
+
+
+def display_path(path):
+    """Path of a file as pylint reports it: relative to the working directory when inside it."""
+    prefix = os.path.join(os.getcwd(), "")
+    return path[len(prefix):] if path.startswith(prefix) else path
+
+
+def module_name_from_path(path):
+    """Dotted module name of a file relative to the working directory."""
+    return os.path.splitext(os.path.relpath(path))[0].replace(os.sep, ".")
+
+
+def get_record_path(record):
+    return os.path.abspath(record["path"]) if record.get("path") else None
+
+
+def stream_lint(targets, pylintrc, sinks, on_progress=None, total_files=None, ast_cache_dir=None,
+                extra_records=None):
+    """
+    Run pylint and hand each module's results to the sinks as soon as pylint reports them.
+
+    Memory is bounded by the largest module, not by the message count of the run.
+
+    :param targets: files/directories to lint
+    :param sinks: objects with add_module(record), close(stats, score) and abort()
+    :param on_progress: called with a LintProgress after every module
+    :param total_files: expected file count, for progress reporting
+    :param ast_cache_dir: astroid cache directory, None to parse every module from scratch
+    :param extra_records: {abs_path: record}, or a Future of it, merged into pylint's results (see ResultCollector)
+    :return: (global stats, score)
+    """
+    cmd = ["pylint", "--rcfile", str(pylintrc), *get_reporter_args(STREAM_REPORTER_ARGS, ast_cache_dir), *targets]
+    logger.info("Running command: %s", " ".join(cmd))
+    collector = ResultCollector(sinks, on_progress, total_files, extra_records)
+    stats = None
+    try:
+        with tempfile.TemporaryFile(mode="w+") as stderr, subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=stderr, text=True, env=lint_env(ast_cache_dir)) as proc:
+            for line in proc.stdout:
+                record = collector.feed(line)
+                if record is not None and "module" not in record:
+                    stats = record["stats"]
+            returncode = proc.wait()
+            if returncode & 32 or stats is None:  # 32: usage error
+                stderr.seek(0)
+                raise LintError(f"pylint failed ({returncode}): {stderr.read().strip()}")
+    except Exception:
+        collector.abort()
+        raise
+    return collector.close()
+
+
+def build_report_sinks(html_output_file_path, report_format="html", output_formats=("jsonl",), use_gzip=False):
+    """
+    Sinks of a CodeAudit run: machine readable outputs, the HTML report and fingerprints.
+
+    :return: ({format: output path}, [sinks], FingerprintSink)
+    """
+    fingerprint_sink = FingerprintSink()
+    html_sink = PaginatedHtmlReport if report_format == "paginated" else IncrementalHtmlReport
+    output_files, sinks = build_output_sinks(html_output_file_path, output_formats, use_gzip)
+    sinks += [html_sink(html_output_file_path), fingerprint_sink]
+    return output_files, sinks, fingerprint_sink
+
+
+def analyze_to_reports(file_name, html_output_file_path, analyzers, on_progress=None, report_format="html",
+                       output_formats=("jsonl",), use_gzip=False, max_workers=1, selector=None):
+    """
+    Quick audit: run only the analyzers (no pylint) into the same reports and score.
+
+    :param analyzers: dotted paths of analyzers (see analyzers/)
+    :param selector: selection.FileSelector of the files to audit
+    :return: (global stats, score, fingerprints, {format: output path})
+    """
+    from .analyzers import run_analyzers
+
+    output_files, sinks, fingerprint_sink = build_report_sinks(
+        html_output_file_path, report_format, output_formats, use_gzip,
+    )
+    files = get_target_files(file_name, selector)
+    collector = ResultCollector(sinks, on_progress, len(files))
+    try:
+        for record in run_analyzers(files, analyzers, max_workers).values():
+            collector.add(record)
+    except Exception:
+        collector.abort()
+        raise
+    stats, score = collector.close()
+    return stats, score, fingerprint_sink.fingerprints, output_files
+
+
+def lint_to_reports(file_name, pylintrc, html_output_file_path, on_progress=None, report_format="html",
+                    output_formats=("jsonl",), use_gzip=False, ast_cache_dir=None, limits=None, analyzers=(),
+                    selector=None, config=None):
+    """
+    Stream a CodeAudit target through pylint into the HTML report and machine readable outputs,
+    all in the same pass.
+
+    :param report_format: "html" for a single page, "paginated" for an index plus lazily loaded fragments
+    :param output_formats: any of "jsonl", "sarif", "junit" (see exporters.py)
+    :param use_gzip: gzip the machine readable outputs
+    :param ast_cache_dir: astroid cache directory shared between runs (see astroid_cache.py)
+    :param limits: engine.WorkerLimits to lint with the governed worker pool, None for a single pylint run
+    :param analyzers: dotted paths of analyzers run while pylint runs, merged into its results (see analyzers/)
+    :param selector: selection.FileSelector of the files to audit; pylint gets the selected files, not directories
+    :param config: conf.AuditConfig; files of apps with their own configuration are linted in their own chunks
+    :return: (global stats, score, fingerprints, {format: output path})
+    """
+    output_files, sinks, fingerprint_sink = build_report_sinks(
+        html_output_file_path, report_format, output_formats, use_gzip,
+    )
+    files = get_target_files(file_name, selector)
+    extra_records = None
+    if analyzers:
+        from .analyzers import submit_analyzers
+
+        extra_records = submit_analyzers(files, analyzers, max_workers=limits.max_workers if limits else 1)
+    rcfiles = config.get_rcfiles(files) if config else None
+    if limits is not None or rcfiles:
+        from .engine import governed_lint
+
+        stats, score, _ = governed_lint(
+            files, pylintrc, sinks, limits=limits, on_progress=on_progress, ast_cache_dir=ast_cache_dir,
+            extra_records=extra_records, rcfiles=rcfiles,
+        )
+    else:
+        stats, score = stream_lint(
+            files, pylintrc, sinks, on_progress=on_progress, total_files=len(files),
+            ast_cache_dir=ast_cache_dir, extra_records=extra_records,
+        )
+    return stats, score, fingerprint_sink.fingerprints, output_files
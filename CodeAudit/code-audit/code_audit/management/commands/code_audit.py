@@ -1,17 +1,26 @@
 import datetime
+import os
+import subprocess
 from pathlib import Path
 
 from django.core.management.base import BaseCommand
 
-from .code_audit_by_commend import CodeAudit
-
 
 class Command(BaseCommand):
     help = "Run code quality checks using django-code-audit"
 
     def __init__(self):
         super().__init__()
-        self.audit = CodeAudit()
+        self._audit = None
+
+    @property
+    def audit(self):
+        """CodeAudit instance, imported on first use so `--help` and argument errors stay fast."""
+        if self._audit is None:
+            from .code_audit_by_commend import CodeAudit
+
+            self._audit = CodeAudit()
+        return self._audit
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -36,12 +45,78 @@ class Command(BaseCommand):
             const=True,  # if provided without value
             help="Git username/email to filter files. If no value is given, uses current git config user.name"
         )
+        parser.add_argument(
+            '--report-format',
+            choices=["html", "paginated"],
+            help='HTML report layout (default: CODE_AUDIT["REPORT_FORMAT"] or html)'
+        )
+        parser.add_argument(
+            '--format',
+            type=str,
+            help='Comma separated machine readable outputs: jsonl,sarif,junit '
+                 '(default: CODE_AUDIT["OUTPUT_FORMATS"] or jsonl)'
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='gzip the machine readable outputs'
+        )
+        parser.add_argument(
+            '--baseline',
+            type=str,
+            help='Baseline file of known messages; fail only on messages missing from it '
+                 '(created from this run if it does not exist)'
+        )
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help='Add the messages of this run to the baseline file; a whole project run also drops the '
+                 'messages that were fixed'
+        )
+        parser.add_argument(
+            '--analyzers',
+            type=str,
+            help='Comma separated dotted paths of analyzers run next to pylint, "builtin" for the bundled '
+                 'style, complexity and security analyzers (default: CODE_AUDIT["ANALYZERS"])'
+        )
+        parser.add_argument(
+            '--quick',
+            action='store_true',
+            help='Quick audit: run only the analyzers (Django checks by default), without pylint'
+        )
+        parser.add_argument(
+            '--by-author',
+            action='store_true',
+            help='Attribute every message to the author of its line (git blame) and print per-author scores'
+        )
+        parser.add_argument(
+            '--async',
+            dest='use_async',
+            action='store_true',
+            help='Run git metadata, file discovery and pylint chunks concurrently with the asyncio orchestrator'
+        )
+        parser.add_argument(
+            '--changed',
+            nargs='?',
+            const='HEAD',
+            help='Only audit Python files changed against a git ref (default: HEAD)'
+        )
 
     def handle(self, *args, **options):
         file_path = options.get('file')
         file_author = options.get('file_author')
         git_user = options.get('git_user')
         fail_under = options['fail_under']
+        self.audit.report_format = options.get('report_format')
+        if options.get('format'):
+            self.audit.output_formats = [f.strip() for f in options['format'].split(",") if f.strip()]
+        if options.get('gzip'):
+            self.audit.gzip_outputs = True
+        self.audit.use_async = options.get('use_async', False)
+        self.audit.quick = options.get('quick', False)
+        self.audit.by_author = options.get('by_author', False)
+        if options.get('analyzers'):
+            self.audit.analyzers = self.get_analyzer_paths(options['analyzers'])
 
         if file_path:
             target = file_path
@@ -54,18 +129,39 @@ class Command(BaseCommand):
             path_obj = Path(file_path)
             base_dir = path_obj.parts[0] if path_obj.parts else file_path
 
+        changed = options.get('changed')
         try:
-            pylint_score = self.run_audit(file_path, base_dir, level="file", file_author=file_author,
-                                          git_user=git_user)
+            if changed:
+                changed_files = self.get_changed_files(changed)
+                if not changed_files:
+                    self.stdout.write(self.style.SUCCESS(f"✅ No Python files changed against {changed}"))
+                    return None
+                pylint_score = self.run_changed_audit(changed_files, changed)
+            else:
+                pylint_score = self.run_audit(file_path, base_dir, level="file", file_author=file_author,
+                                              git_user=git_user)
         except Exception as ex_err:
             self.stderr.write(self.style.ERROR(
                 f"❌ An unexpected error occurred: {ex_err}"
             ))
+            if changed or options.get('baseline'):
+                # a gate whose audit did not run must not pass
+                exit(1)
             return None
 
-        # Extract score from pylint report
-        # (or use your existing logic)
-        score = pylint_score if pylint_score else 0.0
+        if self.audit.git_metadata:
+            self.stdout.write("🔖 git: " + ", ".join(f"{k}={v}" for k, v in self.audit.git_metadata.items()))
+        for output_format, output_path in self.audit.output_files.items():
+            self.stdout.write(f"📄 {output_format} output: {output_path}")
+        if self.audit.author_scores:
+            self.write_author_scores(self.audit.author_scores)
+
+        if options.get('baseline'):
+            # only a run over the whole project sees every known message, so only it prunes fixed ones
+            prune = not (changed or file_path or git_user)
+            return self.check_baseline(options['baseline'], options.get('update_baseline'), prune=prune)
+
+        score = pylint_score
 
         if score < fail_under:
             self.stderr.write(self.style.ERROR(
@@ -87,38 +183,102 @@ class Command(BaseCommand):
         self.audit.file_author = file_author
         self.audit.git_user = git_user
         self.audit.html_output_file_path = None  # let CodeAudit decide
-        reports = []
 
         # Call process (this generates reports based on setup)
         self.audit.process()
+        return self.audit.get_score()
 
-        # Collect outputs from process
-        if self.audit.html_output_file_path:
-            reports.append(self.audit.html_output_file_path)
-
-        output_file_path = self.audit.html_output_file_path
-        if isinstance(output_file_path, list):
-            score = 0.0
-            for output_path in output_file_path:
-                # Extract score from HTML
-                with open(output_path, "r") as f:
-                    html_content = f.read()
-                pylint_score = 0
-                import re
-                match = re.search(r'<span class="score">\s*([0-9.]+)\s*</span>', html_content)
-                if match:
-                    pylint_score = float(match.group(1))
-                    print(pylint_score)
-                    score += pylint_score
-            pylint_score = score / len(output_file_path) if len(output_file_path) else 0.0
-        else:
-            # Extract score from HTML
-            with open(output_file_path, "r") as f:
-                html_content = f.read()
-            pylint_score = 0
-            import re
-            match = re.search(r'<span class="score">\s*([0-9.]+)\s*</span>', html_content)
-            if match:
-                pylint_score = float(match.group(1))
-                print(pylint_score)
-        return pylint_score
+    def write_author_scores(self, scores):
+        self.stdout.write("👥 Scores by author:")
+        for row in scores:
+            score = "-" if row["score"] is None else f"{row['score']:.2f}"
+            self.stdout.write(
+                f"  {score:>6}  {row['issues']:>5} issue(s)  {row['stats']['statement']:>6} statement(s)  "
+                f"{row['author']}"
+            )
+
+    @staticmethod
+    def get_analyzer_paths(value):
+        """Expand the --analyzers value ("builtin" stands for the bundled analyzers)."""
+        from code_audit.analyzers import BUILTIN_ANALYZERS
+
+        paths = []
+        for item in (v.strip() for v in value.split(",")):
+            if item == "builtin":
+                paths.extend(BUILTIN_ANALYZERS)
+            elif item:
+                paths.append(item)
+        return paths
+
+    def get_changed_files(self, ref):
+        """
+        Python files added/modified against a git ref, plus untracked ones, kept by the file selection rules.
+
+        Both git commands list the files under the current directory relative to it, so this works
+        when manage.py is not at the repository root.
+        """
+        diff = subprocess.run(
+            ["git", "diff", "--name-only", "--relative", "--diff-filter=ACMR", ref, "--", "*.py"],
+            capture_output=True, text=True, check=True,
+        )
+        untracked = subprocess.run(
+            ["git", "ls-files", "--others", "--exclude-standard", "--", "*.py"],
+            capture_output=True, text=True, check=True,
+        )
+        files = set(diff.stdout.splitlines()) | set(untracked.stdout.splitlines())
+        selector = self.audit.get_file_selector()
+        return sorted(f for f in files if os.path.isfile(f) and selector.is_selected(f))
+
+    def run_changed_audit(self, files, ref):
+        """Audit an explicit list of files (no app discovery)."""
+        from .code_audit_by_commend import home
+
+        self.stdout.write(f"🔎 Auditing {len(files)} file(s) changed against {ref}")
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.audit.html_output_file_path = os.path.join(home, f"changed_files_{timestamp}.html")
+        self.audit.generate_json_html_report(" ".join(files), self.audit.html_output_file_path)
+        self.stdout.write(f"Report generated at: {self.audit.html_output_file_path}")
+        return self.audit.get_score()
+
+    def check_baseline(self, baseline_path, update=False, prune=False):
+        """
+        Fail only on messages whose fingerprint is not in the baseline.
+
+        :param update: merge the messages of this run into the baseline instead of checking
+        :param prune: with update, also drop the baseline messages this run no longer reports
+        """
+        from code_audit.baseline import Baseline, BaselineError
+
+        if self.audit.lint_stats is None:
+            self.stderr.write(self.style.ERROR("❌ No lint results to compare with the baseline"))
+            exit(1)
+
+        fingerprints = self.audit.fingerprints
+        baseline = Baseline(baseline_path)
+        if not baseline.exists():
+            count = baseline.update(fingerprints)
+            self.stdout.write(self.style.SUCCESS(f"✅ Baseline created with {count} message(s): {baseline_path}"))
+            return None
+
+        try:
+            new_messages = [fingerprints[fp] for fp in baseline.missing(fingerprints)]
+            if update:
+                fixed = baseline.read() - set(fingerprints) if prune else set()
+                count = baseline.update(fingerprints, remove=fixed)
+                self.stdout.write(f"📝 Baseline updated: {count} message(s), {len(fixed)} fixed message(s) removed")
+                return None
+        except BaselineError as e:
+            self.stderr.write(self.style.ERROR(f"❌ Invalid baseline, delete it to create a new one: {e}"))
+            exit(1)
+
+        if new_messages:
+            for path, line, symbol, message in sorted(new_messages, key=lambda m: (m[0], m[1] or 0)):
+                self.stderr.write(f"{path}:{line}: {symbol}: {message}")
+            self.stderr.write(self.style.ERROR(
+                f"❌ Audit failed. {len(new_messages)} new message(s) not in baseline"
+            ))
+            exit(1)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Audit passed. No new messages ({len(fingerprints)} known)"
+        ))
+        return None
@@ -0,0 +1,143 @@
+import datetime
+import gzip
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from code_audit.batch import get_batch_size
+from code_audit.models import CodeAuditReportLog, CodeAuditReportLogArchive
+
+DEFAULT_RETENTION_DAYS = 90
+
+
+class Command(BaseCommand):
+    help = "Roll CodeAuditReportLog rows older than the retention window into monthly archive rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days',
+            type=int,
+            default=None,
+            help='Archive logs older than this many days (default: CODE_AUDIT["LOG_RETENTION_DAYS"] or 90)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Number of log rows archived and deleted per transaction'
+        )
+        parser.add_argument(
+            '--export',
+            type=str,
+            default=None,
+            help='Also append the raw rows to this gzip compressed JSON Lines file once their deletion is committed'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many rows would be archived'
+        )
+
+    def handle(self, *args, **options):
+        code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+        days = options.get('older_than_days')
+        if days is None:
+            days = code_audit.get("LOG_RETENTION_DAYS", DEFAULT_RETENTION_DAYS)
+        batch_size = options.get('batch_size') or get_batch_size()
+        cutoff = timezone.now() - datetime.timedelta(days=days)
+
+        old_logs = CodeAuditReportLog.objects.filter(run_at__lt=cutoff)
+        if options.get('dry_run'):
+            self.stdout.write(f"🔎 {old_logs.count()} log row(s) older than {cutoff:%Y-%m-%d} would be archived")
+            return
+
+        if options.get('export') and transaction.get_connection().in_atomic_block:
+            raise CommandError("--export writes the rows of committed batches, run it outside of a transaction")
+        export = gzip.open(options['export'], "at", encoding="utf-8") if options.get('export') else None
+        archived = 0
+        try:
+            while True:
+                with transaction.atomic():
+                    rows = list(
+                        old_logs.order_by("run_at", "pk").values(
+                            "pk", "report_id", "pylint_score", "report_path", "run_at")[:batch_size]
+                    )
+                    if not rows:
+                        break
+                    self.archive_rows(rows)
+                    CodeAuditReportLog.objects.filter(pk__in=[row["pk"] for row in rows]).delete()
+                    if export:
+                        # only rows whose deletion committed: a rolled back batch is exported by its retry
+                        transaction.on_commit(lambda rows=rows: self.export_rows(export, rows))
+                archived += len(rows)
+                self.stdout.write(f"📦 Archived {archived} log row(s)...")
+        finally:
+            if export:
+                export.close()
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Archived {archived} log row(s) older than {cutoff:%Y-%m-%d}"))
+
+    @staticmethod
+    def export_rows(export, rows):
+        for row in rows:
+            export.write(json.dumps(row, default=str) + "\n")
+        export.flush()
+
+    @staticmethod
+    def archive_rows(rows):
+        """Merge log rows into their (report, month) archive rows."""
+        buckets = {}
+        for row in rows:
+            period_start = timezone.localtime(row["run_at"]).date().replace(day=1)
+            buckets.setdefault((row["report_id"], period_start), []).append(row)
+
+        existing = {
+            (archive.report_id, archive.period_start): archive
+            for archive in CodeAuditReportLogArchive.objects.select_for_update().filter(
+                report_id__in={report_id for report_id, _ in buckets},
+                period_start__in={period_start for _, period_start in buckets},
+            )
+        }
+
+        to_create = []
+        to_update = []
+        for (report_id, period_start), bucket in buckets.items():
+            bucket.sort(key=lambda row: row["run_at"])
+            scores = [row["pylint_score"] for row in bucket]
+            archive = existing.get((report_id, period_start))
+            if archive is None:
+                to_create.append(CodeAuditReportLogArchive(
+                    report_id=report_id,
+                    period_start=period_start,
+                    run_count=len(scores),
+                    min_score=min(scores),
+                    max_score=max(scores),
+                    avg_score=sum(scores) / len(scores),
+                    last_score=scores[-1],
+                    report_path=bucket[-1]["report_path"],
+                    first_run_at=bucket[0]["run_at"],
+                    last_run_at=bucket[-1]["run_at"],
+                ))
+                continue
+
+            total = archive.avg_score * archive.run_count + sum(scores)
+            archive.run_count += len(scores)
+            archive.avg_score = total / archive.run_count
+            archive.min_score = min(archive.min_score, *scores)
+            archive.max_score = max(archive.max_score, *scores)
+            archive.first_run_at = min(archive.first_run_at, bucket[0]["run_at"])
+            if bucket[-1]["run_at"] >= archive.last_run_at:
+                archive.last_run_at = bucket[-1]["run_at"]
+                archive.last_score = scores[-1]
+                archive.report_path = bucket[-1]["report_path"]
+            to_update.append(archive)
+
+        CodeAuditReportLogArchive.objects.bulk_create(to_create)
+        CodeAuditReportLogArchive.objects.bulk_update(
+            to_update,
+            ["run_count", "avg_score", "min_score", "max_score", "first_run_at", "last_run_at",
+             "last_score", "report_path"],
+        )
@@ -0,0 +1,135 @@
+import datetime
+import importlib
+import os
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from code_audit.batch import get_batch_size
+from code_audit.code_audit import CodeAudit
+from code_audit.models import CodeAuditReport, CodeAuditReportLog
+from code_audit.revisions import GitError, RevisionAudit, get_repo_root, list_revisions
+
+
+class Command(BaseCommand):
+    help = ("Audit past git revisions from git objects (no checkout) and add them to the "
+            "CodeAuditReportLog history of the reports")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'revisions',
+            nargs='?',
+            default='HEAD',
+            help='Commit range to audit, anything git rev-list accepts (default: the whole history of HEAD)'
+        )
+        parser.add_argument(
+            '--max-count',
+            type=int,
+            default=None,
+            help='Only audit the newest N commits of the range'
+        )
+        parser.add_argument(
+            '--first-parent',
+            action='store_true',
+            help='Follow only the first parent of merge commits'
+        )
+        parser.add_argument(
+            '--module',
+            type=str,
+            default=None,
+            help='Only backfill reports of this module_name'
+        )
+        parser.add_argument(
+            '--report',
+            type=int,
+            nargs='+',
+            default=None,
+            help='Only backfill these CodeAuditReport ids'
+        )
+        parser.add_argument(
+            '--max-workers',
+            type=int,
+            default=None,
+            help='Concurrent pylint workers (default: CODE_AUDIT["MAX_WORKERS"] or the CPU count)'
+        )
+
+    def handle(self, *args, **options):
+        audit = CodeAudit()
+        app_list = audit.get_django_project_apps()
+        config = audit.get_config()
+        analyzers = audit.get_analyzers()
+        try:
+            repo = get_repo_root(os.getcwd())
+            revisions = list_revisions(
+                repo, options['revisions'], max_count=options.get('max_count'),
+                first_parent=options.get('first_parent', False),
+            )
+        except GitError as e:
+            raise CommandError(str(e)) from e
+
+        reports = CodeAuditReport.objects.all()
+        if options.get('module'):
+            reports = reports.filter(module_name=options['module'])
+        if options.get('report'):
+            reports = reports.filter(pk__in=options['report'])
+        targets = {}
+        for report in reports:
+            targets.setdefault(report.file_name or "", []).append(report)
+        self.stdout.write(f"🔎 {len(revisions)} revision(s), {len(targets)} target(s)")
+
+        created = 0
+        for file_name, grouped in targets.items():
+            paths = self.get_repo_paths(audit, file_name, app_list, repo)
+            if not paths:
+                continue
+            done = set(
+                CodeAuditReportLog.objects.filter(report__in=grouped).exclude(commit="")
+                .values_list("report_id", "commit")
+            )
+            todo = [revision for revision in revisions
+                    if any((report.pk, revision[0]) not in done for report in grouped)]
+            engine = RevisionAudit(
+                repo, paths, config, audit.get_result_cache_dir(), limits=audit.get_worker_limits(options.get('max_workers')),
+                analyzers=analyzers, selector=audit.get_file_selector(),
+            )
+            results = engine.run(todo)
+
+            logs = [
+                CodeAuditReportLog(
+                    report=report,
+                    pylint_score=result.score,
+                    report_path="",
+                    fingerprints=result.fingerprints,
+                    commit=result.commit,
+                    run_at=datetime.datetime.fromtimestamp(result.timestamp, tz=datetime.timezone.utc),
+                )
+                for result in results for report in grouped if (report.pk, result.commit) not in done
+            ]
+            CodeAuditReportLog.objects.bulk_create(logs, batch_size=get_batch_size())
+            created += len(logs)
+            self.stdout.write(
+                f"📈 {file_name or 'app level'}: {len(results)} revision(s), "
+                f"{engine.linted} blob(s) linted, {len(logs)} log row(s)"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Backfilled {created} log row(s) at {timezone.now():%Y-%m-%d %H:%M}"))
+
+    def get_repo_paths(self, audit, file_name, app_list, repo):
+        """Repository relative paths of a report target, as resolved in the working tree."""
+        if file_name:
+            try:
+                targets = audit.resolve_file_name(file_name, app_list).split()
+            except FileNotFoundError as e:
+                self.stderr.write(f"⚠️ Skipping {file_name}: {e}")
+                return []
+        else:
+            targets = [str(Path(importlib.import_module(app).__file__).resolve().parent) for app in app_list]
+        paths = []
+        for target in targets:
+            path = os.path.relpath(os.path.realpath(target), repo).replace(os.sep, "/")
+            if path.startswith(".."):
+                self.stderr.write(f"⚠️ Skipping {target}: outside the repository {repo}")
+                continue
+            paths.append(path)
+        return paths
@@ -1,13 +1,24 @@
+import asyncio
 import datetime
 import importlib
 import logging
 import os
 import subprocess
+import time
 from optparse import OptionParser
 from pathlib import Path
 
 from django.conf import settings
 
+from code_audit.analyzers import QUICK_ANALYZERS
+from code_audit.blame import author_scores
+from code_audit.code_audit import find_project_app
+from code_audit.conf import get_audit_config
+from code_audit.engine import WorkerLimits
+from code_audit.lint import analyze_to_reports, get_data_score, lint_to_reports
+from code_audit.orchestrator import audit_async
+from code_audit.selection import FileSelector
+
 LOGGER = logging.getLogger(__name__)
 home = str(Path.home())
 
@@ -25,6 +36,22 @@ class CodeAudit:
         self.file_name = None
         self.html_output_file_path = None
         self.json_output_file_path = None
+        self.lint_stats = None
+        self.lint_score = None
+        self.fingerprints = {}
+        self.progress_callback = None
+        self.report_format = None
+        self.output_formats = None
+        self.gzip_outputs = bool((getattr(settings, 'CODE_AUDIT', {}) or {}).get("GZIP_OUTPUTS", False))
+        self.output_files = {}
+        self.use_async = False
+        self.analyzers = None
+        self.quick = False
+        self.by_author = False
+        self._file_selector = None
+        self.author_scores = None
+        self.git_metadata = {}
+        self._last_progress = 0.0
         self.git_user = None
 
     def parse(self):
@@ -64,10 +91,10 @@ class CodeAudit:
     def process(self):
         """get report based on cmd args"""
         html_format = '.html'
-        app_list = self.get_django_project_apps()
         if self.file_name:
-            # validate file exists
+            # validate file exists; app discovery is only needed to resolve app relative/bare names
             if not os.path.exists(self.file_name):
+                app_list = self.get_django_project_apps()
                 app, relative_path = self.get_app_from_file(self.file_name, app_list)
                 if app:
                     self.file_name = os.path.join(app, relative_path)
@@ -106,7 +133,7 @@ class CodeAudit:
             print("Report generated at: ", self.html_output_file_path)
         else:
             print("Generate Report from app level")
-            self.generate_report_app_wise(app_list)
+            self.generate_report_app_wise(self.get_django_project_apps())
 
 
     def get_git_username(self):
@@ -119,10 +146,7 @@ class CodeAudit:
             return None
 
     def filter_by_file(self, file):
-        if file.strip() and '.py' in file.strip() and not os.path.basename(file).startswith("__") and not os.path.basename(file).startswith("00"):
-            return True
-        else:
-            return False
+        return bool(file.strip()) and self.get_file_selector().is_selected(file.strip())
 
     def get_files_changed_by_user(self, user, app_list):
         cmd = f'git log --author="{user}" --name-only --pretty=format:'
@@ -145,23 +169,21 @@ class CodeAudit:
             elif self.git_user:
                 username = self.git_user
 
-        for app in app_list:
-            module = importlib.import_module(app)
-            app_path = Path(module.__file__).resolve()
-            if app_path.exists():
-                print("App path exist!")
-                for root, dirs, files in os.walk(app_path.parent):
+        if self.git_user and not self.file_author:
+            if username:
+                file_list.extend(self.get_files_changed_by_user(username, app_list))
+        else:
+            for app in app_list:
+                module = importlib.import_module(app)
+                app_path = Path(module.__file__).resolve()
+                if app_path.exists():
+                    print("App path exist!")
+                    app_files = self.get_file_selector().walk(app_path.parent)
                     if self.file_author:
                         print("Report Generating at Author level")
-                        file_list.extend(self.get_file_author_file(root, files))
-                    elif self.git_user:
-                        if username:  # --git-user used without value
-                            file_list.extend(self.get_files_changed_by_user(username, app_list))
+                        file_list.extend(self.get_file_author_file(app_files))
                     else:
-                        for f in files:
-                            if f.endswith(".py") and not f.startswith("__") and not f.startswith("00"):
-                                file_path = os.path.join(root, f)
-                                file_list.append(file_path)
+                        file_list.extend(app_files)
         file_list = sorted(set(file for file in file_list))
         print("Len of file list: ", len(file_list))
         if file_list:
@@ -182,61 +204,159 @@ class CodeAudit:
         )
         print("Report generated at: ", self.html_output_file_path)
 
-    def get_file_author_file(self, root, files):
+    def get_file_author_file(self, file_paths):
         """get author specific file list"""
         file_list = []
         matches = [f"current maintainer: {self.file_author}", f"author: {self.file_author}"]
         print("Matches: ", matches)
-        try:
-            for f in files:
-                if f.endswith(".py") and not f.startswith("__") and not f.startswith("000"):
-                    file_path = os.path.join(root, f)
-                    try:
-                        with open(file_path, "r", encoding="utf-8") as fh:
-                            file_str = fh.read()
-                            if any(x in file_str for x in matches):
-                                file_list.append(file_path)
-                    except (FileNotFoundError, OSError) as fe:
-                        LOGGER.warning("Could not read file %s: %s", file_path, fe)
-        except Exception as e:
-            LOGGER.exception("Error scanning directory: %s", files)
+        for file_path in file_paths:
+            try:
+                with open(file_path, "r", encoding="utf-8") as fh:
+                    file_str = fh.read()
+                    if any(x in file_str for x in matches):
+                        file_list.append(file_path)
+            except (FileNotFoundError, OSError) as fe:
+                LOGGER.warning("Could not read file %s: %s", file_path, fe)
         return file_list
 
     def get_pylintrc_file(self):
         """
-        :return:
+        :return: compact rcfile of the project configuration (PYLINTRC_PATH or the bundled pylintrc)
         """
-        app_dir = Path(__file__).resolve().parent.parent.parent
-        if getattr(settings, 'CODE_AUDIT', {}):
-            code_audit = getattr(settings, 'CODE_AUDIT', {})
-            default_pylintrc = code_audit.get("DEFAULT_PYLINTRC", False)
-            if not default_pylintrc:
-                pylintrc = code_audit.get("PYLINTRC_PATH", '')
-                if not pylintrc:
-                    pylintrc = app_dir / "pylintrc"
-                    return pylintrc
-        pylintrc = app_dir / "pylintrc"
-        return pylintrc
+        return self.get_config().project.rcfile
 
-    @staticmethod
-    def generate_json_html_report(file_name, html_output_file_path):
+    def get_config(self):
+        """
+        Project pylintrc merged with the per-app overrides, resolved once per process (see conf.py);
+        an app override is only looked up once a file of the app is linted.
+        """
+        code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+        return get_audit_config(code_audit, base_dir=getattr(settings, 'BASE_DIR', None), locate_app=find_project_app)
+
+    def generate_json_html_report(self, file_name, html_output_file_path):
         """generate json and html report in specific path"""
         try:
-            app_dir = Path(__file__).resolve().parent.parent.parent
-            pylintrc = app_dir / "pylintrc"
-
-            if not pylintrc.exists():
-                print(f"Error: pylintrc file not found at {pylintrc}")
+            if self.quick:
+                self.generate_quick_report(file_name, html_output_file_path)
                 return
-            # BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-            # # base_dir = os.getcwd() + '/code_audit'
-            # pylintrc = os.path.join(BASE_DIR, "pylintrc")
-            param1 = 'pylint ' + f'--rcfile {pylintrc} ' + file_name + '|' + 'pylint_report  > ' + html_output_file_path
-            os.system(param1)
+            config = self.get_config()
+            pylintrc = config.project.rcfile
+            options = dict(
+                on_progress=self.report_progress, report_format=self.get_report_format(),
+                output_formats=self.get_output_formats(), use_gzip=self.gzip_outputs,
+                ast_cache_dir=self.get_ast_cache_dir(), limits=self.get_worker_limits(),
+                analyzers=self.get_analyzers(), selector=self.get_file_selector(), config=config,
+            )
+            if self.use_async:
+                (self.lint_stats, self.lint_score, self.fingerprints, self.output_files,
+                 self.git_metadata) = asyncio.run(audit_async(
+                    file_name, pylintrc, html_output_file_path, timeout=self.get_lint_timeout(), **options
+                ))
+            else:
+                self.lint_stats, self.lint_score, self.fingerprints, self.output_files = lint_to_reports(
+                    file_name, pylintrc, html_output_file_path, **options
+                )
+            self.json_output_file_path = self.output_files.get("jsonl")
+            self.score_authors()
         except Exception as e:
             LOGGER.exception("Error generating report for %s", file_name)
             raise
 
+    def generate_quick_report(self, file_name, html_output_file_path):
+        """Quick audit: analyzers only, no pylint (the Django checks unless analyzers are configured)."""
+        self.lint_stats, self.lint_score, self.fingerprints, self.output_files = analyze_to_reports(
+            file_name, html_output_file_path, self.get_analyzers() or QUICK_ANALYZERS,
+            on_progress=self.report_progress, report_format=self.get_report_format(),
+            output_formats=self.get_output_formats(), use_gzip=self.gzip_outputs,
+            max_workers=self.get_worker_limits().max_workers, selector=self.get_file_selector(),
+        )
+        self.json_output_file_path = self.output_files.get("jsonl")
+        self.score_authors()
+
+    def get_score(self):
+        """
+        Score of the last run, 0.0 if nothing was linted.
+
+        Computed from the lint stats summed over every linted file, so each file
+        weighs by its statement count; report files are never read.
+        """
+        return get_data_score({"stats": self.lint_stats or {}})
+
+    def score_authors(self):
+        """Attribute the messages of the run to the authors of their lines when by_author is set."""
+        if self.by_author and self.json_output_file_path:
+            self.author_scores = author_scores(
+                self.json_output_file_path, cache_dir=self.get_result_cache_dir(),
+                max_workers=self.get_worker_limits().max_workers,
+            )
+
+    def get_report_format(self):
+        """"html" (single page) or "paginated" (index + lazily loaded per-file fragments)."""
+        if self.report_format:
+            return self.report_format
+        code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+        return code_audit.get("REPORT_FORMAT", "html")
+
+    def get_output_formats(self):
+        """Machine readable outputs written next to the HTML report; jsonl is always kept."""
+        output_formats = self.output_formats
+        if output_formats is None:
+            code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+            output_formats = code_audit.get("OUTPUT_FORMATS", ["jsonl"])
+        return ["jsonl"] + [f for f in output_formats if f != "jsonl"]
+
+    @staticmethod
+    def get_ast_cache_dir():
+        """
+        Directory of the parsed astroid module cache shared by pylint workers, None when disabled.
+
+        Off unless CODE_AUDIT["AST_CACHE_DIR"] is set; use a directory private to the project and its user.
+        """
+        code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+        cache_dir = code_audit.get("AST_CACHE_DIR")
+        return os.path.expanduser(str(cache_dir)) if cache_dir else None
+
+    def get_file_selector(self):
+        """Include/exclude rules of the files to audit (CODE_AUDIT INCLUDE, EXCLUDE, RESPECT_GITIGNORE)."""
+        if self._file_selector is None:
+            code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+            base_dir = getattr(settings, 'BASE_DIR', None)
+            self._file_selector = FileSelector.from_settings(code_audit, base_dir=str(base_dir) if base_dir else None)
+        return self._file_selector
+
+    @staticmethod
+    def get_result_cache_dir():
+        """Directory of the lint results cached by blob SHA for revision audits (see revisions.py)."""
+        code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+        return str(code_audit.get("RESULT_CACHE_DIR", os.path.join(home, ".cache", "code_audit", "results")))
+
+    @staticmethod
+    def get_worker_limits(max_workers=None):
+        """Worker pool limits (MAX_WORKERS, FILES_PER_WORKER, MAX_WORKER_RSS_MB, MAX_RETRIES)."""
+        return WorkerLimits.from_settings(getattr(settings, 'CODE_AUDIT', {}) or {}, max_workers=max_workers)
+
+    def get_analyzers(self):
+        """Dotted paths of the analyzers run next to pylint (CODE_AUDIT["ANALYZERS"], none by default)."""
+        if self.analyzers is not None:
+            return self.analyzers
+        code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+        return list(code_audit.get("ANALYZERS", []))
+
+    @staticmethod
+    def get_lint_timeout():
+        """Seconds allowed per pylint process in async runs (CODE_AUDIT["LINT_TIMEOUT"]), None for no limit."""
+        code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+        return code_audit.get("LINT_TIMEOUT")
+
+    def report_progress(self, progress):
+        """Print running progress at most once per second and forward it to progress_callback."""
+        now = time.monotonic()
+        if now - self._last_progress >= 1:
+            self._last_progress = now
+            print("Progress: ", progress)
+        if self.progress_callback:
+            self.progress_callback(progress)
+
     def get_django_project_apps(self, relative_path=False):
         """Retrieve Django project apps from settings."""
         import importlib
@@ -265,8 +385,7 @@ class CodeAudit:
                 third_party_apps.append(app)
         return project_apps
 
-    @staticmethod
-    def get_app_from_file(file_name: str, project_apps: list[str], is_join: bool = False):
+    def get_app_from_file(self, file_name: str, project_apps: list[str], is_join: bool = False):
         """
         Extract the app name and relative file path from a given file path.
 
@@ -286,8 +405,8 @@ class CodeAudit:
         path = Path(file_name)
         parts = path.parts
 
-        # Ignore migration files
-        if "migrations" in parts:
+        # Ignore excluded files (migrations, tests, ... see selection.py)
+        if self.get_file_selector().is_excluded(file_name):
             return "" if is_join else (None, None)
 
         # Find first app in the path
@@ -322,7 +441,7 @@ class CodeAudit:
             app_path = Path(module.__file__).resolve()
             if app_path.exists():
 
-                for root, dirs, files in os.walk(app_path.parent):
+                for root, dirs, files in self.get_file_selector().walk_tree(app_path.parent):
                     if filename in files:
                         matches.append(str(Path(root) / filename))
         return matches
@@ -340,7 +459,7 @@ class CodeAudit:
             module = importlib.import_module(app)
             app_path = Path(module.__file__).resolve()
             if app_path.exists():
-                for root, dirs, files in os.walk(app_path.parent):
+                for root, dirs, files in self.get_file_selector().walk_tree(app_path.parent):
                     if dir_name in dirs:
                         matches.append(str(Path(root) / dir_name))
         return matches
@@ -357,8 +476,7 @@ class CodeAudit:
             module = importlib.import_module(app)
             app_path = Path(module.__file__).resolve()
             if app_path.exists():
-                for root, dirs, files in os.walk(app_path.parent):
+                for root, dirs, files in self.get_file_selector().walk_tree(app_path.parent):
                     for dir in dirs:
-                        if dir != "migrations":
-                            dir_list.append(str(Path(root) / dir))
+                        dir_list.append(str(Path(root) / dir))
         return dir_list
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from code_audit.batch import run_projects
+from code_audit.projects import ManifestError, read_manifest
+
+
+class Command(BaseCommand):
+    help = ("Audit the Django projects of a monorepo manifest in one run, with one report per app "
+            "and project (see projects.py)")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'manifest',
+            nargs='?',
+            default=None,
+            help='JSON manifest of the projects (default: CODE_AUDIT["MONOREPO_MANIFEST"])'
+        )
+        parser.add_argument(
+            '--project',
+            type=str,
+            nargs='+',
+            default=None,
+            help='Only audit these projects of the manifest'
+        )
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='Only list the projects and the apps discovered in their settings'
+        )
+        parser.add_argument(
+            '--max-workers',
+            type=int,
+            default=None,
+            help='Concurrent pylint workers (default: CODE_AUDIT["MAX_WORKERS"] or the CPU count)'
+        )
+
+    def handle(self, *args, **options):
+        manifest = options.get('manifest')
+        try:
+            if options.get('list'):
+                code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+                for project in read_manifest(manifest or code_audit.get("MONOREPO_MANIFEST", "")):
+                    if options.get('project') and project.name not in options['project']:
+                        continue
+                    self.stdout.write(f"📦 {project.name} ({project.settings}): {len(project.apps)} app(s)")
+                    for app, app_dir in project.apps.items():
+                        self.stdout.write(f"   {app}: {app_dir}")
+                return
+
+            completed, monorepo = run_projects(
+                options.get('project'), manifest=manifest, max_workers=options.get('max_workers'),
+            )
+        except (ManifestError, ValueError) as e:
+            raise CommandError(str(e)) from e
+
+        self.stdout.write(f"🔎 {monorepo.linted} file(s) linted, {monorepo.cached} from the result cache")
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {completed} report(s) completed in {len(monorepo.projects)} project(s)"
+        ))
@@ -0,0 +1,95 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from code_audit.jobs import get_executor
+from code_audit.models import CodeAuditReport, CodeAuditSchedule
+from code_audit.scheduler import AuditScheduler, is_quiet, parse_quiet_hours
+
+
+class Command(BaseCommand):
+    help = "Re-audit scheduled reports whose files or lint configuration changed (see scheduler.py)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run a single tick (e.g. from cron) and wait for the queued audits'
+        )
+        parser.add_argument(
+            '--max-sleep',
+            type=int,
+            default=300,
+            help='Longest sleep between two ticks in seconds'
+        )
+        parser.add_argument(
+            '--max-concurrent',
+            type=int,
+            default=None,
+            help='Queued plus running audits allowed at once (default: CODE_AUDIT["MAX_CONCURRENT_JOBS"] or 1)'
+        )
+        parser.add_argument(
+            '--quiet-hours',
+            default=None,
+            help='Local time window without checks, e.g. 08:00-18:00 (default: CODE_AUDIT["QUIET_HOURS"])'
+        )
+        parser.add_argument(
+            '--create-missing',
+            type=int,
+            default=None,
+            metavar='MINUTES',
+            help='Schedule the reports without a schedule every MINUTES before running'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only print what would be queued'
+        )
+
+    def handle(self, *args, **options):
+        code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+        try:
+            quiet_hours = parse_quiet_hours(options.get('quiet_hours') or code_audit.get("QUIET_HOURS"))
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+
+        if options.get('create_missing'):
+            created = CodeAuditSchedule.objects.bulk_create(
+                [CodeAuditSchedule(report=report, interval_minutes=options['create_missing'])
+                 for report in CodeAuditReport.objects.filter(schedule__isnull=True).only("id")],
+                ignore_conflicts=True,
+            )
+            self.stdout.write(f"🗓️ Scheduled {len(created)} report(s) every {options['create_missing']} min")
+
+        scheduler = AuditScheduler(
+            max_concurrent=options.get('max_concurrent'), quiet_hours=quiet_hours, dry_run=options.get('dry_run'),
+        )
+        if options.get('once'):
+            if is_quiet(quiet_hours, timezone.now()):
+                self.stdout.write("🌙 Quiet hours, nothing checked")
+                return
+            summary = self.tick(scheduler)
+            if summary["queued"] and not options.get('dry_run'):
+                self.stdout.write("⏳ Waiting for the queued audits...")
+                get_executor().shutdown(wait=True)
+                self.stdout.write(self.style.SUCCESS("✅ Queued audits finished"))
+            return
+
+        self.stdout.write(f"🕒 Scheduler started (max {scheduler.max_concurrent} concurrent audit(s))")
+        try:
+            while True:
+                self.tick(scheduler)
+                time.sleep(scheduler.get_sleep_seconds(options['max_sleep']))
+        except KeyboardInterrupt:
+            self.stdout.write("🛑 Scheduler stopped")
+
+    def tick(self, scheduler):
+        summary = scheduler.tick()
+        if summary["due"]:
+            self.stdout.write(
+                f"🔎 {summary['due']} due: {summary['queued']} queued, {summary['unchanged']} unchanged, "
+                f"{summary['busy']} busy, {summary['deferred']} deferred, {summary['failed']} failed"
+            )
+        return summary
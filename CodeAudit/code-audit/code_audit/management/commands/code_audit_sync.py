@@ -0,0 +1,121 @@
+import importlib
+import os
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from code_audit.batch import get_batch_size, run_reports_concurrently
+from code_audit.code_audit import CodeAudit
+from code_audit.models import CodeAuditReport
+
+
+class Command(BaseCommand):
+    help = "Create/refresh CodeAuditReport rows for every project app and module"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-stale',
+            action='store_true',
+            help='Do not delete reports whose module no longer exists'
+        )
+        parser.add_argument(
+            '--run',
+            action='store_true',
+            help='Audit all synced reports in one batched run after syncing'
+        )
+        parser.add_argument(
+            '--max-workers',
+            type=int,
+            default=None,
+            help='pylint worker processes for --run (default: CODE_AUDIT["MAX_WORKERS"] or the CPU count)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Number of rows per bulk query'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options.get('batch_size') or get_batch_size()
+        audit = CodeAudit()
+        app_list = audit.get_django_project_apps()
+
+        discovered = self.discover_modules(audit, app_list)
+        self.stdout.write(f"🔎 Discovered {len(discovered)} module(s) in {len(app_list)} app(s)")
+
+        CodeAuditReport.objects.bulk_create(
+            [CodeAuditReport(module_name=module_name, file_name=file_name)
+             for module_name, file_name in discovered],
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["project", "module_name", "file_name"],
+            update_fields=["updated_at"],
+        )
+
+        if not options.get('keep_stale'):
+            deleted = self.delete_stale(discovered, batch_size)
+            self.stdout.write(f"🧹 Removed {deleted} stale report(s)")
+
+        if options.get('run'):
+            reports = self.get_synced_reports(discovered)
+            self.stdout.write(f"🚀 Auditing {len(reports)} report(s)...")
+            completed = run_reports_concurrently(reports, max_workers=options.get('max_workers'))
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {completed}/{len(reports)} report(s) completed"
+            ))
+
+    @staticmethod
+    def discover_modules(audit, app_list):
+        """Return sorted (module_name, file_name) pairs for every app and its Python modules."""
+        discovered = set()
+        for app in app_list:
+            module = importlib.import_module(app)
+            app_path = Path(module.__file__).resolve()
+            if not app_path.exists():
+                continue
+            for path in audit.get_file_selector().walk(app_path.parent):
+                file_name = audit.get_app_from_file(path, app_list, is_join=True)
+                if file_name:
+                    discovered.add((app, file_name))
+                    discovered.add((app, app))  # app level report
+        return sorted(discovered)
+
+    @staticmethod
+    def sync_shaped(module_names):
+        """Filter matching rows created by this command ("app" or "app/<path>" file names)."""
+        query = Q()
+        for module_name in module_names:
+            query |= Q(module_name=module_name, file_name=module_name)
+            query |= Q(module_name=module_name, file_name__startswith=f"{module_name}/")
+        return query
+
+    def get_synced_reports(self, discovered):
+        keys = set(discovered)
+        module_names = {module_name for module_name, _ in discovered}
+        if not module_names:
+            return []
+        return [
+            report for report in CodeAuditReport.objects.filter(self.sync_shaped(module_names), project="")
+            if (report.module_name, report.file_name) in keys
+        ]
+
+    def delete_stale(self, discovered, batch_size):
+        """Delete sync-created rows that no longer match a discovered module, in batches."""
+        keys = set(discovered)
+        module_names = {module_name for module_name, _ in discovered}
+        existing = CodeAuditReport.objects.filter(project="")  # monorepo projects are synced by their own runs
+        if module_names:
+            # rows of apps that still exist are only stale if they look sync-created
+            existing = existing.filter(
+                self.sync_shaped(module_names) | ~Q(module_name__in=module_names)
+            )
+        stale_ids = [
+            pk for pk, module_name, file_name in existing.values_list("pk", "module_name", "file_name")
+            if (module_name, file_name) not in keys
+            and (file_name == module_name or (file_name or "").startswith(f"{module_name}/"))
+        ]
+        for start in range(0, len(stale_ids), batch_size):
+            CodeAuditReport.objects.filter(pk__in=stale_ids[start:start + batch_size]).delete()
+        return len(stale_ids)
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:24
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicate_reports(apps, schema_editor):
+    """
+    Keep one report per (module_name, file_name), the most recently updated, and
+    move the logs of the others to it. Rows without a file_name never conflict.
+
+    Only rows that are the same report are merged: when duplicates differ in
+    file_author or git_user, merging would lose one of them, so the migration
+    stops and lists them to be renamed or deleted by hand.
+    """
+    CodeAuditReport = apps.get_model("code_audit", "CodeAuditReport")
+    CodeAuditReportLog = apps.get_model("code_audit", "CodeAuditReportLog")
+    duplicates = (
+        CodeAuditReport.objects.filter(file_name__isnull=False).values("module_name", "file_name")
+        .annotate(count=Count("id")).filter(count__gt=1)
+    )
+    merges = []
+    conflicts = []
+    for group in duplicates.iterator():
+        rows = list(CodeAuditReport.objects.filter(
+            module_name=group["module_name"], file_name=group["file_name"],
+        ).order_by("-updated_at", "-id").values_list("id", "file_author", "git_user"))
+        if len({(file_author or "", git_user or "") for _, file_author, git_user in rows}) > 1:
+            ids = ", ".join(str(row[0]) for row in rows)
+            conflicts.append(f"{group['module_name']}/{group['file_name']}: ids {ids}")
+            continue
+        merges.append([row[0] for row in rows])
+    if conflicts:
+        raise ValueError(
+            "CodeAuditReport rows share module_name and file_name but differ in file_author or git_user; "
+            "rename or delete them before migrating:\n" + "\n".join(conflicts)
+        )
+    for keep, *others in merges:
+        CodeAuditReportLog.objects.filter(report_id__in=others).update(report_id=keep)
+        CodeAuditReport.objects.filter(pk__in=others).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('code_audit', '0006_codeauditreport_git_user'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_reports, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='codeauditreport',
+            constraint=models.UniqueConstraint(fields=('module_name', 'file_name'), name='code_audit_report_module_file_uniq'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('code_audit', '0007_codeauditreport_module_file_uniq'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='codeauditreport',
+            index=models.Index(fields=['module_name', 'status'], name='code_audit_report_mod_st_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='codeauditreport',
+            index=models.Index(fields=['status'], name='code_audit_report_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='codeauditreport',
+            index=models.Index(fields=['-created_at'], name='code_audit_report_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='codeauditreport',
+            index=models.Index(fields=['file_name'], name='code_audit_report_file_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='codeauditreport',
+            index=models.Index(condition=models.Q(('git_user__isnull', False)), fields=['git_user'], name='code_audit_report_git_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='codeauditreportlog',
+            index=models.Index(fields=['report', '-run_at'], include=('pylint_score',), name='code_audit_log_report_run_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('code_audit', '0008_report_and_log_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeAuditReportLogArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateField(help_text='first day of the archived month')),
+                ('run_count', models.PositiveIntegerField(default=0)),
+                ('min_score', models.FloatField()),
+                ('max_score', models.FloatField()),
+                ('avg_score', models.FloatField()),
+                ('last_score', models.FloatField()),
+                ('report_path', models.TextField(blank=True, default='')),
+                ('first_run_at', models.DateTimeField()),
+                ('last_run_at', models.DateTimeField()),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_logs', to='code_audit.codeauditreport')),
+            ],
+            options={
+                'ordering': ['-period_start'],
+                'indexes': [models.Index(fields=['report', '-last_run_at'], include=('last_score',), name='code_audit_archive_last_idx')],
+                'constraints': [models.UniqueConstraint(fields=('report', 'period_start'), name='code_audit_log_archive_period_uniq')],
+            },
+        ),
+    ]
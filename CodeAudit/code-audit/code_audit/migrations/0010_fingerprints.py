@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('code_audit', '0009_codeauditreportlogarchive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='codeauditreport',
+            name='fingerprints',
+            field=models.JSONField(blank=True, default=dict, help_text='messages of the last run by fingerprint'),
+        ),
+        migrations.AddField(
+            model_name='codeauditreportlog',
+            name='fingerprints',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
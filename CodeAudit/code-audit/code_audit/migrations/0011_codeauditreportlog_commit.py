@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('code_audit', '0010_fingerprints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='codeauditreportlog',
+            name='commit',
+            field=models.CharField(blank=True, default='', help_text='git commit of a backfilled revision', max_length=40),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('code_audit', '0011_codeauditreportlog_commit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeAuditAuthorScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('git_user', models.CharField(help_text='git author name, as CodeAuditReport.git_user', max_length=100)),
+                ('pylint_score', models.FloatField(blank=True, null=True)),
+                ('issues', models.PositiveIntegerField(default=0)),
+                ('stats', models.JSONField(blank=True, default=dict, help_text='statement and message counts by type')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='author_scores', to='code_audit.codeauditreport')),
+            ],
+            options={
+                'ordering': ['report', '-pylint_score'],
+                'constraints': [models.UniqueConstraint(fields=('report', 'git_user'), name='code_audit_author_score_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('code_audit', '0013_codeauditjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='codeauditjob',
+            name='progress',
+            field=models.JSONField(blank=True, default=dict, help_text='last progress snapshot, see LintProgress.as_dict'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('code_audit', '0014_codeauditjob_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='codeauditreport',
+            name='stats',
+            field=models.JSONField(blank=True, default=dict, help_text='statement and message counts of the last run'),
+        ),
+    ]
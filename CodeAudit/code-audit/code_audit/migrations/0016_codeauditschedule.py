@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:08
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('code_audit', '0015_codeauditreport_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeAuditSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('enabled', models.BooleanField(default=True)),
+                ('interval_minutes', models.PositiveIntegerField(default=60, help_text='minutes between change checks')),
+                ('next_check_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_checked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_queued_at', models.DateTimeField(blank=True, null=True)),
+                ('stat_signature', models.CharField(blank=True, default='', help_text="hash of the input files' mtimes and sizes", max_length=40)),
+                ('content_signature', models.CharField(blank=True, default='', help_text="hash of the input files' contents and lint configuration", max_length=40)),
+                ('report', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='schedule', to='code_audit.codeauditreport')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['enabled', 'next_check_at'], name='code_audit_schedule_due_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('code_audit', '0016_codeauditschedule'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='codeauditreport',
+            name='code_audit_report_module_file_uniq',
+        ),
+        migrations.AddField(
+            model_name='codeauditreport',
+            name='project',
+            field=models.CharField(blank=True, default='', help_text='monorepo project of the manifest, empty for this project', max_length=100),
+        ),
+        migrations.AddConstraint(
+            model_name='codeauditreport',
+            constraint=models.UniqueConstraint(fields=('project', 'module_name', 'file_name'), name='code_audit_report_project_module_file_uniq'),
+        ),
+    ]
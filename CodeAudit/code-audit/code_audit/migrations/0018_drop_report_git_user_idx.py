@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:27
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('code_audit', '0017_codeauditreport_project'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='codeauditreport',
+            name='code_audit_report_git_user_idx',
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def fail_duplicate_active_jobs(apps, schema_editor):
+    """Keep the newest queued or running job of each report, fail the others."""
+    CodeAuditJob = apps.get_model("code_audit", "CodeAuditJob")
+    active = CodeAuditJob.objects.filter(status__in=["queued", "running"]).order_by("report_id", "-created_at", "-id")
+    seen = set()
+    duplicates = []
+    for job_id, report_id in active.values_list("id", "report_id").iterator():
+        if report_id in seen:
+            duplicates.append(job_id)
+        seen.add(report_id)
+    CodeAuditJob.objects.filter(pk__in=duplicates).update(
+        status="failed", error="Superseded by a newer job of the same report", finished_at=django.utils.timezone.now(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('code_audit', '0018_drop_report_git_user_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='codeauditjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='last sign of life of the process that queued or runs the job'),
+        ),
+        migrations.RunPython(fail_duplicate_active_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='codeauditjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running'])), fields=('report',), name='code_audit_job_one_active_per_report'),
+        ),
+    ]
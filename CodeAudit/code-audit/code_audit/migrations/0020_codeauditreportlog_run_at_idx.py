@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('code_audit', '0019_codeauditjob_heartbeat_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='codeauditreportlog',
+            index=models.Index(fields=['run_at'], name='code_audit_log_run_at_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:48
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_git_users(apps, schema_editor):
+    CodeAuditAuthorScore = apps.get_model("code_audit", "CodeAuditAuthorScore")
+    scores = list(CodeAuditAuthorScore.objects.only("id", "git_user"))
+    for score in scores:
+        score.git_user_hash = hashlib.sha1(score.git_user.encode("utf-8")).hexdigest()
+    CodeAuditAuthorScore.objects.bulk_update(scores, ["git_user_hash"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('code_audit', '0020_codeauditreportlog_run_at_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='codeauditauthorscore',
+            name='code_audit_author_score_uniq',
+        ),
+        migrations.AlterField(
+            model_name='codeauditauthorscore',
+            name='git_user',
+            field=models.CharField(help_text='git author name, as CodeAuditReport.git_user', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='codeauditauthorscore',
+            name='git_user_hash',
+            field=models.CharField(default='', editable=False, help_text='sha1 of the full author name, which git_user may truncate', max_length=40),
+            preserve_default=False,
+        ),
+        migrations.RunPython(hash_git_users, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='codeauditauthorscore',
+            constraint=models.UniqueConstraint(fields=('report', 'git_user_hash'), name='code_audit_author_score_uniq'),
+        ),
+        migrations.AddField(
+            model_name='codeauditjob',
+            name='by_author',
+            field=models.BooleanField(default=False, help_text='also store per-author scores (see blame.py)'),
+        ),
+    ]
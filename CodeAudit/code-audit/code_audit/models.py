@@ -1,18 +1,25 @@
 # reports/models.py
 import datetime
+import hashlib
 import logging
 import os
-import re
+import time
 
-from django.db import models
+from asgiref.sync import sync_to_async
+from django.db import models, transaction
 from django.utils import timezone
 
 from .code_audit import CodeAudit  # reuse your class
+from .exporters import get_output_path
+from .fingerprints import diff_fingerprints
+from .html_report import get_fragments_dir
 
 logger = logging.getLogger(__name__)
 
 
 class CodeAuditReport(models.Model):
+    project = models.CharField(max_length=100, blank=True, default="",
+                               help_text="monorepo project of the manifest, empty for this project")
     module_name = models.CharField(max_length=255, help_text='filter module name')
     file_name = models.CharField(max_length=255, blank=True, null=True, help_text="Python file or app to audit")
     file_author = models.CharField(max_length=100, blank=True, null=True)
@@ -21,54 +28,178 @@ class CodeAuditReport(models.Model):
     status = models.CharField(max_length=50, default="Not Run")
     report_path = models.TextField(blank=True, null=True, default='/tmp/')  # can store multiple reports
     pylint_score = models.FloatField(blank=True, null=True)
+    stats = models.JSONField(blank=True, default=dict, help_text="statement and message counts of the last run")
+    fingerprints = models.JSONField(blank=True, default=dict, help_text="messages of the last run by fingerprint")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["project", "module_name", "file_name"],
+                name="code_audit_report_project_module_file_uniq",
+            ),
+        ]
+        indexes = [
+            # admin list_filter / search shapes
+            models.Index(fields=["module_name", "status"], name="code_audit_report_mod_st_idx"),
+            models.Index(fields=["status"], name="code_audit_report_status_idx"),
+            models.Index(fields=["-created_at"], name="code_audit_report_created_idx"),
+            models.Index(fields=["file_name"], name="code_audit_report_file_idx"),
+        ]
+
     def __str__(self):
         return f"Audit: {self.file_name} ({self.status})"
 
-    def run_audit(self, level="file"):
-        """Run audit via CodeAudit.process() with error handling."""
-        audit = CodeAudit()
-        audit.file_name = self.file_name if level == "file" else None
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        audit.output_filepath = f"/tmp/{self.module_name}_{level}_audit_{timestamp}.html"
-        audit.file_author = self.file_author
-        audit.html_output_file_path = None  # let CodeAudit decide
-        reports = []
-        pylint_score = 0.0
+    def get_fragment_path(self, fragment):
+        """
+        Absolute path of a paginated report fragment, None if it is not inside the report's fragment dir.
+
+        :param fragment: path relative to the report, e.g. "views_files/3.html"
+        """
+        if not self.report_path:
+            return None
+        report_file = self.report_path.split(",")[0]
+        fragments_dir = os.path.realpath(get_fragments_dir(report_file))
+        path = os.path.realpath(os.path.join(os.path.dirname(report_file), fragment))
+        if not path.startswith(fragments_dir + os.sep) or not os.path.isfile(path):
+            return None
+        return path
+
+    def get_output_file(self, output_format="jsonl"):
+        """Machine readable output of the last run next to its HTML report (gzip compressed or not), None if missing."""
+        if not self.report_path:
+            return None
+        report_file = self.report_path.split(",")[0]
+        for use_gzip in (False, True):
+            path = get_output_path(report_file, output_format, use_gzip)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def get_run_fingerprints(self, run_id=None):
+        """
+        Message fingerprints of a run.
+
+        :param run_id: CodeAuditReportLog id, None or "current" for the latest run
+        """
+        if run_id in (None, "", "current"):
+            return self.fingerprints
+        return self.logs.values_list("fingerprints", flat=True).get(pk=run_id)
+
+    def diff_runs(self, from_run=None, to_run=None):
+        """
+        New, fixed and unchanged messages between two runs.
+
+        :param from_run: CodeAuditReportLog id, defaults to the most recent log
+        :param to_run: CodeAuditReportLog id, defaults to the current run
+        """
+        if from_run in (None, ""):
+            from_run = self.logs.values_list("pk", flat=True).first()
+        old = self.get_run_fingerprints(from_run) if from_run else {}
+        return diff_fingerprints(old, self.get_run_fingerprints(to_run))
+
+    def score_history(self):
+        """
+        Score trend across archived and live logs, oldest first.
+
+        Archived months contribute their average score at the time of their last run.
+
+        :return: list of (run_at, pylint_score) tuples
+        """
+        history = list(self.archived_logs.order_by().values_list("last_run_at", "avg_score"))
+        history.extend(self.logs.order_by().values_list("run_at", "pylint_score"))
+        return sorted(history)
+
+    def make_progress_callback(self, interval=2.0, on_progress=None):
+        """
+        Return a CodeAudit progress callback writing "Running <progress>" into status (throttled).
+
+        :param on_progress: also called with every lint.LintProgress, unthrottled
+        """
+        last_update = [0.0]
 
+        def callback(progress):
+            if on_progress:
+                on_progress(progress)
+            now = time.monotonic()
+            if now - last_update[0] < interval:
+                return
+            last_update[0] = now
+            CodeAuditReport.objects.filter(pk=self.pk).update(status=f"Running {progress}"[:50])
+
+        return callback
+
+    def run_audit(self, level="file", use_async=False, by_author=False, on_progress=None):
+        """
+        Run audit via CodeAudit.process() with error handling.
+
+        :param use_async: lint with the asyncio orchestrator (see orchestrator.py)
+        :param by_author: also store per-author scores from git blame (see blame.py)
+        :param on_progress: called with every lint.LintProgress of the run
+        """
+        if self.project:
+            return self.run_project_audit(use_async=use_async, by_author=by_author, on_progress=on_progress)
+        audit = self.make_audit(level, use_async=use_async, by_author=by_author, on_progress=on_progress)
         try:
             # Run the actual audit
             audit.process()
+        except Exception as e:
+            logger.exception(f"Audit process failed for {self.file_name}: {e}")
+            self.mark_failed()
+            return []
+        return self.save_audit(audit)
 
-            # Collect outputs from process
-            if audit.html_output_file_path:
-                reports.append(audit.html_output_file_path)
-                output_file_path = audit.html_output_file_path
-
-                if os.path.isfile(output_file_path):
-                    try:
-                        with open(output_file_path, "r", encoding="utf-8") as f:
-                            html_content = f.read()
-
-                        # Extract pylint score using regex
-                        match = re.search(
-                            r'<span class="score">\s*([0-9.]+)\s*</span>',
-                            html_content,
-                        )
-                        if match:
-                            pylint_score = float(match.group(1))
-                    except Exception as e:
-                        logger.error(f"Failed to read or parse report file {output_file_path}: {e}")
-                else:
-                    logger.warning(f"Report file does not exist: {output_file_path}")
+    async def arun_audit(self, level="file", by_author=False, on_progress=None):
+        """
+        run_audit() from a running event loop: the lint awaits the asyncio orchestrator
+        (CodeAudit.process_async), the queries run in worker threads.
 
+        Monorepo project reports are audited by run_project_audit in a worker thread.
+        """
+        if self.project:
+            return await sync_to_async(self.run_project_audit, thread_sensitive=False)(
+                use_async=True, by_author=by_author, on_progress=on_progress,
+            )
+        audit = self.make_audit(level, use_async=True, by_author=by_author, on_progress=on_progress)
+        try:
+            await audit.process_async()
         except Exception as e:
             logger.exception(f"Audit process failed for {self.file_name}: {e}")
-            self.status = "Failed"
-            self.save(update_fields=["status", "updated_at"])
+            await sync_to_async(self.mark_failed)()
             return []
+        return await sync_to_async(self.save_audit)(audit)
+
+    def make_audit(self, level="file", use_async=False, by_author=False, on_progress=None):
+        """CodeAudit of this report at the file or app level."""
+        audit = CodeAudit()
+        audit.use_async = use_async
+        audit.by_author = by_author
+        audit.file_name = self.file_name if level == "file" else None
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        audit.output_filepath = f"/tmp/{self.module_name}_{level}_audit_{timestamp}.html"
+        audit.file_author = self.file_author
+        audit.html_output_file_path = None  # let CodeAudit decide
+        audit.progress_callback = self.make_progress_callback(on_progress=on_progress)
+        return audit
+
+    def mark_failed(self):
+        self.status = "Failed"
+        self.save(update_fields=["status", "updated_at"])
+
+    def save_audit(self, audit):
+        """Store the results of a processed CodeAudit; :return: report paths"""
+        reports = []
+        pylint_score = 0.0
+        stats = {}
+        fingerprints = {}
+
+        # Collect outputs from process
+        if audit.html_output_file_path:
+            reports.append(audit.html_output_file_path)
+            pylint_score = audit.get_score()
+            stats = audit.lint_stats or {}
+            fingerprints = audit.fingerprints
 
         # Save results
         self.report_path = ",".join(reports) if reports else None
@@ -79,24 +210,210 @@ class CodeAuditReport(models.Model):
                 report=self,
                 pylint_score=self.pylint_score,
                 report_path=self.report_path or "",
+                fingerprints=self.fingerprints,
             )
 
         self.pylint_score = pylint_score
+        self.stats = stats
+        self.fingerprints = fingerprints
         self.last_run = timezone.now()
         self.status = "Completed" if reports else "Failed"
         self.save()
+        if audit.author_scores is not None:
+            self.save_author_scores(audit.author_scores)
 
         return reports
 
+    def run_project_audit(self, use_async=False, by_author=False, on_progress=None):
+        """
+        Audit a monorepo project report: its whole project is run again from the
+        manifest (see batch.run_projects), unchanged files come from the result cache.
+
+        Progress covers the files of the whole project that are not cached.
+        """
+        from .batch import run_projects
+
+        try:
+            run_projects([self.project], use_async=use_async, by_author=by_author,
+                         on_progress=self.make_progress_callback(on_progress=on_progress))
+        except Exception as e:
+            logger.exception(f"Audit of project {self.project} failed: {e}")
+            self.status = "Failed"
+            self.save(update_fields=["status", "updated_at"])
+            return []
+        self.refresh_from_db()
+        return [self.report_path] if self.status == "Completed" and self.report_path else []
+
+    def save_author_scores(self, scores):
+        """Replace the per-author scores with those of the last run (see blame.author_scores)."""
+        now = timezone.now()
+        with transaction.atomic():
+            self.author_scores.all().delete()
+            CodeAuditAuthorScore.objects.bulk_create([
+                CodeAuditAuthorScore(
+                    report=self,
+                    git_user=row["author"][:255],
+                    git_user_hash=CodeAuditAuthorScore.hash_git_user(row["author"]),
+                    pylint_score=row["score"],
+                    issues=row["issues"],
+                    stats=row["stats"],
+                    run_at=now,
+                )
+                for row in scores
+            ])
+
 
 class CodeAuditReportLog(models.Model):
     report = models.ForeignKey(CodeAuditReport, on_delete=models.CASCADE, related_name="logs")
     pylint_score = models.FloatField()
     report_path = models.TextField()
+    fingerprints = models.JSONField(blank=True, default=dict)
+    commit = models.CharField(max_length=40, blank=True, default="", help_text="git commit of a backfilled revision")
     run_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ["-run_at"]
+        indexes = [
+            # "last score" / "all scores" subqueries: WHERE report_id = ? ORDER BY run_at DESC
+            models.Index(
+                fields=["report", "-run_at"],
+                name="code_audit_log_report_run_idx",
+                include=["pylint_score"],
+            ),
+            # code_audit_archive_logs: WHERE run_at < cutoff ORDER BY run_at
+            models.Index(fields=["run_at"], name="code_audit_log_run_at_idx"),
+        ]
 
     def __str__(self):
         return f"{self.report.file_name} - {self.pylint_score} ({self.run_at:%Y-%m-%d %H:%M})"
+
+
+class CodeAuditAuthorScore(models.Model):
+    """Messages and statements of a report's last run attributed (by git blame) to one author."""
+    report = models.ForeignKey(CodeAuditReport, on_delete=models.CASCADE, related_name="author_scores")
+    git_user = models.CharField(max_length=255, help_text="git author name, as CodeAuditReport.git_user")
+    git_user_hash = models.CharField(max_length=40, editable=False,
+                                     help_text="sha1 of the full author name, which git_user may truncate")
+    pylint_score = models.FloatField(blank=True, null=True)
+    issues = models.PositiveIntegerField(default=0)
+    stats = models.JSONField(blank=True, default=dict, help_text="statement and message counts by type")
+    run_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["report", "-pylint_score"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["report", "git_user_hash"],
+                name="code_audit_author_score_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.report.file_name} - {self.git_user}: {self.pylint_score}"
+
+    @staticmethod
+    def hash_git_user(name):
+        return hashlib.sha1(name.encode("utf-8")).hexdigest()
+
+
+class CodeAuditReportLogArchive(models.Model):
+    """Monthly roll-up of CodeAuditReportLog rows removed by the archive_logs command."""
+    report = models.ForeignKey(CodeAuditReport, on_delete=models.CASCADE, related_name="archived_logs")
+    period_start = models.DateField(help_text="first day of the archived month")
+    run_count = models.PositiveIntegerField(default=0)
+    min_score = models.FloatField()
+    max_score = models.FloatField()
+    avg_score = models.FloatField()
+    last_score = models.FloatField()
+    report_path = models.TextField(blank=True, default="")
+    first_run_at = models.DateTimeField()
+    last_run_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-period_start"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["report", "period_start"],
+                name="code_audit_log_archive_period_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["report", "-last_run_at"],
+                name="code_audit_archive_last_idx",
+                include=["last_score"],
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.report.file_name} - {self.avg_score:.2f} ({self.period_start:%Y-%m}, {self.run_count} runs)"
+
+
+class CodeAuditJob(models.Model):
+    """An audit run triggered through the API and executed in the background (see jobs.py)."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    STATUS_CHOICES = [(QUEUED, "Queued"), (RUNNING, "Running"), (COMPLETED, "Completed"), (FAILED, "Failed")]
+    ACTIVE_STATUSES = [QUEUED, RUNNING]
+
+    report = models.ForeignKey(CodeAuditReport, on_delete=models.CASCADE, related_name="jobs")
+    level = models.CharField(max_length=10, default="file")
+    by_author = models.BooleanField(default=False, help_text="also store per-author scores (see blame.py)")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    pylint_score = models.FloatField(blank=True, null=True)
+    progress = models.JSONField(blank=True, default=dict, help_text="last progress snapshot, see LintProgress.as_dict")
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    heartbeat_at = models.DateTimeField(default=timezone.now,
+                                        help_text="last sign of life of the process that queued or runs the job")
+
+    class Meta:
+        ordering = ["-created_at"]
+        constraints = [
+            # a report has at most one queued or running job, see jobs.submit
+            models.UniqueConstraint(
+                fields=["report"],
+                condition=models.Q(status__in=["queued", "running"]),
+                name="code_audit_job_one_active_per_report",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["report", "status"], name="code_audit_job_report_st_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.report.file_name} - {self.status} ({self.created_at:%Y-%m-%d %H:%M})"
+
+    @property
+    def is_active(self):
+        return self.status in self.ACTIVE_STATUSES
+
+
+class CodeAuditSchedule(models.Model):
+    """
+    When a report is re-audited by the code_audit_schedule command (see scheduler.py).
+
+    The report is only queued when its inputs changed since the last queued run.
+    """
+    report = models.OneToOneField(CodeAuditReport, on_delete=models.CASCADE, related_name="schedule")
+    enabled = models.BooleanField(default=True)
+    interval_minutes = models.PositiveIntegerField(default=60, help_text="minutes between change checks")
+    next_check_at = models.DateTimeField(default=timezone.now)
+    last_checked_at = models.DateTimeField(blank=True, null=True)
+    last_queued_at = models.DateTimeField(blank=True, null=True)
+    stat_signature = models.CharField(max_length=40, blank=True, default="",
+                                      help_text="hash of the input files' mtimes and sizes")
+    content_signature = models.CharField(max_length=40, blank=True, default="",
+                                         help_text="hash of the input files' contents and lint configuration")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["enabled", "next_check_at"], name="code_audit_schedule_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.report.file_name} every {self.interval_minutes} min"
@@ -0,0 +1,204 @@
+# reports/orchestrator.py
+"""
+asyncio orchestration of the external tools of an audit (no Django imports).
+
+git metadata, file discovery and pylint chunks run concurrently; subprocesses
+are started without a shell and at most ``max_concurrency`` of them run at a
+time. Every task has its own timeout, and a task that times out or is
+cancelled kills its process.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .analyzers import submit_analyzers
+from .engine import WorkerLimits, chunk_by_rcfile, get_lint_command
+from .lint import LintError, ResultCollector, build_report_sinks, get_target_files, lint_env
+
+logger = logging.getLogger(__name__)
+
+GIT_TIMEOUT = 30
+STREAM_LIMIT = 16 * 1024 * 1024  # pylint results come as one JSON line per module
+
+
+class TaskTimeout(LintError):
+    """A subprocess task did not finish within its timeout."""
+
+
+class TaskResult:
+    """Outcome of a finished subprocess task."""
+
+    def __init__(self, name, returncode, stdout, stderr, duration):
+        self.name = name
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.duration = duration
+
+
+class AuditOrchestrator:
+    """
+    Run subprocess tasks concurrently, at most max_concurrency at a time.
+
+    Output callbacks run one at a time on a dedicated thread, off the event loop,
+    so they may use blocking code (sinks, the Django ORM) without locking.
+    """
+
+    def __init__(self, max_concurrency=4):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.callbacks = ThreadPoolExecutor(max_workers=1, thread_name_prefix="code-audit-callbacks")
+
+    def close(self):
+        self.callbacks.shutdown(wait=True)
+
+    async def run(self, name, cmd, timeout=None, cwd=None, env=None, on_line=None):
+        """
+        Run cmd (argument list, no shell) and stream its output.
+
+        :param on_line: called with each stdout line as it arrives; stdout is then not kept
+        :raise TaskTimeout: the task did not finish within timeout seconds
+        """
+        async with self.semaphore:
+            start = time.monotonic()
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                cwd=cwd, env=env, limit=STREAM_LIMIT,
+            )
+            stdout = []
+
+            async def read_stdout():
+                loop = asyncio.get_running_loop()
+                async for line in proc.stdout:
+                    line = line.decode("utf-8", "replace")
+                    if on_line:
+                        await loop.run_in_executor(self.callbacks, on_line, line)
+                    else:
+                        stdout.append(line)
+
+            try:
+                _, stderr, returncode = await asyncio.wait_for(
+                    asyncio.gather(read_stdout(), proc.stderr.read(), proc.wait()), timeout,
+                )
+            except asyncio.TimeoutError:
+                await self._kill(proc)
+                raise TaskTimeout(f"{name} did not finish within {timeout}s") from None
+            except BaseException:  # cancelled, or on_line failed
+                await self._kill(proc)
+                raise
+
+        duration = time.monotonic() - start
+        logger.debug("%s finished with %s in %.2fs", name, returncode, duration)
+        return TaskResult(name, returncode, "".join(stdout), stderr.decode("utf-8", "replace"), duration)
+
+    @staticmethod
+    async def _kill(proc):
+        if proc.returncode is None:
+            proc.kill()
+        await proc.wait()
+
+
+async def collect_git_metadata(orchestrator, cwd=None):
+    """Git user, commit and branch of the working copy, fetched concurrently; None where unavailable."""
+    commands = {
+        "user": ["git", "config", "user.name"],
+        "commit": ["git", "rev-parse", "HEAD"],
+        "branch": ["git", "rev-parse", "--abbrev-ref", "HEAD"],
+    }
+    results = await asyncio.gather(
+        *(orchestrator.run(f"git {key}", cmd, timeout=GIT_TIMEOUT, cwd=cwd) for key, cmd in commands.items()),
+        return_exceptions=True,
+    )
+    metadata = {}
+    for key, result in zip(commands, results):
+        if isinstance(result, BaseException) or result.returncode:
+            metadata[key] = None
+        else:
+            metadata[key] = result.stdout.strip() or None
+    return metadata
+
+
+async def discover_files(file_name, selector=None):
+    """get_target_files() of every target of a CodeAudit file_name, each in a worker thread."""
+    targets = (file_name or "").split()
+    results = await asyncio.gather(*(asyncio.to_thread(get_target_files, target, selector) for target in targets))
+    return sorted(set().union(*results))
+
+
+async def lint_async(orchestrator, files, pylintrc, sinks, limits=None, on_progress=None, ast_cache_dir=None,
+                     timeout=None, extra_records=None, rcfiles=None, source_roots=None):
+    """
+    Lint chunks of files.files_per_worker files in concurrent pylint processes.
+
+    The first failing chunk cancels the others.
+
+    :param timeout: seconds allowed per chunk, None for no limit
+    :param extra_records: {abs_path: record}, or a Future of it, merged into pylint's results (see lint.ResultCollector)
+    :param rcfiles: {abs path: rcfile} of files with their own configuration, e.g. per-app overrides
+    :param source_roots: {abs path: [directories]} put first on sys.path for the file (see engine.governed_lint)
+    :return: (global stats, score)
+    """
+    limits = limits or WorkerLimits()
+    source_roots = source_roots or {}
+    env = lint_env(ast_cache_dir)
+    collector = ResultCollector(sinks, on_progress, len(files), extra_records)
+
+    async def lint_chunk(index, rcfile, chunk):
+        closed = []
+
+        def on_line(line):
+            record = collector.feed(line)
+            if record is not None and "module" not in record:
+                closed.append(record)
+
+        cmd = [*get_lint_command(rcfile, ast_cache_dir, source_roots.get(chunk[0])), *chunk]
+        result = await orchestrator.run(f"pylint chunk {index}", cmd, timeout=timeout, env=env, on_line=on_line)
+        if result.returncode & 32 or not closed:  # 32: usage error; no stats line: pylint died
+            raise LintError(f"pylint failed ({result.returncode}): {result.stderr.strip()}")
+
+    chunks = chunk_by_rcfile(files, pylintrc, limits.files_per_worker, rcfiles, source_roots)
+    tasks = [asyncio.create_task(lint_chunk(index, rcfile, chunk)) for index, (rcfile, chunk) in enumerate(chunks)]
+    try:
+        await asyncio.gather(*tasks)
+        # analyzers still running when no pylint record arrived are waited for off the event loop
+        await asyncio.get_running_loop().run_in_executor(orchestrator.callbacks, collector.get_extra_records)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        collector.abort()
+        raise
+    return collector.close()
+
+
+async def audit_async(file_name, pylintrc, html_output_file_path, limits=None, timeout=None, on_progress=None,
+                      report_format="html", output_formats=("jsonl",), use_gzip=False, ast_cache_dir=None,
+                      analyzers=(), selector=None, config=None):
+    """
+    Async counterpart of lint.lint_to_reports.
+
+    Git metadata and file discovery run concurrently, then the analyzers (in a
+    worker thread) run while the pylint chunks stream into the same report sinks.
+
+    :param limits: engine.WorkerLimits; max_workers bounds the concurrent subprocesses
+    :param timeout: seconds allowed per pylint chunk
+    :param selector: selection.FileSelector of the files to audit
+    :param config: conf.AuditConfig with per-app configurations, None to lint everything with pylintrc
+    :return: (global stats, score, fingerprints, {format: output path}, git metadata)
+    """
+    limits = limits or WorkerLimits()
+    orchestrator = AuditOrchestrator(limits.max_workers)
+    try:
+        metadata, files = await asyncio.gather(collect_git_metadata(orchestrator), discover_files(file_name, selector))
+        extra_records = submit_analyzers(files, analyzers, limits.max_workers)
+        output_files, sinks, fingerprint_sink = build_report_sinks(
+            html_output_file_path, report_format, output_formats, use_gzip,
+        )
+        stats, score = await lint_async(
+            orchestrator, files, pylintrc, sinks, limits=limits, on_progress=on_progress,
+            ast_cache_dir=ast_cache_dir, timeout=timeout, extra_records=extra_records,
+            rcfiles=config.get_rcfiles(files) if config else None,
+        )
+    finally:
+        orchestrator.close()
+    return stats, score, fingerprint_sink.fingerprints, output_files, metadata
@@ -0,0 +1,103 @@
+# reports/progress.py
+"""
+In-process channel of the live progress of audit jobs (no Django imports).
+
+A running job publishes its latest progress snapshot; watchers wait until a
+newer version is published. Only the latest snapshot is kept per job, whatever
+the number of watchers, and nobody polls: a thread watcher (wait) blocks on the
+job's condition, an asyncio watcher (wait_async, the SSE view) is a coroutine
+woken through its event loop and holds no thread. Finished jobs are dropped
+FINISHED_TTL seconds later.
+"""
+import asyncio
+import threading
+import time
+
+FINISHED_TTL = 60
+
+
+class JobProgress:
+    """Latest progress snapshot of one job."""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.version = 0
+        self.data = None
+        self.finished_at = None
+        self.waiters = set()  # (event loop, asyncio.Event) of the asyncio watchers
+
+    def snapshot(self):
+        return self.version, self.data, self.finished_at is not None
+
+
+class ProgressChannel:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.jobs = {}
+
+    def get(self, job_id, create=False):
+        with self.lock:
+            if create and job_id not in self.jobs:
+                self.purge()
+                self.jobs[job_id] = JobProgress()
+            return self.jobs.get(job_id)
+
+    def purge(self):
+        now = time.monotonic()
+        for job_id, job in list(self.jobs.items()):
+            if job.finished_at is not None and now - job.finished_at > FINISHED_TTL:
+                del self.jobs[job_id]
+
+    def publish(self, job_id, data, finished=False):
+        """Replace the snapshot of a job and wake its watchers."""
+        job = self.get(job_id, create=True)
+        with job.condition:
+            job.version += 1
+            job.data = data
+            if finished:
+                job.finished_at = time.monotonic()
+            job.condition.notify_all()
+            waiters = list(job.waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:  # the loop of a gone watcher is closed
+                pass
+
+    def wait(self, job_id, version=0, timeout=None):
+        """
+        Wait for a snapshot newer than version.
+
+        :return: (version, data, finished), None on timeout or when the job is not published in this process
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        with job.condition:
+            if not job.condition.wait_for(lambda: job.version > version, timeout=timeout):
+                return None
+            return job.snapshot()
+
+    async def wait_async(self, job_id, version=0, timeout=None):
+        """wait() for asyncio watchers, without holding a thread while waiting."""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with job.condition:
+            if job.version > version:
+                return job.snapshot()
+            job.waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            with job.condition:
+                job.waiters.discard(waiter)
+        with job.condition:
+            return job.snapshot() if job.version > version else None
+
+
+channel = ProgressChannel()
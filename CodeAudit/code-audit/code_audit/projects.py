@@ -0,0 +1,497 @@
+# reports/projects.py
+"""
+Audit the Django projects of a monorepo together (no Django imports).
+
+A JSON manifest lists the projects; paths are relative to the manifest, and
+``source_dirs`` (relative to the project root, default ``["."]``) are the
+directories the project's apps are imported from::
+
+    {
+        "projects": [
+            {"name": "billing", "root": "services/billing", "settings": "billing.settings"},
+            {"name": "shop", "root": "services/shop", "settings": "config.settings.prod",
+             "source_dirs": [".", "../../libs"]}
+        ]
+    }
+
+Project settings are never imported: INSTALLED_APPS is evaluated from the
+settings source (literal lists and tuples, ``+``, ``+=``, names assigned
+earlier, append/extend/insert calls, both branches of ``if`` blocks and
+``from <module> import *`` of modules in the source dirs). Apps that are not a
+directory of the source dirs, e.g. django.contrib or installed packages, are
+not audited.
+
+All projects are linted by one governed worker pool run (or by the asyncio
+orchestrator, see orchestrator.py). Files are keyed by real path, so a library
+several projects install is linted once, and results are cached by blob SHA
+like those of revision audits (see revisions.py), under the configuration and
+source dirs they were linted with and the state of their project: its settings
+sources, its dependency files (DEPENDENCY_FILES at the project root) and the
+installed packages. A cached result also depends on the blobs of the modules
+the file imports from the project's source dirs, so a file is linted again when
+it, a module it imports or the project state changed since an earlier run.
+Each project is linted in its own chunks, with its source dirs first on
+sys.path, as module names of two projects may collide.
+"""
+import ast
+import asyncio
+import glob
+import hashlib
+import importlib.metadata
+import json
+import logging
+import os
+
+from .analyzers import submit_analyzers
+from .engine import QUARANTINE_SYMBOL, WorkerLimits, governed_lint
+from .lint import IndexSink, LintError, module_name_from_path
+from .orchestrator import AuditOrchestrator, lint_async
+from .revisions import ResultCache, cache_entry, get_config_key, relocate
+from .selection import FileSelector
+
+logger = logging.getLogger(__name__)
+
+# files of a project root that pin its dependencies (glob patterns)
+DEPENDENCY_FILES = [
+    "requirements*.txt", "requirements/*.txt", "constraints*.txt", "pyproject.toml", "setup.py", "setup.cfg",
+    "Pipfile", "Pipfile.lock", "poetry.lock", "uv.lock",
+]
+
+
+class ManifestError(LintError):
+    """A manifest or project settings that cannot be read."""
+
+
+def blob_sha(data):
+    """SHA git gives a blob of this content, the key of revision audit cache entries."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def find_source(base):
+    """Source file of a module path without suffix: base.py or base/__init__.py."""
+    for path in (f"{base}.py", os.path.join(base, "__init__.py")):
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+class SettingsReader:
+    """
+    Evaluate the literal assignments of a settings module from its source.
+
+    :param source_dirs: directories absolute imports are resolved in
+    """
+
+    def __init__(self, source_dirs):
+        self.source_dirs = source_dirs
+        self.namespace = {}
+        self.seen = set()
+
+    def find_module(self, module):
+        for source_dir in self.source_dirs:
+            path = find_source(os.path.join(source_dir, *module.split(".")))
+            if path:
+                return path
+        return None
+
+    def read(self, path):
+        path = os.path.realpath(path)
+        if path in self.seen:
+            return
+        self.seen.add(path)
+        with open(path, "rb") as f:
+            try:
+                tree = ast.parse(f.read(), filename=path)
+            except SyntaxError as e:
+                raise ManifestError(f"Cannot parse {path}: {e}") from e
+        self.run(tree.body, path)
+
+    def run(self, body, path):
+        for node in body:
+            if isinstance(node, ast.ImportFrom) and any(alias.name == "*" for alias in node.names):
+                module_path = self.resolve_import(node, path)
+                if module_path:
+                    self.read(module_path)
+            elif isinstance(node, ast.Assign):
+                value = self.evaluate(node.value)
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        self.assign(target.id, value)
+            elif isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name):
+                value = self.evaluate(node.value) if isinstance(node.op, ast.Add) else None
+                self.assign(node.target.id, add(self.namespace.get(node.target.id), value))
+            elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Call):
+                self.call(node.value)
+            elif isinstance(node, ast.If):
+                self.run(node.body + node.orelse, path)
+            elif isinstance(node, ast.Try):
+                self.run(node.body + node.orelse + node.finalbody, path)
+
+    def resolve_import(self, node, path):
+        if not node.level:
+            return self.find_module(node.module)
+        base = os.path.dirname(path)
+        for _ in range(node.level - 1):
+            base = os.path.dirname(base)
+        return find_source(os.path.join(base, *(node.module or "").split(".")))
+
+    def assign(self, name, value):
+        if value is None:
+            self.namespace.pop(name, None)  # no longer known
+        else:
+            self.namespace[name] = value
+
+    def evaluate(self, node):
+        """Value of a literal expression (lists for tuples), None when it is not one."""
+        if isinstance(node, ast.Constant) and isinstance(node.value, (str, int)):
+            return node.value
+        if isinstance(node, ast.Name):
+            return self.namespace.get(node.id)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+            return add(self.evaluate(node.left), self.evaluate(node.right))
+        if isinstance(node, (ast.List, ast.Tuple)):
+            values = []
+            for element in node.elts:
+                if isinstance(element, ast.Starred):
+                    value = self.evaluate(element.value)
+                    if not isinstance(value, list):
+                        return None
+                    values.extend(value)
+                    continue
+                value = self.evaluate(element)
+                if value is None:
+                    return None
+                values.append(value)
+            return values
+        return None
+
+    def call(self, node):
+        """Apply NAME.append(...), NAME.extend(...) and NAME.insert(...) to a known list."""
+        func = node.func
+        if not (isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name)):
+            return
+        current = self.namespace.get(func.value.id)
+        args = [self.evaluate(arg) for arg in node.args]
+        if not isinstance(current, list) or None in args:
+            return
+        if func.attr == "append" and len(args) == 1:
+            current.append(args[0])
+        elif func.attr == "extend" and len(args) == 1 and isinstance(args[0], list):
+            current.extend(args[0])
+        elif func.attr == "insert" and len(args) == 2 and isinstance(args[0], int):
+            current.insert(args[0], args[1])
+
+
+def get_installed_packages():
+    """Sorted "name==version" of the distributions installed for this interpreter, which pylint imports."""
+    return sorted({f"{dist.metadata['Name']}=={dist.version}" for dist in importlib.metadata.distributions()})
+
+
+def find_imported_sources(data, path, source_dirs):
+    """
+    Source files of the modules a file imports directly that are found in source_dirs (or
+    relative to the file), as real paths; empty if the file does not parse.
+    """
+    try:
+        tree = ast.parse(data, filename=path)
+    except (SyntaxError, ValueError):
+        return set()
+
+    def find(roots, parts):
+        for root in roots:
+            source = find_source(os.path.join(root, *parts))
+            if source:
+                return os.path.realpath(source)
+        return None
+
+    sources = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            sources.update(find(source_dirs, alias.name.split(".")) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = os.path.dirname(path)
+                for _ in range(node.level - 1):
+                    base = os.path.dirname(base)
+                roots = [base]
+            else:
+                roots = source_dirs
+            parts = node.module.split(".") if node.module else []
+            for alias in node.names:
+                # "from package import module" imports the module, "from module import name" the module only
+                sources.add(find(roots, parts + [alias.name]) or (find(roots, parts) if parts else None))
+    sources.discard(None)
+    sources.discard(os.path.realpath(path))
+    return sources
+
+
+def add(left, right):
+    return left + right if isinstance(left, list) and isinstance(right, list) else None
+
+
+def read_installed_apps(settings, source_dirs, reader=None):
+    """
+    INSTALLED_APPS of a settings module, read from its source.
+
+    :param settings: dotted settings module, e.g. "config.settings.prod"
+    :param reader: SettingsReader to use, its seen attribute then lists the settings sources read
+    """
+    reader = reader or SettingsReader(source_dirs)
+    path = reader.find_module(settings)
+    if path is None:
+        raise ManifestError(f"Settings module {settings} not found in {', '.join(source_dirs)}")
+    reader.read(path)
+    apps = reader.namespace.get("INSTALLED_APPS")
+    if not isinstance(apps, list):
+        raise ManifestError(f"INSTALLED_APPS of {settings} is not a literal list")
+    return [app for app in apps if isinstance(app, str)]
+
+
+class Project:
+    """
+    A Django project of the manifest.
+
+    :param root: project directory
+    :param settings: dotted settings module
+    :param source_dirs: directories relative to root the apps are imported from
+    """
+
+    def __init__(self, name, root, settings, source_dirs=None):
+        self.name = name
+        self.root = os.path.realpath(root)
+        self.settings = settings
+        self.source_dirs = [os.path.realpath(os.path.join(self.root, path)) for path in source_dirs or ["."]]
+        self.settings_files = []
+        self._apps = None
+
+    def __repr__(self):
+        return f"Project({self.name!r}, {self.root!r})"
+
+    @property
+    def apps(self):
+        """{app name: app directory} of the INSTALLED_APPS found in the source dirs."""
+        if self._apps is None:
+            self.read_settings()
+        return self._apps
+
+    def read_settings(self):
+        """Find the apps of INSTALLED_APPS and record the settings sources it was read from (settings_files)."""
+        reader = SettingsReader(self.source_dirs)
+        apps = {}
+        for app in read_installed_apps(self.settings, self.source_dirs, reader):
+            found = self.find_app(app)
+            if found:
+                apps.setdefault(*found)
+        self.settings_files = sorted(reader.seen)
+        self._apps = apps
+
+    def get_state(self, installed_packages=()):
+        """
+        Hash of the project state lint results depend on besides the file and its configuration:
+        the settings sources, the dependency files of the root and the installed packages.
+        """
+        if self._apps is None:
+            self.read_settings()
+        key = hashlib.sha1("\n".join(installed_packages).encode("utf-8"))
+        paths = {path for pattern in DEPENDENCY_FILES for path in glob.glob(os.path.join(self.root, pattern))}
+        for path in self.settings_files + sorted(paths):
+            key.update(f"{path}\0".encode("utf-8"))
+            try:
+                with open(path, "rb") as f:
+                    key.update(hashlib.file_digest(f, "sha1").digest())
+            except OSError:
+                key.update(b"missing")
+        return key.hexdigest()[:16]
+
+    def find_app(self, app):
+        """(app name, directory) of an INSTALLED_APPS entry (package or AppConfig path), None if not found."""
+        parts = app.split(".")
+        for source_dir in self.source_dirs:
+            for size in range(len(parts), 0, -1):
+                path = os.path.join(source_dir, *parts[:size])
+                if os.path.isdir(path):
+                    return ".".join(parts[:size]), path
+        return None
+
+    def get_module_name(self, path):
+        """Dotted module name of a file, relative to the innermost source dir containing it."""
+        for source_dir in sorted(self.source_dirs, key=len, reverse=True):
+            if path.startswith(source_dir + os.sep):
+                return os.path.splitext(os.path.relpath(path, source_dir))[0].replace(os.sep, ".")
+        return module_name_from_path(path)
+
+
+def read_manifest(path):
+    """:return: [Project] of a manifest file"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ManifestError(f"Cannot read manifest {path}: {e}") from e
+    base_dir = os.path.dirname(os.path.abspath(path))
+    projects = []
+    for entry in manifest.get("projects", []):
+        missing = [key for key in ("name", "root", "settings") if not entry.get(key)]
+        if missing:
+            raise ManifestError(f"Project {entry} of {path} has no {', '.join(missing)}")
+        if any(project.name == entry["name"] for project in projects):
+            raise ManifestError(f"Duplicate project name {entry['name']} in {path}")
+        projects.append(Project(
+            entry["name"], os.path.join(base_dir, entry["root"]), entry["settings"], entry.get("source_dirs"),
+        ))
+    return projects
+
+
+def get_app_dirs(projects):
+    """
+    {"<project>:<app>": app directory} of all projects, plus "<project>:" for each project root,
+    for conf.AuditConfig.from_settings: a pylintrc at a project root applies to all of its apps.
+    """
+    app_dirs = {}
+    for project in projects:
+        app_dirs[f"{project.name}:"] = project.root
+        app_dirs.update({f"{project.name}:{app}": app_dir for app, app_dir in project.apps.items()})
+    return app_dirs
+
+
+class MonorepoAudit:
+    """
+    Lint the apps of several projects in one worker pool run.
+
+    :param projects: [Project]
+    :param config: conf.AuditConfig of the project and app directories (see get_app_dirs)
+    :param cache_dir: directory of the ResultCache of each configuration and source dirs
+    :param selectors: {project name: selection.FileSelector}, default rules for the missing ones
+    :param use_async: lint with the asyncio orchestrator instead of the governed worker pool
+    """
+
+    def __init__(self, projects, config, cache_dir, limits=None, analyzers=(), selectors=None, ast_cache_dir=None,
+                 use_async=False):
+        self.projects = {project.name: project for project in projects}
+        self.config = config
+        self.cache_dir = cache_dir
+        self.caches = {}
+        self.limits = limits or WorkerLimits()
+        self.analyzers = list(analyzers)
+        self.selectors = selectors or {}
+        self.ast_cache_dir = ast_cache_dir
+        self.use_async = use_async
+        self.linted = 0
+        self.cached = 0
+
+    def get_cache(self, fingerprint, source_roots, state=None):
+        key = (fingerprint, tuple(source_roots), state)
+        if key not in self.caches:
+            self.caches[key] = ResultCache(
+                self.cache_dir, get_config_key(fingerprint, self.analyzers, source_roots, state),
+            )
+        return self.caches[key]
+
+    def get_files(self):
+        """:return: {(project name, app name): [files]}"""
+        targets = {}
+        for project in self.projects.values():
+            selector = self.selectors.get(project.name) or FileSelector(base_dir=project.root)
+            for app, app_dir in project.apps.items():
+                targets[project.name, app] = sorted(selector.walk(app_dir))
+        return targets
+
+    def run(self, on_progress=None):
+        """
+        :return: {(project name, app name): {abs path: index entry}}, module names relative to the project
+        """
+        targets = self.get_files()
+        owners = {}
+        for (name, _), files in targets.items():
+            for path in files:
+                # shared files are linted with the source dirs of their first project
+                owners.setdefault(os.path.realpath(path), self.projects[name])
+        entries = self.lint(owners, on_progress)
+
+        results = {}
+        for (name, app), files in targets.items():
+            index = {}
+            for path in files:
+                entry = entries.get(os.path.realpath(path))
+                if entry is not None:
+                    path = os.path.abspath(path)
+                    index[path] = {**relocate(entry, path, self.projects[name].get_module_name(path)), "path": path}
+            results[name, app] = index
+        return results
+
+    def lint(self, owners, on_progress=None):
+        """
+        Cache entries of files, linting those that are not cached yet.
+
+        :param owners: {real path: Project whose source dirs and state the file is linted with}
+        :return: {real path: cache entry}
+        """
+        installed_packages = get_installed_packages()
+        states = {project.name: project.get_state(installed_packages) for project in set(owners.values())}
+        shas = {}
+
+        def read_sha(path):
+            if path not in shas:
+                try:
+                    with open(path, "rb") as f:
+                        shas[path] = blob_sha(f.read())
+                except OSError:
+                    shas[path] = "missing"
+            return shas[path]
+
+        entries = {}
+        pending = {}
+        for path, project in owners.items():
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                shas[path] = sha = blob_sha(data)
+                imported = sorted(read_sha(source) for source in find_imported_sources(data, path, project.source_dirs))
+            except OSError as e:
+                logger.warning("Cannot read %s: %s", path, e)
+                continue
+            if imported:
+                sha = hashlib.sha1(" ".join([sha, *imported]).encode("ascii")).hexdigest()
+            cache = self.get_cache(self.config.get_config(path).fingerprint, project.source_dirs, states[project.name])
+            entry = cache.get(sha)
+            if entry is None:
+                pending[path] = (cache, sha)
+            else:
+                entries[path] = entry
+        self.cached = len(entries)
+        logger.info("%s project(s), %s file(s): %s cached, %s to lint",
+                    len(self.projects), len(owners), len(entries), len(pending))
+        if not pending:
+            return entries
+
+        paths = sorted(pending)
+        index_sink = IndexSink()
+        options = dict(
+            limits=self.limits, on_progress=on_progress, ast_cache_dir=self.ast_cache_dir,
+            extra_records=submit_analyzers(paths, self.analyzers, self.limits.max_workers),
+            rcfiles=self.config.get_rcfiles(paths), source_roots={path: owners[path].source_dirs for path in paths},
+        )
+        if self.use_async:
+            asyncio.run(self.lint_async(paths, index_sink, options))
+        else:
+            governed_lint(paths, self.config.project.rcfile, [index_sink], **options)
+        for path in paths:
+            record = index_sink.index.get(path)
+            if record is None:
+                logger.warning("No lint result for %s", path)
+                continue
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                lines = f.read().splitlines()
+            cache, sha = pending[path]
+            entry = entries[path] = cache_entry(record, lines)
+            if not any(message.get("symbol") == QUARANTINE_SYMBOL for message in entry["messages"]):
+                cache.put(sha, entry)  # quarantined files are retried by the next run
+            self.linted += 1
+        return entries
+
+    async def lint_async(self, paths, index_sink, options):
+        orchestrator = AuditOrchestrator(self.limits.max_workers)
+        try:
+            await lint_async(orchestrator, paths, self.config.project.rcfile, [index_sink], **options)
+        finally:
+            orchestrator.close()
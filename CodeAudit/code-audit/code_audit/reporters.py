@@ -0,0 +1,93 @@
+# reports/reporters.py
+"""Pylint reporters used by code_audit (loaded by pylint as a plugin, no Django or pylint_report imports)."""
+import html
+import json
+
+from pylint.reporters.base_reporter import BaseReporter
+
+
+def _json_default(value):
+    if isinstance(value, set):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class StreamingJsonReporter(BaseReporter):
+    """
+    Emit one JSON line per linted module as soon as pylint moves on to the next one.
+
+    Lines look like {"module", "path", "stats", "messages"}; the last line is
+    {"stats": <global stats>}. Only the messages of the current module are buffered.
+    """
+
+    name = "code audit stream"
+
+    def __init__(self, output=None):
+        super().__init__(output)
+        self.current = None
+        self.seen = set()
+
+    def on_set_current_module(self, module, filepath):
+        self._flush_module()
+        self.current = {"module": module, "path": filepath, "messages": []}
+
+    def handle_message(self, msg):
+        if self.current is None or msg.module != self.current["module"]:
+            # e.g. pylintrc option messages emitted before the first module
+            self._write({"module": msg.module, "path": msg.path, "stats": {}, "messages": [self._message(msg)]})
+            return
+        self.current["messages"].append(self._message(msg))
+
+    @staticmethod
+    def _message(msg):
+        return {
+            "type": msg.category,
+            "module": msg.module,
+            "obj": msg.obj,
+            "line": msg.line,
+            "column": msg.column,
+            "path": msg.path,
+            "symbol": msg.symbol,
+            "message": html.escape(msg.msg or "", quote=False),
+            "message-id": msg.msg_id,
+        }
+
+    def _flush_module(self):
+        if self.current is None:
+            return
+        module = self.current["module"]
+        first_pass = module not in self.seen
+        self.seen.add(module)
+        if first_pass and not self.current["messages"]:
+            # pylint builds every AST before checking; the module is reported again when checked
+            self.current = None
+            return
+        by_module = getattr(self.linter.stats, "by_module", {}) if self.linter else {}
+        self.current["stats"] = dict(by_module.get(module, {}))
+        self._write(self.current)
+        self.current = None
+
+    def _write(self, data):
+        print(json.dumps(data, default=_json_default), file=self.out, flush=True)
+
+    def display_messages(self, layout):
+        """See ``pylint/reporters/base_reporter.py``."""
+
+    def display_reports(self, layout):
+        """See ``pylint/reporters/base_reporter.py``."""
+
+    def _display(self, layout):
+        """See ``pylint/reporters/base_reporter.py``."""
+
+    def on_close(self, stats, previous_stats):
+        self._flush_module()
+        stats = {
+            key: getattr(stats, key)
+            for key in ["statement", "error", "warning", "refactor", "convention", "fatal", "info"]
+        }
+        self._write({"stats": stats})
+
+
+def register(linter):
+    """Register reporters (required by :mod:`pylint`)."""
+    linter.register_reporter(StreamingJsonReporter)
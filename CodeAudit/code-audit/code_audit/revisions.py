@@ -0,0 +1,355 @@
+# reports/revisions.py
+"""
+Audit past revisions straight from git objects, without a checkout (no Django imports).
+
+File contents are read through one long running ``git cat-file --batch``
+process. Lint results are cached on disk by blob SHA (per lint configuration),
+so a file that did not change between revisions is linted once for the whole
+history: auditing a commit range only lints the blobs each revision introduced.
+
+Each file is linted with the configuration of its app in the working tree (see
+conf.py), and cached under that configuration's fingerprint.
+
+New blobs are linted in a scratch copy of their revision's Python files, so
+imports inside the audited paths resolve as they did at that revision; revisions
+are linted concurrently, each by its own governed pylint worker. The astroid
+cache is not used: its entries are keyed by path and scratch paths are never
+seen again. As in the batch runs, cross-file checks only see the files of their
+chunk, and a cached blob keeps the messages of the revision it was first linted in.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from .analyzers import submit_analyzers
+from .engine import QUARANTINE_SYMBOL, WorkerLimits, governed_lint
+from .fingerprints import fingerprint_messages, normalize_line
+from .lint import IndexSink, LintError, get_data_score, merge_for_files, module_name_from_path
+from .selection import FileSelector
+
+logger = logging.getLogger(__name__)
+
+RESULTS_VERSION = 2
+
+
+class GitError(LintError):
+    """A git command failed."""
+
+
+def git(repo, *args):
+    """Output of a git command run in repo."""
+    result = subprocess.run(["git", *args], cwd=repo, capture_output=True, text=True)
+    if result.returncode:
+        raise GitError(f"git {args[0]} failed ({result.returncode}): {result.stderr.strip()}")
+    return result.stdout
+
+
+def get_repo_root(path):
+    return git(path, "rev-parse", "--show-toplevel").strip()
+
+
+def list_revisions(repo, rev_range, max_count=None, first_parent=False):
+    """
+    Commits of a range, oldest first.
+
+    :param rev_range: anything git rev-list accepts, e.g. "v1.0..main" or "HEAD"
+    :param max_count: only the newest max_count commits
+    :return: list of (commit sha, commit timestamp)
+    """
+    args = ["rev-list", "--timestamp"]
+    if first_parent:
+        args.append("--first-parent")
+    if max_count:
+        args.append(f"--max-count={max_count}")
+    revisions = []
+    for line in git(repo, *args, rev_range, "--").splitlines():
+        timestamp, commit = line.split()
+        revisions.append((commit, int(timestamp)))
+    return list(reversed(revisions))
+
+
+def list_python_blobs(repo, commit, paths):
+    """
+    Python files under repository relative paths at a commit.
+
+    :return: {repo relative path: blob sha}
+    """
+    blobs = {}
+    for entry in git(repo, "ls-tree", "-r", "-z", commit, "--", *paths).split("\0"):
+        if not entry:
+            continue
+        info, path = entry.split("\t", 1)
+        _, object_type, sha = info.split()
+        if object_type == "blob" and path.endswith(".py"):
+            blobs[path] = sha
+    return blobs
+
+
+def is_audited(path, targets, selector):
+    """lint.get_target_files() on repository relative paths: explicit files, or files the selector keeps."""
+    return path in targets or selector.is_selected(path)
+
+
+def get_config_key(fingerprint, analyzers=(), source_roots=(), state=None):
+    """
+    Hash of what changes lint results besides the file content.
+
+    :param fingerprint: conf.LintConfig.fingerprint (pylint version and options)
+    :param source_roots: directories imports were resolved against, if not the file's own package root
+    :param state: hash of anything else the results depend on, e.g. projects.Project.get_state
+    """
+    key = f"{RESULTS_VERSION}\0{fingerprint}\0{list(analyzers)}"
+    if source_roots:
+        key += f"\0{list(source_roots)}"
+    if state:
+        key += f"\0{state}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+class GitObjectReader:
+    """Read blobs through one long running ``git cat-file --batch`` process."""
+
+    def __init__(self, repo):
+        self.proc = subprocess.Popen(
+            ["git", "cat-file", "--batch"], cwd=repo, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        )
+
+    def read(self, sha):
+        self.proc.stdin.write(f"{sha}\n".encode("ascii"))
+        self.proc.stdin.flush()
+        header = self.proc.stdout.readline().decode("ascii", "replace").split()
+        if len(header) != 3:  # "<sha> missing"
+            raise GitError(f"Cannot read git object {sha}: {' '.join(header) or 'cat-file exited'}")
+        data = self.proc.stdout.read(int(header[2]))
+        self.proc.stdout.read(1)  # newline after the content
+        return data
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+        self.proc.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ResultCache:
+    """
+    JSON entries by blob SHA, e.g. lint results stored as {"stats": ..., "messages": [...]}
+    without path and module (see cache_entry).
+
+    :param config_key: sub directory, for entries that depend on more than the content
+    """
+
+    def __init__(self, cache_dir, config_key):
+        self.cache_dir = os.path.join(cache_dir, config_key)
+
+    def get_path(self, sha):
+        return os.path.join(self.cache_dir, sha[:2], f"{sha}.json")
+
+    def __contains__(self, sha):
+        return os.path.exists(self.get_path(sha))
+
+    def get(self, sha):
+        try:
+            with open(self.get_path(sha), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logger.debug("Ignoring unreadable result cache entry %s: %s", sha, e)
+            return None
+
+    def put(self, sha, entry):
+        """Write an entry atomically so concurrent runs never read a partial file."""
+        path = self.get_path(sha)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+
+def cache_entry(record, lines):
+    """Cacheable form of a linted record; messages keep their line text for fingerprints."""
+    messages = []
+    for message in record["messages"]:
+        message = {key: value for key, value in message.items() if key not in ("path", "module")}
+        line = message.get("line") or 0
+        message["context"] = normalize_line(lines[line - 1]) if 0 < line <= len(lines) else ""
+        messages.append(message)
+    return {"stats": record["stats"], "messages": messages}
+
+
+def relocate(entry, path, module=None):
+    """
+    Index entry of a cached blob found at path.
+
+    :param module: dotted module name, by default the path relative to the working directory
+    """
+    module = module or module_name_from_path(path)
+    return {
+        "module": module,
+        "stats": entry["stats"],
+        "messages": [{**message, "module": module, "path": path} for message in entry["messages"]],
+    }
+
+
+class RevisionResult:
+    """Audit result of one revision."""
+
+    def __init__(self, commit, timestamp, stats, score, fingerprints, files):
+        self.commit = commit
+        self.timestamp = timestamp
+        self.stats = stats
+        self.score = score
+        self.fingerprints = fingerprints
+        self.files = files
+
+
+class RevisionAudit:
+    """
+    Audit the same paths of a repository at many revisions.
+
+    :param paths: repository relative files/directories, as in a CodeAudit target
+    :param config: conf.AuditConfig; a file is linted with the configuration of its working tree path
+    :param cache_dir: directory of the ResultCache of each configuration, shared between targets and runs
+    :param selector: selection.FileSelector, default rules when None (.gitignore files are not read)
+    """
+
+    def __init__(self, repo, paths, config, cache_dir, limits=None, analyzers=(), selector=None):
+        self.repo = repo
+        self.paths = list(paths)
+        self.config = config
+        self.cache_dir = cache_dir
+        self.caches = {}
+        self.limits = limits or WorkerLimits()
+        self.analyzers = list(analyzers)
+        self.selector = selector or FileSelector()
+        self.entries = {}
+        self.linted = 0
+
+    def run(self, revisions):
+        """
+        :param revisions: [(commit, timestamp)] as returned by list_revisions()
+        :return: RevisionResult list in the order of revisions, without revisions that have no audited file
+        """
+        with ThreadPoolExecutor(max_workers=self.limits.max_workers) as executor:
+            trees = list(executor.map(lambda revision: list_python_blobs(self.repo, revision[0], self.paths),
+                                      revisions))
+        trees = {commit: tree for (commit, _), tree in zip(revisions, trees)}
+
+        pending = {}
+        for commit, tree in trees.items():
+            for path, sha in tree.items():
+                if not is_audited(path, self.paths, self.selector):
+                    continue
+                key = self.get_key(path, sha)
+                if key not in pending and sha not in self.get_cache(key[0]):
+                    pending[key] = (commit, path)
+        logger.info("%s revision(s), %s blob(s) to lint", len(revisions), len(pending))
+        self.lint_pending(pending, trees)
+
+        results = []
+        for commit, timestamp in revisions:
+            result = self.get_result(commit, timestamp, trees[commit])
+            if result is not None:
+                results.append(result)
+        return results
+
+    def get_key(self, path, sha):
+        """(configuration fingerprint, blob sha) of a repository relative path."""
+        return self.config.get_config(os.path.join(self.repo, path)).fingerprint, sha
+
+    def get_cache(self, fingerprint):
+        if fingerprint not in self.caches:
+            self.caches[fingerprint] = ResultCache(self.cache_dir, get_config_key(fingerprint, self.analyzers))
+        return self.caches[fingerprint]
+
+    def lint_pending(self, pending, trees):
+        """Lint blobs in the revision that introduced them, up to max_workers revisions at a time."""
+        by_commit = {}
+        for (_, sha), (commit, path) in pending.items():
+            by_commit.setdefault(commit, []).append((path, sha))
+        with ThreadPoolExecutor(max_workers=self.limits.max_workers) as executor:
+            for entries in executor.map(lambda item: self.lint_revision(trees[item[0]], item[1]), by_commit.items()):
+                self.entries.update(entries)
+                self.linted += len(entries)
+
+    def lint_revision(self, tree, files):
+        """
+        Lint blobs of one revision in their own pylint run: modules of several
+        revisions would share dotted names (and sys.path) in a single run.
+
+        :param tree: {repo relative path: blob sha} of the revision
+        :param files: [(repo relative path, blob sha)] to lint
+        :return: {(configuration fingerprint, blob sha): cache entry}
+        """
+        root = os.path.realpath(tempfile.mkdtemp(prefix="code_audit_revision_"))
+        entries = {}
+        lines = {}
+        targets = {os.path.join(root, path): sha for path, sha in files}
+        configs = {os.path.join(root, path): self.config.get_config(os.path.join(self.repo, path))
+                   for path, _ in files}
+        wanted = set(targets.values())
+        try:
+            with GitObjectReader(self.repo) as reader:
+                for path, sha in tree.items():
+                    data = reader.read(sha)
+                    write_file(os.path.join(root, path), data)
+                    if sha in wanted:
+                        lines[sha] = data.decode("utf-8", "replace").splitlines()
+            paths = sorted(targets)
+            limits = WorkerLimits(
+                max_workers=1, files_per_worker=self.limits.files_per_worker, max_rss_mb=self.limits.max_rss_mb,
+                max_retries=self.limits.max_retries,
+            )
+            index_sink = IndexSink()
+            rcfiles = {path: config.rcfile for path, config in configs.items() if config is not self.config.project}
+            governed_lint(paths, self.config.project.rcfile, [index_sink], limits=limits,
+                          extra_records=submit_analyzers(paths, self.analyzers), rcfiles=rcfiles)
+            for path, sha in targets.items():
+                record = index_sink.index.get(path)
+                if record is None:
+                    logger.warning("No lint result for %s (blob %s)", path, sha)
+                    continue
+                fingerprint = configs[path].fingerprint
+                entry = entries[fingerprint, sha] = cache_entry(record, lines[sha])
+                if not any(message.get("symbol") == QUARANTINE_SYMBOL for message in entry["messages"]):
+                    self.get_cache(fingerprint).put(sha, entry)  # quarantined blobs are retried by the next run
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+        return entries
+
+    def get_entry(self, key):
+        if key not in self.entries:
+            self.entries[key] = self.get_cache(key[0]).get(key[1])
+        return self.entries[key]
+
+    def get_result(self, commit, timestamp, tree):
+        index = {}
+        for path, sha in tree.items():
+            entry = self.get_entry(self.get_key(path, sha)) if is_audited(path, self.paths, self.selector) else None
+            if entry is not None:
+                abs_path = os.path.join(self.repo, path)
+                index[abs_path] = relocate(entry, abs_path)
+        if not index:
+            return None
+        data = merge_for_files(index, sorted(index))
+        return RevisionResult(
+            commit, timestamp, data["stats"], get_data_score(data), fingerprint_messages(data["messages"]), len(index),
+        )
+
+
+def write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
@@ -0,0 +1,241 @@
+# reports/scheduler.py
+"""
+Planner of scheduled audits (see the code_audit_schedule command).
+
+A tick only looks at the schedules that are due. Their inputs are checked with
+the cheapest signal first: the mtimes and sizes of the target files (one stat
+per file, shared by the schedules of the same target) and the fingerprints of
+their lint configuration (resolved in memory, again when an rcfile changes).
+Files are hashed only when those changed, and a report is queued (jobs.submit)
+only when the file contents or the lint configuration changed since its last
+queued run, so an idle repository costs a few stat calls per interval. A change
+found while a job of the report is active is not recorded, so it is queued by a
+later check.
+
+The inputs of a monorepo project report (see projects.py) are the files of its
+app in the project of the manifest, linted with the projects' configuration.
+
+Queued and running jobs count against a global concurrency limit; due reports
+over the limit stay due for the next tick. Nothing is checked or queued inside
+the quiet hours window.
+
+Configured in settings.CODE_AUDIT::
+
+    CODE_AUDIT = {
+        "MAX_CONCURRENT_JOBS": 1,
+        "QUIET_HOURS": "08:00-18:00",  # local time, may wrap midnight
+    }
+"""
+import datetime
+import hashlib
+import logging
+import os
+
+from django.conf import settings
+from django.db.models import Min
+from django.utils import timezone
+
+from .batch import get_projects_config, read_projects
+from .code_audit import CodeAudit
+from .jobs import expire_stale_jobs, submit
+from .lint import LintError, get_target_files
+from .models import CodeAuditJob, CodeAuditSchedule
+from .selection import FileSelector
+
+logger = logging.getLogger(__name__)
+
+
+def parse_quiet_hours(value):
+    """:return: (start, end) datetime.time of a "HH:MM-HH:MM" window, None if value is empty"""
+    if not value:
+        return None
+    try:
+        start, end = (datetime.time.fromisoformat(part.strip()) for part in value.split("-"))
+    except ValueError as e:
+        raise ValueError(f"Invalid quiet hours {value!r}, expected HH:MM-HH:MM") from e
+    return start, end
+
+
+def is_quiet(window, now):
+    """True if the local time of now is inside the window (the end is excluded)."""
+    if window is None:
+        return False
+    start, end = window
+    current = timezone.localtime(now).time()
+    if start <= end:
+        return start <= current < end
+    return current >= start or current < end
+
+
+def quiet_seconds_left(window, now):
+    """Seconds until the window ends, 0 outside of it."""
+    if not is_quiet(window, now):
+        return 0
+    local = timezone.localtime(now)
+    end = local.replace(hour=window[1].hour, minute=window[1].minute, second=0, microsecond=0)
+    if end <= local:
+        end += datetime.timedelta(days=1)
+    return (end - local).total_seconds()
+
+
+def get_stat_signature(files, fingerprints=()):
+    """
+    Hash of the paths, mtimes and sizes of files and of the fingerprints of their lint configurations;
+    missing files count as changed inputs.
+    """
+    key = hashlib.sha1("\0".join(sorted(fingerprints)).encode("utf-8"))
+    for path in files:
+        try:
+            stat = os.stat(path)
+            key.update(f"{path}\0{stat.st_mtime_ns}\0{stat.st_size}\n".encode("utf-8"))
+        except OSError:
+            key.update(f"{path}\0missing\n".encode("utf-8"))
+    return key.hexdigest()
+
+
+def get_content_signature(files, fingerprints):
+    """Hash of the contents of files and of the fingerprints of their lint configurations."""
+    key = hashlib.sha1("\0".join(sorted(fingerprints)).encode("utf-8"))
+    for path in files:
+        key.update(f"{path}\n".encode("utf-8"))
+        try:
+            with open(path, "rb") as f:
+                key.update(hashlib.file_digest(f, "sha1").digest())
+        except OSError:
+            key.update(b"missing")
+    return key.hexdigest()
+
+
+class AuditScheduler:
+    """
+    Queue the due reports whose inputs changed.
+
+    :param max_concurrent: queued plus running jobs allowed at once
+    :param quiet_hours: (start, end) of parse_quiet_hours, None for no quiet window
+    :param dry_run: only log what would be queued, nothing is saved
+    """
+
+    def __init__(self, max_concurrent=None, quiet_hours=None, dry_run=False):
+        code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+        self.max_concurrent = max_concurrent or code_audit.get("MAX_CONCURRENT_JOBS", 1)
+        self.quiet_hours = quiet_hours
+        self.dry_run = dry_run
+        self.audit = CodeAudit()
+        self._projects = None
+
+    def get_input_files(self, file_name, app_list):
+        """Python files a report target covers, as audited by CodeAudit."""
+        if file_name:
+            targets = self.audit.resolve_file_name(file_name, app_list)
+        else:
+            targets = " ".join(self.audit.get_app_dirs().values())
+        return get_target_files(targets, self.audit.get_file_selector())
+
+    def get_project_inputs(self, report):
+        """:return: (Python files, AuditConfig) of the app of a monorepo project report"""
+        if self._projects is None:
+            projects = read_projects()
+            self._projects = {project.name: project for project in projects}, get_projects_config(projects)
+        projects, config = self._projects
+        project = projects.get(report.project)
+        if project is None:
+            raise FileNotFoundError(f"Project {report.project} is not in the monorepo manifest")
+        app_dir = project.apps.get(report.module_name)
+        if app_dir is None:
+            raise FileNotFoundError(f"App {report.module_name} not found in the settings of project {report.project}")
+        code_audit = getattr(settings, 'CODE_AUDIT', {}) or {}
+        return sorted(FileSelector.from_settings(code_audit, base_dir=project.root).walk(app_dir)), config
+
+    def tick(self, now=None):
+        """
+        Check the due schedules once.
+
+        :return: {"due", "unchanged", "queued", "busy", "deferred", "failed"} counts; busy reports
+            changed while a job of theirs was already queued or running
+        """
+        now = now or timezone.now()
+        summary = {"due": 0, "unchanged": 0, "queued": 0, "busy": 0, "deferred": 0, "failed": 0}
+        if is_quiet(self.quiet_hours, now):
+            return summary
+        due = list(
+            CodeAuditSchedule.objects.filter(enabled=True, next_check_at__lte=now)
+            .select_related("report").order_by("next_check_at")
+        )
+        summary["due"] = len(due)
+        if not due:
+            return summary
+
+        app_list = self.audit.get_django_project_apps()
+        config = self.audit.get_config()
+        self._projects = None  # the manifest is read again by every tick that needs it
+        if not self.dry_run:
+            expire_stale_jobs(now)
+        slots = self.max_concurrent - CodeAuditJob.objects.filter(status__in=CodeAuditJob.ACTIVE_STATUSES).count()
+        inputs = {}
+        for schedule in due:
+            report = schedule.report
+            file_name = report.file_name or ""
+            key = (report.project, report.module_name if report.project else file_name)
+            try:
+                if key not in inputs:
+                    if report.project:
+                        files, target_config = self.get_project_inputs(report)
+                    else:
+                        files, target_config = self.get_input_files(file_name, app_list), config
+                    # configuration first: an rcfile edit alone changes the stat signature too
+                    fingerprints = {target_config.get_config(path).fingerprint for path in files}
+                    inputs[key] = {"files": files, "fingerprints": fingerprints,
+                                   "stat": get_stat_signature(files, fingerprints)}
+                target = inputs[key]
+                if target["stat"] != schedule.stat_signature and "content" not in target:
+                    target["content"] = get_content_signature(target["files"], target["fingerprints"])
+            except (FileNotFoundError, LintError, ValueError) as e:
+                logger.warning(f"Schedule of report {schedule.report_id}: {e}")
+                summary["failed"] += 1
+                self.reschedule(schedule, now)
+                continue
+
+            schedule.last_checked_at = now
+            if target["stat"] == schedule.stat_signature or target["content"] == schedule.content_signature:
+                summary["unchanged"] += 1
+                schedule.stat_signature = target["stat"]
+                self.reschedule(schedule, now)
+                continue
+            if slots <= 0:
+                summary["deferred"] += 1  # still due on the next tick
+                continue
+            logger.info(f"Inputs of report {schedule.report_id} ({file_name or 'app level'}) changed, queueing it")
+            if self.dry_run:
+                summary["queued"] += 1
+                slots -= 1
+                continue
+            _, created = submit(schedule.report)
+            if not created:
+                # the active job may have read the inputs before this change: the signatures are
+                # kept, so the change is queued by a check after that job
+                summary["busy"] += 1
+                self.reschedule(schedule, now)
+                continue
+            summary["queued"] += 1
+            slots -= 1
+            schedule.stat_signature = target["stat"]
+            schedule.content_signature = target["content"]
+            schedule.last_queued_at = now
+            self.reschedule(schedule, now)
+        return summary
+
+    def reschedule(self, schedule, now):
+        schedule.next_check_at = now + datetime.timedelta(minutes=schedule.interval_minutes)
+        if not self.dry_run:
+            schedule.save()
+
+    def get_sleep_seconds(self, max_seconds, now=None):
+        """Seconds until the next schedule is due or the quiet hours end, at most max_seconds."""
+        now = now or timezone.now()
+        quiet = quiet_seconds_left(self.quiet_hours, now)
+        if quiet:
+            return min(quiet, max_seconds)
+        next_check = CodeAuditSchedule.objects.filter(enabled=True).aggregate(next=Min("next_check_at"))["next"]
+        if next_check is None:
+            return max_seconds
+        return max(0.0, min((next_check - now).total_seconds(), max_seconds))
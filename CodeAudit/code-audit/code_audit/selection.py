@@ -0,0 +1,268 @@
+# reports/selection.py
+"""
+Selection of the files an audit covers (no Django imports).
+
+Include and exclude rules are gitignore-style globs, compiled once into regular
+expressions:
+
+* ``name`` matches a file or directory name at any depth, ``dir/`` only
+  directories;
+* a pattern with a ``/`` inside (or a leading one) is anchored to the project
+  root, e.g. ``/build/`` or ``shop/legacy/*.py``;
+* ``*`` and ``?`` do not cross ``/``, ``**`` does, ``[...]`` is a class;
+* ``!pattern`` re-includes what an earlier rule excluded, the last matching
+  rule wins.
+
+Excluded directories are pruned while walking, so their contents are never
+listed, and ``.gitignore`` files (of the walked tree and of its parents up to
+the repository root) are honored the same way.
+
+Configured in settings.CODE_AUDIT::
+
+    CODE_AUDIT = {
+        "INCLUDE": ["*.py"],
+        "EXCLUDE": ["static/", "vendor/", "!tests/"],  # added to DEFAULT_EXCLUDE
+        "RESPECT_GITIGNORE": True,
+    }
+"""
+import os
+import re
+
+DEFAULT_INCLUDE = ["*.py"]
+DEFAULT_EXCLUDE = [
+    "migrations/", "tests/", "build/",
+    "__*", "000*", "settings.py",
+    "node_modules/", ".*/",
+]
+
+_gitignore_cache = {}
+
+
+def translate(glob):
+    """Regular expression (without anchors) of a gitignore-style glob."""
+    parts = []
+    i = 0
+    n = len(glob)
+    while i < n:
+        if glob.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif glob.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif glob[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif glob[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif glob[i] == "[" and "]" in glob[i + 2:]:
+            end = glob.index("]", i + 2)
+            content = glob[i + 1:end].replace("\\", "\\\\")
+            if content[0] in "!^":
+                content = "^" + content[1:]
+            parts.append(f"[{content}]")
+            i = end + 1
+        elif glob[i] == "\\" and i + 1 < n:
+            parts.append(re.escape(glob[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(glob[i]))
+            i += 1
+    return "".join(parts)
+
+
+class RuleSet:
+    """
+    Compiled gitignore-style patterns, matched against "/" separated paths relative to base.
+
+    :param base: directory the patterns are relative to (for .gitignore files), None for any root
+    """
+
+    def __init__(self, patterns, base=None):
+        self.base = base
+        self.rules = []
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern or pattern.startswith("#"):
+                continue
+            negate = pattern.startswith("!")
+            pattern = pattern[1:] if negate else pattern
+            dir_only = pattern.endswith("/")
+            pattern = pattern.rstrip("/")
+            if not pattern:
+                continue
+            prefix = "" if "/" in pattern else "(?:.*/)?"
+            self.rules.append((re.compile(prefix + translate(pattern.lstrip("/")) + r"\Z"), negate, dir_only))
+
+        # without negations the first match decides: one alternation per path kind
+        self.combined = None
+        if not any(negate for _, negate, _ in self.rules):
+            self.combined = {
+                is_dir: re.compile("|".join(
+                    f"(?:{regex.pattern})" for regex, _, dir_only in self.rules if is_dir or not dir_only
+                ) or r"(?!)")
+                for is_dir in (True, False)
+            }
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def match(self, path, is_dir=False):
+        """:return: True if path is matched, False if a negation re-includes it, None if no rule applies"""
+        if self.combined is not None:
+            return True if self.combined[is_dir].match(path) else None
+        for regex, negate, dir_only in reversed(self.rules):
+            if (is_dir or not dir_only) and regex.match(path):
+                return not negate
+        return None
+
+
+def load_gitignore(path):
+    """RuleSet of a .gitignore file, reparsed only when the file changes."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    cached = _gitignore_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            cached = _gitignore_cache[path] = (mtime, RuleSet(f.read().splitlines(), base=os.path.dirname(path)))
+    return cached[1]
+
+
+def to_posix(path):
+    return path if os.sep == "/" else path.replace(os.sep, "/")
+
+
+class FileSelector:
+    """
+    Include/exclude rules plus .gitignore files.
+
+    :param base_dir: project root that anchored patterns are relative to (default: the walked directory)
+    """
+
+    def __init__(self, include=None, exclude=None, base_dir=None, use_gitignore=True):
+        self.include = RuleSet(DEFAULT_INCLUDE if include is None else include)
+        self.exclude = RuleSet(DEFAULT_EXCLUDE if exclude is None else exclude)
+        self.base_dir = os.path.abspath(base_dir) if base_dir else None
+        self.use_gitignore = use_gitignore
+
+    @classmethod
+    def from_settings(cls, code_audit, base_dir=None):
+        """Build from settings.CODE_AUDIT: INCLUDE, EXCLUDE (added to DEFAULT_EXCLUDE) and RESPECT_GITIGNORE."""
+        return cls(
+            include=code_audit.get("INCLUDE"),
+            exclude=DEFAULT_EXCLUDE + list(code_audit.get("EXCLUDE", [])),
+            base_dir=base_dir,
+            use_gitignore=code_audit.get("RESPECT_GITIGNORE", True),
+        )
+
+    def get_root(self, path):
+        """Directory that rule paths are relative to: base_dir when path is inside it."""
+        if self.base_dir and (path == self.base_dir or path.startswith(self.base_dir + os.sep)):
+            return self.base_dir
+        return None
+
+    def relative(self, path):
+        """
+        "/" separated form of path relative to the project root, None for a path outside of it.
+
+        The project root is base_dir, or the current directory when it is unset; relative paths are
+        kept as they are, unless they climb out of the root with "..".
+        """
+        path = os.path.normpath(path)
+        if not os.path.isabs(path):
+            return None if path == os.pardir or path.startswith(os.pardir + os.sep) else to_posix(path)
+        root = self.base_dir or os.getcwd()
+        if path != root and not path.startswith(root.rstrip(os.sep) + os.sep):
+            return None
+        return to_posix(os.path.relpath(path, root))
+
+    def is_excluded(self, path, is_dir=False):
+        """
+        True if a path or one of its parent directories inside the project is excluded by the rules
+        (.gitignore files are not read). The directories above the project root are never matched, and
+        neither are paths outside of it.
+
+        :param path: path relative to the project root, or absolute
+        """
+        relative = self.relative(path)
+        if relative is None:
+            return False
+        parts = [part for part in relative.split("/") if part not in ("", ".")]
+        for depth in range(1, len(parts)):
+            if self.exclude.match("/".join(parts[:depth]), is_dir=True):
+                return True
+        return bool(parts) and bool(self.exclude.match("/".join(parts), is_dir=is_dir))
+
+    def is_selected(self, path):
+        """
+        True for a file of the project that is included and not excluded (.gitignore files are not read);
+        paths outside the project root are never selected.
+        """
+        relative = self.relative(path)
+        return relative is not None and bool(self.include.match(relative)) and not self.is_excluded(path)
+
+    def walk_tree(self, top):
+        """
+        os.walk() of top with excluded and ignored directories pruned.
+
+        :return: iterator of (root, kept dir names, file names); file names are not filtered
+        """
+        for root, dirs, names, _, _ in self._walk(top):
+            yield root, dirs, names
+
+    def walk(self, top):
+        """Selected files under top (absolute paths); excluded trees are not walked."""
+        for root, dirs, names, root_dir, gitignores in self._walk(top):
+            for name in names:
+                path = os.path.join(root, name)
+                if (self.include.match(to_posix(path[len(root_dir) + 1:]))
+                        and not self._is_ignored(path, root_dir, gitignores, False)):
+                    yield path
+
+    def _walk(self, top):
+        top = os.path.abspath(top)
+        root_dir = self.get_root(top) or top
+        inherited = {top: self.parent_gitignores(top) if self.use_gitignore else []}
+        for root, dirs, names in os.walk(top):
+            gitignores = inherited.pop(root, [])
+            if self.use_gitignore and ".gitignore" in names:
+                gitignore = load_gitignore(os.path.join(root, ".gitignore"))
+                if gitignore:
+                    gitignores = gitignores + [gitignore]
+            kept = []
+            for name in dirs:
+                path = os.path.join(root, name)
+                if not self._is_ignored(path, root_dir, gitignores, True):
+                    kept.append(name)
+                    inherited[path] = gitignores
+            dirs[:] = kept
+            yield root, dirs, names, root_dir, gitignores
+
+    def _is_ignored(self, path, root_dir, gitignores, is_dir):
+        verdict = self.exclude.match(to_posix(path[len(root_dir) + 1:]), is_dir)
+        if verdict is not None:
+            return verdict
+        for gitignore in reversed(gitignores):
+            if path.startswith(gitignore.base + os.sep):
+                verdict = gitignore.match(to_posix(path[len(gitignore.base) + 1:]), is_dir)
+                if verdict is not None:
+                    return verdict
+        return False
+
+    @staticmethod
+    def parent_gitignores(top):
+        """.gitignore files of the directories above top up to the repository root, outermost first."""
+        gitignores = []
+        path = top
+        while not os.path.exists(os.path.join(path, ".git")):
+            parent = os.path.dirname(path)
+            if parent == path:  # not in a repository
+                return []
+            path = parent
+            gitignore = load_gitignore(os.path.join(path, ".gitignore"))
+            if gitignore:
+                gitignores.append(gitignore)
+        return list(reversed(gitignores))
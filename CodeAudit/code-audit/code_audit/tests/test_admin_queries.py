@@ -0,0 +1,85 @@
+import contextlib
+import io
+import random
+import tempfile
+import time
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from code_audit.benchmarks.fixtures import LOADTEST_PROJECT, create_logs, create_reports, write_report
+
+CHANGELIST = "/admin/code_audit/codeauditreport/"
+
+
+class AdminQueryCountTests(TestCase):
+    """
+    Query counts and timings of the admin hot paths over a seeded dataset.
+
+    The query counts must not depend on the number of reports or logs: a
+    changelist page or a report view that runs a query per row fails here.
+    """
+    REPORTS = 5000
+    LOGS = 50000
+    MAX_CHANGELIST_SECONDS = 2.0
+    MAX_VIEW_SECONDS = 1.0
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        rng = random.Random(0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            small_report = write_report(f"{cls.tmp.name}/small.html", 64 * 1024, rng)
+            large_report = write_report(f"{cls.tmp.name}/large.html", 8 * 1024 * 1024, rng)
+            report_ids = create_reports(cls.REPORTS, 50, 1000, small_report, large_report, 1000, rng)
+            create_logs(report_ids, cls.LOGS, 365, 5000, small_report, rng)
+        cls.small_report_id, cls.large_report_id = report_ids[1], report_ids[0]
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "admin")
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get(self, path):
+        """:return: (response, seconds, number of queries)"""
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = self.client.get(path)
+            body = b"".join(response.streaming_content) if response.streaming else response.content
+            elapsed = time.perf_counter() - start
+        self.assertEqual(response.status_code, 200, path)
+        self.assertTrue(body, path)
+        return response, elapsed, len(queries)
+
+    @skipUnless(connection.vendor == "postgresql", "the changelist aggregates scores with ArrayAgg")
+    def test_changelist(self):
+        # session, user, the page count, the page and the project, module_name and status filter choices
+        for path in (
+            CHANGELIST,
+            f"{CHANGELIST}?p=10",
+            f"{CHANGELIST}?project__exact={LOADTEST_PROJECT}&status__exact=Completed",
+        ):
+            with self.assertNumQueries(7):
+                _, elapsed, _ = self.get(path)
+            self.assertLess(elapsed, self.MAX_CHANGELIST_SECONDS, path)
+
+    def test_view_report(self):
+        for pk in (self.small_report_id, self.large_report_id):
+            path = f"{CHANGELIST}view/{pk}/"
+            # session, user and the report
+            with self.assertNumQueries(3):
+                _, elapsed, _ = self.get(path)
+            self.assertLess(elapsed, self.MAX_VIEW_SECONDS, path)
+
+    def test_diff_report(self):
+        _, elapsed, count = self.get(f"{CHANGELIST}diff/{self.small_report_id}/?format=json")
+        # session, user, the report, the latest log id and its fingerprints
+        self.assertEqual(count, 5)
+        self.assertLess(elapsed, self.MAX_VIEW_SECONDS)
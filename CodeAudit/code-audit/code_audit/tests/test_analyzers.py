@@ -0,0 +1,34 @@
+from django.test import SimpleTestCase
+
+from code_audit.lint import merge_records
+
+
+def message(line, msg_type, symbol):
+    return {"type": msg_type, "module": "shop.views", "obj": "", "line": line, "column": 0,
+            "path": "shop/views.py", "symbol": symbol, "message": "", "message-id": ""}
+
+
+def record(*messages):
+    stats = {"statement": 10}
+    for item in messages:
+        stats[item["type"]] = stats.get(item["type"], 0) + 1
+    return {"module": "shop.views", "path": "shop/views.py", "stats": stats, "messages": list(messages)}
+
+
+class MergeRecordsTests(SimpleTestCase):
+
+    def test_checks_pylint_reports_on_the_same_line_are_dropped(self):
+        merged = merge_records(
+            record(message(3, "convention", "singleton-comparison"), message(4, "warning", "eval-used")),
+            record(message(3, "convention", "style-singleton-comparison"), message(4, "warning", "security-eval"),
+                   message(5, "warning", "security-shell-true")),
+        )
+        self.assertEqual([m["symbol"] for m in merged["messages"]],
+                         ["singleton-comparison", "eval-used", "security-shell-true"])
+        self.assertEqual(merged["stats"], {"statement": 10, "convention": 1, "warning": 2})
+
+    def test_same_check_on_another_line_is_kept(self):
+        merged = merge_records(record(message(3, "convention", "line-too-long")),
+                               record(message(8, "convention", "style-line-too-long")))
+        self.assertEqual(len(merged["messages"]), 2)
+        self.assertEqual(merged["stats"]["convention"], 2)
@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from code_audit.api.json_api import encode_cursor
+from code_audit.exporters import get_output_path
+from code_audit.models import CodeAuditJob, CodeAuditReport
+
+AUTH = {"HTTP_AUTHORIZATION": "Bearer secret"}
+
+
+@override_settings(ROOT_URLCONF="code_audit.api.urls", CODE_AUDIT={"API_TOKEN": "secret"})
+class JsonApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        report_path = os.path.join(cls.tmp.name, "shop.html")
+        with open(get_output_path(report_path, "jsonl"), "w", encoding="utf-8") as f:
+            for name in ("views", "models"):
+                messages = [{"path": f"shop/{name}.py", "type": "convention", "symbol": "line-too-long", "line": line}
+                            for line in (1, 2)]
+                f.write(json.dumps({"module": f"shop.{name}", "path": f"shop/{name}.py", "messages": messages}) + "\n")
+            f.write(json.dumps({"stats": {}}) + "\n")
+        cls.report = CodeAuditReport.objects.create(module_name="shop", file_name="shop", report_path=report_path)
+        cls.job = CodeAuditJob.objects.create(report=cls.report)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.tmp.cleanup()
+
+    def urls(self):
+        pk = self.report.pk
+        return [
+            "/api/reports/", f"/api/reports/{pk}/", f"/api/reports/{pk}/runs/", f"/api/reports/{pk}/scores/",
+            f"/api/reports/{pk}/files/", f"/api/reports/{pk}/messages/", f"/api/jobs/{self.job.pk}/",
+        ]
+
+    def test_reads_need_a_token_or_staff(self):
+        user = get_user_model().objects.create_user("bob", password="bob")
+        self.client.force_login(user)
+        for url in self.urls():
+            self.assertEqual(self.client.get(url).status_code, 403, url)
+            self.assertEqual(self.client.get(url, **AUTH).status_code, 200, url)
+        user.is_staff = True
+        user.save()
+        for url in self.urls():
+            self.assertEqual(self.client.get(url).status_code, 200, url)
+
+    def test_cursors_of_the_wrong_shape_are_rejected(self):
+        pk = self.report.pk
+        bad = {
+            "/api/reports/": [[], ["1"], [1, 2], [-1], [True]],
+            f"/api/reports/{pk}/runs/": [[1, 1], ["yesterday", 1], ["2026-13-01T00:00:00", 1], {"a": 1}],
+            f"/api/reports/{pk}/files/": [[0, 0], [5], [2 ** 70]],
+            f"/api/reports/{pk}/messages/": [[0], [0, "1"], None, 3, [5, 0]],
+        }
+        for url, cursors in bad.items():
+            for cursor in cursors:
+                response = self.client.get(url, {"cursor": encode_cursor(cursor)}, **AUTH)
+                self.assertEqual(response.status_code, 400, (url, cursor))
+        response = self.client.get(f"/api/reports/{pk}/messages/", {"cursor": "not base64!"}, **AUTH)
+        self.assertEqual(response.status_code, 400)
+
+    def test_message_pages_follow_the_next_cursor(self):
+        url = f"/api/reports/{self.report.pk}/messages/"
+        lines, params = [], {"limit": 3}
+        while True:
+            data = self.client.get(url, params, **AUTH).json()
+            lines += [(row["path"], row["line"]) for row in data["results"]]
+            if not data["next"]:
+                break
+            params["cursor"] = data["next"]
+        self.assertEqual(lines, [("shop/views.py", 1), ("shop/views.py", 2),
+                                 ("shop/models.py", 1), ("shop/models.py", 2)])
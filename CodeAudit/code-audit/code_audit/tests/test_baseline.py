@@ -0,0 +1,71 @@
+import io
+import os
+import tempfile
+from types import SimpleNamespace
+
+from django.core.management.base import OutputWrapper
+from django.test import SimpleTestCase
+
+from code_audit.baseline import MAGIC, Baseline, BaselineError
+from code_audit.management.commands.code_audit import Command
+
+KNOWN = "0123456789abcdef"
+FIXED = "fedcba9876543210"
+NEW = "00112233aabbccdd"
+
+
+class BaselineTests(SimpleTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "baseline.bin")
+
+    def write(self, data):
+        with open(self.path, "wb") as f:
+            f.write(data)
+
+    def run_check(self, fingerprints, update=False, prune=False):
+        command = Command()
+        command.stdout = command.stderr = OutputWrapper(io.StringIO())
+        command._audit = SimpleNamespace(
+            lint_stats={}, fingerprints={fp: ["app/views.py", 1, "unused-import", ""] for fp in fingerprints},
+        )
+        command.check_baseline(self.path, update=update, prune=prune)
+
+    def test_empty_file_is_invalid(self):
+        self.write(b"")
+        with self.assertRaises(BaselineError):
+            len(Baseline(self.path))
+        with self.assertRaises(BaselineError):
+            Baseline(self.path).missing([KNOWN])
+
+    def test_truncated_file_is_invalid(self):
+        self.write(MAGIC[:3])
+        with self.assertRaises(BaselineError):
+            Baseline(self.path).read()
+        self.write(MAGIC + bytes.fromhex(KNOWN)[:5])
+        with self.assertRaises(BaselineError):
+            Baseline(self.path).missing([KNOWN])
+
+    def test_command_fails_on_empty_baseline(self):
+        self.write(b"")
+        with self.assertRaises(SystemExit) as raised:
+            self.run_check([KNOWN])
+        self.assertEqual(raised.exception.code, 1)
+        with self.assertRaises(SystemExit):
+            self.run_check([KNOWN], update=True)
+        self.assertEqual(os.path.getsize(self.path), 0)
+
+    def test_command_fails_on_new_messages(self):
+        Baseline(self.path).update([KNOWN])
+        self.run_check([KNOWN])
+        with self.assertRaises(SystemExit):
+            self.run_check([KNOWN, NEW])
+
+    def test_update_prunes_fixed_messages(self):
+        Baseline(self.path).update([KNOWN, FIXED])
+        self.run_check([KNOWN, NEW], update=True)
+        self.assertEqual(Baseline(self.path).read(), {KNOWN, FIXED, NEW})
+        self.run_check([KNOWN, NEW], update=True, prune=True)
+        self.assertEqual(Baseline(self.path).read(), {KNOWN, NEW})
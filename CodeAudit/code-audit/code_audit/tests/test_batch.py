@@ -0,0 +1,28 @@
+import os
+
+from django.test import SimpleTestCase
+
+from code_audit.batch import get_output_file_path
+
+TIMESTAMP = "20260101_000000"
+
+
+class OutputFilePathTests(SimpleTestCase):
+
+    def test_same_basename_in_different_apps(self):
+        shop = get_output_file_path("shop/views.py", timestamp=TIMESTAMP)
+        blog = get_output_file_path("blog/views.py", timestamp=TIMESTAMP)
+        self.assertNotEqual(shop, blog)
+        self.assertTrue(os.path.basename(shop).startswith("shop_views_"))
+
+    def test_author_reports_of_the_same_target(self):
+        self.assertNotEqual(
+            get_output_file_path("shop", timestamp=TIMESTAMP),
+            get_output_file_path("shop", "alice", timestamp=TIMESTAMP),
+        )
+
+    def test_names_that_slug_alike(self):
+        self.assertNotEqual(
+            get_output_file_path("shop/views_x.py", timestamp=TIMESTAMP),
+            get_output_file_path("shop_views/x.py", timestamp=TIMESTAMP),
+        )
@@ -0,0 +1,60 @@
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.management.base import OutputWrapper
+from django.test import SimpleTestCase
+
+from code_audit.management.commands.code_audit import Command
+from code_audit.selection import FileSelector
+
+
+@unittest.skipUnless(shutil.which("git"), "git is not installed")
+class ChangedFilesTests(SimpleTestCase):
+    """--changed when manage.py is in a subdirectory of the repository."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.project = os.path.join(self.tmp.name, "sub")
+        os.makedirs(self.project)
+        self.write("sub/a.py", "A = 1\n")
+        self.write("other.py", "B = 1\n")
+        self.git("init", "-q")
+        self.git("add", ".")
+        self.git("-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-q", "-m", "initial")
+        cwd = os.getcwd()
+        os.chdir(self.project)
+        self.addCleanup(os.chdir, cwd)
+
+    def write(self, path, text):
+        with open(os.path.join(self.tmp.name, path), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def git(self, *args):
+        subprocess.run(["git", *args], cwd=self.tmp.name, check=True, capture_output=True)
+
+    def make_command(self):
+        command = Command()
+        command.stdout = command.stderr = OutputWrapper(io.StringIO())
+        command._audit = SimpleNamespace(get_file_selector=FileSelector)
+        return command
+
+    def test_modified_and_untracked_files_of_the_project(self):
+        self.write("sub/a.py", "A = 2\n")
+        self.write("sub/b.py", "B = 2\n")
+        self.write("other.py", "B = 2\n")  # outside the project directory
+        self.assertEqual(self.make_command().get_changed_files("HEAD"), ["a.py", "b.py"])
+
+    def test_failed_audit_exits_non_zero(self):
+        self.write("sub/a.py", "A = 2\n")
+        command = self.make_command()
+        with mock.patch.object(Command, "run_changed_audit", side_effect=RuntimeError("pylint crashed")):
+            with self.assertRaises(SystemExit) as raised:
+                command.handle(changed="HEAD", fail_under=10)
+        self.assertEqual(raised.exception.code, 1)
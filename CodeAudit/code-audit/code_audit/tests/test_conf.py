@@ -0,0 +1,47 @@
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+
+from code_audit.conf import AuditConfig
+
+
+class LazyAppConfigTests(SimpleTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+        for app in ("shop", "blog"):
+            os.makedirs(os.path.join(self.root, app))
+        with open(os.path.join(self.root, "shop", "pylintrc"), "w", encoding="utf-8") as f:
+            f.write("[MESSAGES CONTROL]\ndisable=missing-module-docstring\n")
+        self.located = []
+
+    def locate_app(self, path):
+        self.located.append(path)
+        for app in ("shop", "blog"):
+            app_dir = os.path.join(self.root, app)
+            if path.startswith(app_dir + os.sep):
+                return app, app_dir
+        return None
+
+    def make_config(self):
+        return AuditConfig.from_settings({"CONFIG_CACHE_DIR": os.path.join(self.root, "cache")},
+                                         locate_app=self.locate_app)
+
+    def test_apps_are_not_resolved_up_front(self):
+        config = self.make_config()
+        self.assertEqual(config.apps, {})
+        self.assertEqual(self.located, [])
+
+    def test_override_of_the_app_of_a_linted_file(self):
+        config = self.make_config()
+        shop = config.get_config(os.path.join(self.root, "shop", "views.py"))
+        self.assertIn(os.path.join(self.root, "shop", "pylintrc"), shop.sources)
+        self.assertIs(config.get_config(os.path.join(self.root, "blog", "views.py")), config.project)
+        self.assertIs(config.get_config(os.path.join(self.root, "manage.py")), config.project)
+        # a resolved app is matched by its directory from then on
+        config.get_config(os.path.join(self.root, "shop", "models.py"))
+        self.assertEqual(len(self.located), 3)
+        self.assertEqual(sorted(config.apps), [os.path.join(self.root, "blog"), os.path.join(self.root, "shop")])
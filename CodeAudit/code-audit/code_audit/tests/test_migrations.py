@@ -0,0 +1,41 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+BEFORE = [("code_audit", "0006_codeauditreport_git_user")]
+AFTER = [("code_audit", "0007_codeauditreport_module_file_uniq")]
+
+
+class MergeDuplicateReportsTests(TransactionTestCase):
+    """0007 merges duplicate (module_name, file_name) reports, unless they differ in author or git user."""
+
+    def setUp(self):
+        latest = MigrationExecutor(connection).loader.graph.leaf_nodes()
+        self.migrate(BEFORE)
+        self.addCleanup(self.migrate, latest)
+        self.Report = self.apps.get_model("code_audit", "CodeAuditReport")
+        self.Log = self.apps.get_model("code_audit", "CodeAuditReportLog")
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        self.apps = executor.loader.project_state(targets).apps
+
+    def test_same_report_is_merged(self):
+        old = self.Report.objects.create(module_name="shop", file_name="shop/views.py", file_author="alice")
+        new = self.Report.objects.create(module_name="shop", file_name="shop/views.py", file_author="alice")
+        self.Log.objects.create(report=old, pylint_score=5.0)
+        self.migrate(AFTER)
+        Report = self.apps.get_model("code_audit", "CodeAuditReport")
+        self.assertEqual(list(Report.objects.values_list("pk", flat=True)), [new.pk])
+        self.assertEqual(self.apps.get_model("code_audit", "CodeAuditReportLog").objects.get().report_id, new.pk)
+
+    def test_reports_of_different_authors_are_not_merged(self):
+        self.Report.objects.create(module_name="shop", file_name="shop/views.py", file_author="alice")
+        self.Report.objects.create(module_name="shop", file_name="shop/views.py", file_author="bob")
+        with self.assertRaisesMessage(ValueError, "differ in file_author or git_user"):
+            self.migrate(AFTER)
+        self.migrate(BEFORE)
+        self.assertEqual(self.Report.objects.count(), 2)
+        self.Report.objects.all().delete()
@@ -0,0 +1,55 @@
+import datetime
+import os
+import tempfile
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from code_audit.models import CodeAuditReport, CodeAuditSchedule
+from code_audit.scheduler import AuditScheduler
+
+
+class SchedulerTickTests(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "views.py")
+        self.write("A = 1\n")
+        report = CodeAuditReport.objects.create(module_name="shop", file_name="shop/views.py")
+        self.schedule = CodeAuditSchedule.objects.create(report=report, next_check_at=timezone.now())
+        self.scheduler = AuditScheduler(max_concurrent=5)
+        self.now = timezone.now()
+        patcher = mock.patch.object(AuditScheduler, "get_input_files", return_value=[self.path])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write(self, text):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def tick(self, created):
+        self.now += datetime.timedelta(days=1)  # every schedule is due again
+        with mock.patch("code_audit.scheduler.submit", return_value=(None, created)) as submit:
+            summary = self.scheduler.tick(now=self.now)
+        self.schedule.refresh_from_db()
+        return summary, submit
+
+    def test_change_while_a_job_is_active_is_queued_later(self):
+        summary, _ = self.tick(created=False)
+        self.assertEqual((summary["queued"], summary["busy"]), (0, 1))
+        self.assertEqual(self.schedule.content_signature, "")
+        self.assertIsNone(self.schedule.last_queued_at)
+
+        summary, submit = self.tick(created=True)
+        self.assertEqual(summary["queued"], 1)
+        submit.assert_called_once()
+        self.assertNotEqual(self.schedule.content_signature, "")
+        self.assertIsNotNone(self.schedule.last_queued_at)
+
+    def test_unchanged_inputs_are_not_queued_again(self):
+        self.tick(created=True)
+        summary, submit = self.tick(created=True)
+        self.assertEqual(summary["unchanged"], 1)
+        submit.assert_not_called()
@@ -0,0 +1,39 @@
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+
+from code_audit.selection import FileSelector
+
+
+class FileSelectorTests(SimpleTestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        # a checkout under directories named like the default excludes
+        self.base_dir = os.path.join(tmp.name, "build", ".jenkins", "tests", "project")
+        os.makedirs(os.path.join(self.base_dir, "shop", "tests"))
+        for name in ("shop/views.py", "shop/tests/test_views.py"):
+            open(os.path.join(self.base_dir, name), "w").close()
+        self.selector = FileSelector(base_dir=self.base_dir)
+
+    def path(self, name):
+        return os.path.join(self.base_dir, name)
+
+    def test_parents_of_the_project_root_are_not_matched(self):
+        self.assertFalse(self.selector.is_excluded(self.path("shop/views.py")))
+        self.assertTrue(self.selector.is_selected(self.path("shop/views.py")))
+        self.assertTrue(self.selector.is_excluded(self.path("shop/tests/test_views.py")))
+        self.assertEqual(list(self.selector.walk(self.base_dir)), [self.path("shop/views.py")])
+
+    def test_relative_paths(self):
+        self.assertTrue(self.selector.is_selected("shop/views.py"))
+        self.assertTrue(self.selector.is_excluded("shop/tests/test_views.py"))
+
+    def test_paths_outside_the_project(self):
+        outside = os.path.join(os.path.dirname(self.base_dir), "other", "views.py")
+        self.assertIsNone(self.selector.relative(outside))
+        self.assertFalse(self.selector.is_excluded(outside))
+        self.assertFalse(self.selector.is_selected(outside))
+        self.assertFalse(self.selector.is_selected("../other/views.py"))
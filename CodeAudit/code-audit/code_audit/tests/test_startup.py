@@ -0,0 +1,39 @@
+import os
+import sys
+import tempfile
+
+from django.test import SimpleTestCase
+
+from code_audit.benchmarks.startup import MAX_HELP, MAX_OVERHEAD, get_failures, measure
+from code_audit.lint import lint_env
+
+SAMPLE = '''"""Sample module."""
+
+
+def add(first, second):
+    """Sum of two numbers."""
+    return first + second
+'''
+
+
+class StartupTests(SimpleTestCase):
+    """
+    Startup budgets of the code_audit command (see benchmarks/startup.py), run in
+    subprocesses with the settings of the test run.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        with open(os.path.join(self.tmp.name, "sample.py"), "w", encoding="utf-8") as f:
+            f.write(SAMPLE)
+
+    def get_env(self):
+        env = lint_env()
+        # the project and settings (DJANGO_SETTINGS_MODULE is inherited) of the test run
+        env["PYTHONPATH"] = os.pathsep.join([env["PYTHONPATH"], *filter(None, sys.path)])
+        return env
+
+    def test_startup_within_budget(self):
+        timings = measure([sys.executable, "-m", "django"], "sample.py", self.tmp.name, env=self.get_env())
+        self.assertEqual(get_failures(timings, MAX_OVERHEAD, MAX_HELP), [])